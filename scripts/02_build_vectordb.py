@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
-import sys, json
+import os, sys, json
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from rag.embeddings import EmbeddingGenerator
-from rag.vectorstore import AyurvedicVectorStore
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.categorizer import PrototypeCategorizer
+from src.rag.index_versions import IndexVersions
 
 chunks_file = Path("./data/processed/all_chunks.json")
 if not chunks_file.exists():
@@ -17,13 +19,35 @@ with open(chunks_file, 'r') as f:
 print(f"Loaded {len(chunks)} chunks")
 print("Generating embeddings...")
 
+# With INDEX_ROOT set, build into a new version directory and publish it when done;
+# running apps swap to it without a restart (see src/rag/index_versions.py)
+versions = IndexVersions() if os.getenv("INDEX_ROOT") else None
+version, persist_directory = versions.create() if versions else (None, None)
+
 embedding_gen = EmbeddingGenerator()
-vectorstore = AyurvedicVectorStore()
+vectorstore = AyurvedicVectorStore(persist_directory, embedding_signature=embedding_gen.get_signature())
+print(f"Embedding backend: {embedding_gen.backend} ({embedding_gen.output_dtype})")
 
 texts = [chunk['text'] for chunk in chunks]
 embeddings = embedding_gen.embed_batch(texts)
 
+if os.getenv("CHUNK_CATEGORIZER", "prototype").lower() == "prototype":
+    print("Categorizing chunks against category prototypes...")
+    counts = PrototypeCategorizer(embedding_gen).categorize(chunks, embeddings)
+    print(f"Chunks per category (multi-label): {counts}")
+
 print("Adding to vector database...")
 vectorstore.add_chunks(chunks, embeddings.tolist())
 
+# Chunking settings travel with the index (and its snapshots, scripts/17_snapshot.py)
+summary_file = chunks_file.parent / "processing_summary.json"
+if summary_file.exists():
+    chunker = json.loads(summary_file.read_text()).get('chunker')
+    if chunker:
+        vectorstore.record_chunker_params(chunker)
+
 print(f"✅ Done! {vectorstore.get_stats()['total_chunks']} chunks in DB")
+
+if versions:
+    versions.publish(version)
+    print(f"Published index version {version} under {versions.root}")
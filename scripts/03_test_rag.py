@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from rag.embeddings import EmbeddingGenerator
-from rag.vectorstore import AyurvedicVectorStore  
-from rag.retriever import RAGRetriever
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.vectorstore import AyurvedicVectorStore  
+from src.rag.retriever import RAGRetriever
 
 vectorstore = AyurvedicVectorStore()
 embedding_gen = EmbeddingGenerator()
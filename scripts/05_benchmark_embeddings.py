@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Script 05: Benchmark Embedding Backends
+
+Compares embedding backends (torch / int8 / onnx) on the processed corpus:
+batch throughput, single-query latency and retrieval recall@k against the
+full-precision torch backend.
+
+Usage:
+    python scripts/05_benchmark_embeddings.py
+    python scripts/05_benchmark_embeddings.py --backends torch,int8 --sample 500 --dtype float16
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag.embeddings import EmbeddingGenerator, EMBEDDING_BACKENDS
+
+DEFAULT_QUERIES = [
+    "What are Vata characteristics?",
+    "How to treat digestive problems?",
+    "Pitta imbalance symptoms",
+    "What is the importance of dinacharya for maintaining health?",
+    "Describe the six tastes and their effects on the doshas",
+    "What are the causes of Raktapitta?",
+    "Procedure and benefits of Basti therapy",
+    "Dietary guidelines for Atisara",
+]
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def benchmark_backend(backend: str, dtype: str, texts, queries, batch_size: int) -> dict:
+    start = time.perf_counter()
+    generator = EmbeddingGenerator(backend=backend, output_dtype=dtype)
+    load_seconds = time.perf_counter() - start
+
+    # Warm up so one-off graph/session setup is not billed to the first query
+    generator.embed_text(queries[0])
+
+    start = time.perf_counter()
+    corpus_embeddings = generator.embed_batch(texts, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    latencies = []
+    query_embeddings = []
+    for query in queries:
+        start = time.perf_counter()
+        query_embeddings.append(generator.embed_text(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'backend': backend,
+        'dtype': dtype,
+        'load_seconds': load_seconds,
+        'throughput_texts_per_sec': len(texts) / batch_seconds,
+        'query_latency_ms_p50': float(np.percentile(latencies, 50)),
+        'query_latency_ms_p95': float(np.percentile(latencies, 95)),
+        'embedding_bytes': int(corpus_embeddings.nbytes),
+        '_corpus': corpus_embeddings.astype(np.float32),
+        '_queries': np.vstack(query_embeddings).astype(np.float32),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--chunks", default="./data/processed/all_chunks.json")
+    parser.add_argument("--backends", default=",".join(EMBEDDING_BACKENDS))
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--sample", type=int, default=1000, help="Number of chunks to embed")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    chunks_file = Path(args.chunks)
+    if not chunks_file.exists():
+        print("Run 01_scrape_data.py first!")
+        exit(1)
+
+    with open(chunks_file, 'r') as f:
+        chunks = json.load(f)
+    texts = [chunk['text'] for chunk in chunks[:args.sample]]
+    print(f"Benchmarking on {len(texts)} chunks, {len(DEFAULT_QUERIES)} queries")
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if "torch" not in backends:
+        backends.insert(0, "torch")  # reference for recall
+
+    results = []
+    for backend in backends:
+        print(f"\n--- {backend} ---")
+        try:
+            results.append(benchmark_backend(backend, args.dtype, texts, DEFAULT_QUERIES, args.batch_size))
+        except Exception as e:
+            print(f"  Skipped: {e}")
+
+    reference = next((r for r in results if r['backend'] == 'torch'), None)
+    if reference is None:
+        print("Reference torch backend failed; cannot compute recall")
+        exit(1)
+
+    k = min(args.k, len(texts))
+    reference_hits = top_k(reference['_corpus'], reference['_queries'], k)
+    for result in results:
+        hits = top_k(result['_corpus'], result['_queries'], k)
+        overlap = [len(set(a) & set(b)) / k for a, b in zip(hits, reference_hits)]
+        result[f'recall_at_{k}_vs_torch'] = float(np.mean(overlap))
+        del result['_corpus'], result['_queries']
+
+    print("\n" + "=" * 70)
+    print(f"{'backend':<8} {'load s':>8} {'texts/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'recall@'+str(k):>10}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['backend']:<8} {r['load_seconds']:>8.1f} {r['throughput_texts_per_sec']:>10.1f} "
+              f"{r['query_latency_ms_p50']:>8.1f} {r['query_latency_ms_p95']:>8.1f} {r[f'recall_at_{k}_vs_torch']:>10.3f}")
+    print("=" * 70)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
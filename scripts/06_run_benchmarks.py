@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Script 06: Offline Benchmark Suite
+
+Measures chunking, embedding, index build, query latency, concurrent
+orchestrator latency and memory high-water marks on a synthetic corpus with
+a deterministic stub LLM. No network or model download is needed unless
+--real-embeddings is given.
+
+Usage:
+    python scripts/06_run_benchmarks.py --output data/benchmarks/latest.json
+    python scripts/06_run_benchmarks.py --baseline data/benchmarks/baseline.json --tolerance 0.25
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.benchmarks.suite import BenchmarkSuite, compare_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--output", default="./data/benchmarks/latest.json")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional slowdown")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chapters", type=int, default=10, help="Chapters per synthetic section")
+    parser.add_argument("--sentences", type=int, default=120, help="Sentences per synthetic chapter")
+    parser.add_argument("--concurrency", default="1,4,8", help="Concurrent users to simulate")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0)
+    parser.add_argument("--llm-slots", type=int, default=2)
+    parser.add_argument("--real-embeddings", action="store_true", help="Use the configured EmbeddingGenerator")
+    args = parser.parse_args()
+
+    embedder = None
+    if args.real_embeddings:
+        from src.rag.embeddings import EmbeddingGenerator
+        embedder = EmbeddingGenerator()
+
+    with tempfile.TemporaryDirectory(prefix="ayurmind-bench-") as workdir:
+        suite = BenchmarkSuite(
+            workdir,
+            seed=args.seed,
+            chapters_per_section=args.chapters,
+            sentences_per_chapter=args.sentences,
+            embedder=embedder,
+            llm_latency_ms=args.llm_latency_ms,
+            concurrency=[int(n) for n in args.concurrency.split(",")],
+            llm_slots=args.llm_slots,
+        )
+        report = suite.run()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    print("\n" + "=" * 70)
+    print(json.dumps(report['results'], indent=2))
+    print("=" * 70)
+    print(f"Results saved to: {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_results(baseline, report, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for r in regressions:
+                print(f"  {r['metric']}: {r['baseline']:.3f} -> {r['current']:.3f} ({r['change']:+.0%})")
+            exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script 07: Retrieval Quality vs Speed Evaluation
+
+Scores recall@k, MRR and nDCG plus query latency and index size for a grid
+of chunk sizes, overlaps, k and embedding backends, then reports the fastest
+configuration that still meets the quality target.
+
+Usage:
+    python scripts/07_evaluate_retrieval.py --queries data/eval/labeled_queries.jsonl
+    python scripts/07_evaluate_retrieval.py --synthetic --backends hashing
+    python scripts/07_evaluate_retrieval.py --queries q.jsonl --chunk-sizes 400,800 --overlaps 100,200 --ks 3,5,8
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.benchmarks.retrieval_eval import (
+    RetrievalEvaluator, load_labeled_queries, prepare_synthetic, fastest_meeting_target
+)
+
+
+def int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval configurations")
+    parser.add_argument("--queries", help="Labeled query JSONL file")
+    parser.add_argument("--raw-dir", default="./data/raw", help="Scraped corpus to chunk")
+    parser.add_argument("--synthetic", action="store_true", help="Use the synthetic corpus and its topic labels")
+    parser.add_argument("--chunk-sizes", type=int_list, default=[400, 800])
+    parser.add_argument("--overlaps", type=int_list, default=[100, 200])
+    parser.add_argument("--ks", type=int_list, default=[3, 5, 8])
+    parser.add_argument("--backends", default="torch", help="Comma list: torch,int8,onnx,hashing")
+    parser.add_argument("--metric", default="recall", choices=["recall", "mrr", "ndcg"])
+    parser.add_argument("--target", type=float, default=0.8)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    if not args.synthetic and not args.queries:
+        parser.error("--queries is required unless --synthetic is given")
+
+    with tempfile.TemporaryDirectory(prefix="ayurmind-eval-") as workdir:
+        if args.synthetic:
+            raw_dir, labeled = prepare_synthetic(workdir)
+        else:
+            raw_dir, labeled = args.raw_dir, load_labeled_queries(args.queries)
+
+        print(f"Evaluating {len(labeled)} labeled queries")
+        evaluator = RetrievalEvaluator(raw_dir, workdir, labeled)
+        rows = evaluator.run_grid(args.chunk_sizes, args.overlaps, args.ks,
+                                  [b.strip() for b in args.backends.split(",") if b.strip()])
+
+    print("\n" + "=" * 100)
+    print(f"{'size':>5} {'ovlp':>5} {'backend':<8} {'k':>3} {'chunks':>7} {'MB':>7} "
+          f"{'recall':>7} {'mrr':>6} {'ndcg':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 100)
+    for r in rows:
+        print(f"{r['chunk_size']:>5} {r['chunk_overlap']:>5} {r['backend']:<8} {r['k']:>3} {r['chunks']:>7} "
+              f"{r['index_size_mb']:>7.1f} {r['recall']:>7.3f} {r['mrr']:>6.3f} {r['ndcg']:>6.3f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+    print("=" * 100)
+
+    best = fastest_meeting_target(rows, args.metric, args.target)
+    if best:
+        print(f"\n✅ Fastest with {args.metric} >= {args.target}: chunk_size={best['chunk_size']} "
+              f"overlap={best['chunk_overlap']} backend={best['backend']} k={best['k']} (p95 {best['p95_ms']:.2f} ms)")
+    else:
+        print(f"\n⚠️ No configuration reached {args.metric} >= {args.target}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2), encoding='utf-8')
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
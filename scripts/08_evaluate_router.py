@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Script 08: Evaluate Query Routing
+
+Compares the embedding router with the keyword matcher on labeled queries:
+exact-match accuracy of the activated agent set, per-intent precision and
+recall, and the average number of LLM generations per query.
+
+Labeled JSONL lines look like {"query": "...", "intents": ["dosha", "treatment"]}
+or {"query": "...", "intents": ["direct"]}.
+
+Usage:
+    python scripts/08_evaluate_router.py
+    python scripts/08_evaluate_router.py --queries data/eval/router_queries.jsonl --agent-threshold 0.4
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.router import IntentRouter, AGENT_INTENTS, count_generations
+from src.agents.orchestrator import OrchestratorAgent
+
+# Held out from the router prototypes; drawn from prompts.txt scenarios
+DEFAULT_LABELED = [
+    ("What are the fundamental principles of Ayurveda according to the Sutra Sthana?", ["direct"]),
+    ("Explain the concept of tridosha and their primary qualities.", ["direct"]),
+    ("What is the importance of dinacharya for maintaining health?", ["direct"]),
+    ("Describe the six tastes and their effects on the doshas.", ["direct"]),
+    ("What are the primary causes and premonitory signs of Jvara?", ["dosha"]),
+    ("I have a persistent sour taste in my mouth and a burning sensation in my chest. Which dosha imbalance does this point to?", ["dosha"]),
+    ("What are the causes of Raktapitta?", ["dosha"]),
+    ("How is an individual's Prakriti determined at the time of conception?", ["prakriti"]),
+    ("I have a tendency to gain weight, my skin is oily, and I have a calm, steady personality. What might my dominant dosha be?", ["prakriti"]),
+    ("What is the recommended shodhana therapy for a strong person with a severe Kapha imbalance?", ["treatment"]),
+    ("Describe the procedure and benefits of Basti.", ["treatment"]),
+    ("What dietary guidelines are recommended for someone suffering from Atisara?", ["treatment"]),
+    ("Foods for better sleep?", ["treatment"]),
+    ("I have digestive issues and anxiety", ["dosha", "treatment"]),
+    ("I am naturally thin with dry skin. Recently I have anxiety, insomnia and cracking joints. Analyze my Prakriti and imbalance and suggest diet and lifestyle changes.", ["prakriti", "dosha", "treatment"]),
+    ("I feel sluggish and heavy, have gained weight and suffer from sinus congestion. Identify the doshic issue and recommend a purification procedure.", ["dosha", "treatment"]),
+]
+
+
+def activation_set(activation):
+    if activation.get('direct'):
+        return {'direct'}
+    return {intent for intent in AGENT_INTENTS if activation.get(intent)}
+
+
+def evaluate(name, route, labeled):
+    exact = 0
+    generations = 0
+    per_intent = {intent: {'tp': 0, 'fp': 0, 'fn': 0} for intent in AGENT_INTENTS + ('direct',)}
+
+    for query, expected in labeled:
+        activation = route(query)
+        predicted = activation_set(activation)
+        expected = set(expected)
+        exact += predicted == expected
+        generations += count_generations(activation)
+        for intent, counts in per_intent.items():
+            counts['tp'] += intent in predicted and intent in expected
+            counts['fp'] += intent in predicted and intent not in expected
+            counts['fn'] += intent not in predicted and intent in expected
+
+    report = {
+        'router': name,
+        'exact_match_accuracy': exact / len(labeled),
+        'avg_generations': generations / len(labeled),
+        'per_intent': {},
+    }
+    for intent, c in per_intent.items():
+        precision = c['tp'] / (c['tp'] + c['fp']) if c['tp'] + c['fp'] else 0.0
+        recall = c['tp'] / (c['tp'] + c['fn']) if c['tp'] + c['fn'] else 0.0
+        report['per_intent'][intent] = {'precision': precision, 'recall': recall}
+    return report
+
+
+class _EmbeddingOnly:
+    """Router needs only embed_query/embedding_generator from the retriever"""
+
+    def __init__(self, embedding_generator):
+        self.embedding_generator = embedding_generator
+
+    def embed_query(self, query):
+        return self.embedding_generator.embed_text(query)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate embedding vs keyword routing")
+    parser.add_argument("--queries", help="Labeled JSONL file (defaults to a built-in set)")
+    parser.add_argument("--hashing", action="store_true", help="Use the offline hashing embedder")
+    parser.add_argument("--agent-threshold", type=float)
+    parser.add_argument("--agent-margin", type=float)
+    parser.add_argument("--direct-margin", type=float)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+
+    if args.queries:
+        labeled = []
+        for line in Path(args.queries).read_text(encoding='utf-8').splitlines():
+            if line.strip():
+                item = json.loads(line)
+                labeled.append((item['query'], item['intents']))
+    else:
+        labeled = DEFAULT_LABELED
+
+    if args.hashing:
+        from src.benchmarks.stubs import HashingEmbedder
+        embedder = HashingEmbedder()
+    else:
+        from src.rag.embeddings import EmbeddingGenerator
+        embedder = EmbeddingGenerator()
+
+    router = IntentRouter(_EmbeddingOnly(embedder), agent_threshold=args.agent_threshold,
+                          agent_margin=args.agent_margin, direct_margin=args.direct_margin)
+    reports = [
+        evaluate("keyword", OrchestratorAgent.keyword_activation, labeled),
+        evaluate("embedding", router.route, labeled),
+    ]
+
+    print("=" * 70)
+    print(f"{len(labeled)} labeled queries")
+    print(f"{'router':<10} {'exact acc':>10} {'avg LLM calls':>14}")
+    print("-" * 70)
+    for r in reports:
+        print(f"{r['router']:<10} {r['exact_match_accuracy']:>10.2f} {r['avg_generations']:>14.2f}")
+    print("-" * 70)
+    for r in reports:
+        details = "  ".join(f"{intent} P={m['precision']:.2f} R={m['recall']:.2f}" for intent, m in r['per_intent'].items())
+        print(f"{r['router']:<10} {details}")
+    print("=" * 70)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2), encoding='utf-8')
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script 09: Verify Prompt Layout Against a Recording Stub Server
+
+Runs full consultations through OllamaClient against a local stub server
+(synthetic corpus, hashing embedder) and checks the recorded requests:
+
+- every generation uses /api/chat with a keep_alive
+- the system prompt is its own first message and is identical on every call
+  from the same agent
+- the query comes last, so repeated calls share a long prompt prefix
+
+Exits non-zero when a check fails.
+
+Usage:
+    python scripts/09_verify_prompt_layout.py
+    python scripts/09_verify_prompt_layout.py --keep-alive 1h --repeats 3
+"""
+
+import sys
+import json
+import argparse
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.benchmarks.corpus import generate_raw_corpus, BENCHMARK_QUERIES
+from src.benchmarks.stubs import HashingEmbedder
+from src.scraper.data_processor import AyurvedicTextProcessor
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.retriever import RAGRetriever
+from src.llm.local_client import OllamaClient
+from src.llm.prompts import shared_prefix_length
+from src.llm.stub_server import RecordingStubServer
+from src.agents.prakriti_agent import PrakritiAgent
+from src.agents.dosha_agent import DoshaAgent
+from src.agents.treatment_agent import TreatmentAgent
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.synthesis import AlwaysSynthesizePolicy
+
+
+def build_retriever(workdir: Path) -> RAGRetriever:
+    raw_dir = workdir / 'raw'
+    processed_dir = workdir / 'processed'
+    generate_raw_corpus(str(raw_dir), chapters_per_section=3, sentences_per_chapter=40)
+    AyurvedicTextProcessor(input_dir=str(raw_dir), output_dir=str(processed_dir)).process_all()
+    chunks = json.loads((processed_dir / 'all_chunks.json').read_text(encoding='utf-8'))
+
+    embedder = HashingEmbedder()
+    vectorstore = AyurvedicVectorStore(str(workdir / 'vectordb'), embedder.get_signature())
+    vectorstore.add_chunks(chunks, embedder.embed_batch([c['text'] for c in chunks], show_progress_bar=False).tolist())
+    return RAGRetriever(vectorstore, embedder)
+
+
+def check_requests(requests, keep_alive):
+    failures = []
+    by_system = defaultdict(list)
+
+    for entry in requests:
+        body = entry['body']
+        if entry['path'] != "/api/chat":
+            failures.append(f"generation sent to {entry['path']} instead of /api/chat")
+            continue
+        if body.get('keep_alive') != keep_alive:
+            failures.append(f"keep_alive is {body.get('keep_alive')!r}, expected {keep_alive!r}")
+        messages = body.get('messages', [])
+        if not messages or messages[0]['role'] != "system":
+            failures.append("first message is not the system prompt")
+            continue
+        if messages[-1]['role'] != "user" or "User Query:" not in messages[-1]['content'] and "Original Query:" not in messages[-1]['content']:
+            failures.append("last message does not carry the query")
+        by_system[messages[0]['content']].append(json.dumps(messages))
+
+    prefix_report = {}
+    for system_prompt, serialized in by_system.items():
+        shared = [shared_prefix_length(a, b) / max(len(b), 1) for a, b in zip(serialized, serialized[1:])]
+        prefix_report[system_prompt[:50]] = {
+            'calls': len(serialized),
+            'avg_shared_prefix': sum(shared) / len(shared) if shared else None,
+        }
+    return failures, prefix_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the request shapes sent to Ollama")
+    parser.add_argument("--keep-alive", default="30m")
+    parser.add_argument("--repeats", type=int, default=2, help="Times each query is asked (simulates follow-ups)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ayurmind-prompts-") as tmp, RecordingStubServer() as server:
+        retriever = build_retriever(Path(tmp))
+        client = OllamaClient(model=server.model, base_url=server.base_url, keep_alive=args.keep_alive)
+        orchestrator = OrchestratorAgent(
+            PrakritiAgent(retriever, client),
+            DoshaAgent(retriever, client),
+            TreatmentAgent(retriever, client),
+            client,
+            synthesis_policy=AlwaysSynthesizePolicy()
+        )
+
+        for _ in range(args.repeats):
+            for query in BENCHMARK_QUERIES:
+                orchestrator.process_query(query)
+
+        requests = server.generation_requests()
+        failures, prefix_report = check_requests(requests, args.keep_alive)
+
+    print("=" * 70)
+    print(f"{len(requests)} generation requests recorded")
+    print("-" * 70)
+    for system_prompt, info in prefix_report.items():
+        shared = info['avg_shared_prefix']
+        shared_text = f"{shared:.0%}" if shared is not None else "n/a"
+        print(f"{system_prompt:<52} calls={info['calls']:<4} shared prefix={shared_text}")
+    print("-" * 70)
+    if failures:
+        for failure in sorted(set(failures)):
+            print(f"✗ {failure}")
+        sys.exit(1)
+    print("✓ All requests use /api/chat with keep_alive and a stable leading system message")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script 10: LLM Fault-Injection Scenarios
+
+Drives OllamaClient through the resilience layer against local stub servers
+that inject errors and latency, and checks the outcome of each scenario:
+429 with Retry-After, transient 5xx, a persistent 5xx, a non-retryable 4xx,
+a consultation deadline, and a slow primary rescued by a hedged request.
+
+Exits non-zero when a scenario does not behave as expected.
+
+Usage:
+    python scripts/10_fault_injection.py
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.llm.local_client import OllamaClient
+from src.llm.options import GenerationOptions
+from src.llm.resilience import ResilientLLMClient, RetryPolicy, LLMHTTPError, LLMTimeoutError
+from src.llm.scheduler import LLMScheduler
+from src.llm.stub_server import RecordingStubServer
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.05, max_delay=0.5)
+
+
+def run(name, expect, fn):
+    started = time.monotonic()
+    try:
+        fn()
+        outcome = "ok"
+    except LLMTimeoutError:
+        outcome = "timeout"
+    except LLMHTTPError as e:
+        outcome = f"http {e.status_code}"
+    elapsed = time.monotonic() - started
+    passed = outcome == expect
+    print(f"{'✓' if passed else '✗'} {name:<38} expected={expect:<9} got={outcome:<9} {elapsed:6.2f}s")
+    return passed
+
+
+def main():
+    logging.getLogger('src').setLevel(logging.ERROR)
+    results = []
+
+    with RecordingStubServer() as primary, RecordingStubServer() as secondary:
+        client = OllamaClient(model=primary.model, base_url=primary.base_url)
+        resilient = ResilientLLMClient(client, policy=FAST_RETRIES)
+
+        def call(target=resilient, options=GenerationOptions(timeout=10)):
+            return target.generate("ping", system_prompt="You are a stub.", options=options)
+
+        primary.inject(status=429, retry_after=1)
+        results.append(run("429 honours Retry-After (>= 1s)", "ok", call))
+        results[-1] &= len(primary.generation_requests()) == 2
+
+        primary.clear()
+        primary.inject(status=503, count=2)
+        results.append(run("transient 503 x2 then success", "ok", call))
+
+        primary.clear()
+        primary.inject(status=500, count=5)
+        results.append(run("persistent 500 gives up", "http 500", call))
+
+        primary.clear()
+        primary.inject(status=400)
+        results.append(run("400 is not retried", "http 400", call))
+        results[-1] &= len(primary.generation_requests()) == 1
+
+        primary.clear()
+        primary.inject(delay_ms=3000)
+        scheduler = LLMScheduler(max_in_flight=1, max_queue=0, consultation_timeout=0.5)
+
+        def within_deadline():
+            with scheduler.consultation("fault-test") as consultation:
+                consultation.run(call)
+        results.append(run("consultation deadline (0.5s)", "timeout", within_deadline))
+
+        # Hedging: teach the client a fast p95, then make the primary stall once
+        primary.clear()
+        hedge_target = OllamaClient(model=secondary.model, base_url=secondary.base_url)
+        hedged = ResilientLLMClient(client, policy=FAST_RETRIES, hedge_client=hedge_target, hedge_min_samples=5)
+        for _ in range(10):
+            call(hedged)
+        primary.inject(delay_ms=2000)
+        results.append(run("slow primary answered by hedge", "ok", lambda: call(hedged)))
+        results[-1] &= len(secondary.generation_requests()) == 1
+
+    print("-" * 70)
+    if not all(results):
+        print("✗ Some fault scenarios did not behave as expected")
+        sys.exit(1)
+    print("✓ All fault scenarios passed")
+
+
+if __name__ == "__main__":
+    main()
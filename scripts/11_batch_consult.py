@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script 11: Batch Consultations
+
+Answers a file of queries (FAQ precomputation, regression sets) in bulk:
+queries are embedded and retrieved in batches, consultations run with
+bounded parallelism, and each answer is appended to a JSONL file as soon as
+it is ready. Re-running with the same output file resumes where the last
+run stopped; queries that errored are retried.
+
+Input is either .jsonl ({"id": "...", "query": "..."}, id optional) or plain
+text with one query per line.
+
+Usage:
+    python scripts/11_batch_consult.py --input data/eval/faq.txt --output data/batch/faq_answers.jsonl
+    python scripts/11_batch_consult.py --input queries.jsonl --output out.jsonl --workers 8 --no-resume
+"""
+
+import sys
+import os
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.retriever import RAGRetriever
+from src.llm.factory import create_llm_client
+from src.agents.prakriti_agent import PrakritiAgent
+from src.agents.dosha_agent import DoshaAgent
+from src.agents.treatment_agent import TreatmentAgent
+from src.agents.general_agent import GeneralAgent
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.router import IntentRouter
+from src.agents.batch_runner import BatchConsultationRunner, load_queries
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run consultations for a file of queries")
+    parser.add_argument("--input", required=True, help="Queries (.jsonl or one per line)")
+    parser.add_argument("--output", required=True, help="JSONL file for answers (appended to when resuming)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("LLM_MAX_IN_FLIGHT", "4")),
+                        help="Consultations in flight at once")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Queries embedded and retrieved per batch")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args()
+
+    items = load_queries(args.input)
+    print(f"Loaded {len(items)} queries from {args.input}")
+
+    embedding_generator = EmbeddingGenerator()
+    retriever = RAGRetriever(AyurvedicVectorStore(), embedding_generator)
+    llm_client = create_llm_client()
+    router = IntentRouter(retriever) if os.getenv("QUERY_ROUTER", "embedding").lower() == "embedding" else None
+    orchestrator = OrchestratorAgent(
+        PrakritiAgent(retriever, llm_client),
+        DoshaAgent(retriever, llm_client),
+        TreatmentAgent(retriever, llm_client),
+        llm_client,
+        router=router,
+        general_agent=GeneralAgent(retriever, llm_client)
+    )
+
+    runner = BatchConsultationRunner(orchestrator, retriever, max_workers=args.workers, chunk_size=args.chunk_size)
+    summary = runner.run(items, args.output, resume=not args.no_resume)
+
+    print("=" * 70)
+    print(f"Total: {summary['total']}  skipped (already done): {summary['skipped']}")
+    print(f"Succeeded: {summary['succeeded']}  failed: {summary['failed']}")
+    print(f"Time: {summary['seconds']:.1f}s  ({summary['queries_per_sec']:.2f} queries/sec)")
+    print(f"Answers: {args.output}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
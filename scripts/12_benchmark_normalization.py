@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script 12: Text Normalization Benchmark
+
+Compares the processor's compiled normalizer and verse-aware segmenter with
+the previous re.sub chain and [.!?] split over every raw chapter file:
+throughput (MB/s) and the sentence length distribution, which shows whether
+shlokas are still being merged into oversized sentences.
+
+Runs on the scraped corpus in data/raw; --synthetic uses the benchmark
+suite's generated corpus instead (no Devanagari, so only throughput is
+meaningful there).
+
+Usage:
+    python scripts/12_benchmark_normalization.py
+    python scripts/12_benchmark_normalization.py --input-dir ./data/raw --repeats 5
+    python scripts/12_benchmark_normalization.py --synthetic
+"""
+
+import re
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.scraper.normalization import TextNormalizer, SentenceSegmenter
+from src.benchmarks.corpus import generate_raw_corpus
+
+
+def legacy_clean(text: str) -> str:
+    """clean_text as it was before the normalization engine"""
+    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
+    text = re.sub(r'  +', ' ', text)
+    text = re.sub(r'\[Page \d+\]', '', text)
+    text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
+    text = text.replace('“', '"').replace('”', '"')
+    text = text.replace('‘', "'").replace('’', "'")
+    return text.strip()
+
+
+def legacy_split(text: str):
+    return [sentence for sentence in re.split(r'(?<=[.!?])\s+', text) if sentence.strip()]
+
+
+def measure(texts, clean, split, repeats: int):
+    total_bytes = sum(len(text.encode('utf-8')) for text in texts)
+    clean_seconds = split_seconds = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cleaned = [clean(text) for text in texts]
+        clean_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        sentences = [sentence for text in cleaned for sentence in split(text)]
+        split_seconds += time.perf_counter() - start
+
+    lengths = np.array([len(sentence) for sentence in sentences]) if sentences else np.zeros(1)
+    megabytes = total_bytes * repeats / 1e6
+    return {
+        'clean_mb_per_sec': megabytes / clean_seconds,
+        'split_mb_per_sec': megabytes / split_seconds,
+        'sentences': len(sentences),
+        'p50_chars': float(np.percentile(lengths, 50)),
+        'p95_chars': float(np.percentile(lengths, 95)),
+        'max_chars': int(lengths.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text normalization and sentence segmentation")
+    parser.add_argument("--input-dir", default="./data/raw", help="Scraped corpus (section dirs with *.txt)")
+    parser.add_argument("--synthetic", action="store_true", help="Use the generated benchmark corpus")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ayurmind-norm-") as workdir:
+        input_dir = Path(args.input_dir)
+        if args.synthetic:
+            input_dir = Path(workdir)
+            generate_raw_corpus(str(input_dir), chapters_per_section=10, sentences_per_chapter=400)
+        texts = [path.read_text(encoding='utf-8') for path in sorted(input_dir.glob('*/*.txt'))]
+
+    if not texts:
+        print(f"No chapter files under {input_dir}. Run scripts/01_scrape_data.py first or pass --synthetic.")
+        sys.exit(1)
+    print(f"{len(texts)} files, {sum(len(t.encode('utf-8')) for t in texts) / 1e6:.1f} MB, {args.repeats} repeats")
+
+    normalizer = TextNormalizer()
+    segmenter = SentenceSegmenter()
+    rows = {
+        'legacy': measure(texts, legacy_clean, legacy_split, args.repeats),
+        'compiled': measure(texts, normalizer.normalize, segmenter.split, args.repeats),
+    }
+
+    columns = ['clean_mb_per_sec', 'split_mb_per_sec', 'sentences', 'p50_chars', 'p95_chars', 'max_chars']
+    print(f"{'':10}" + "".join(f"{column:>18}" for column in columns))
+    for name, row in rows.items():
+        print(f"{name:10}" + "".join(f"{row[column]:>18.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script 13: Migrate a Vector Store to the Sharded Layout
+
+Copies every chunk (ids, texts, metadata and stored embeddings, so nothing
+is re-embedded) from a single-collection index into a new index with one
+collection per category or per section. Point VECTOR_DB_PATH at the target
+afterwards; the source is left untouched.
+
+Usage:
+    python scripts/13_shard_vectordb.py --source ./data/vectordb --target ./data/vectordb_sharded
+    python scripts/13_shard_vectordb.py --source ./data/vectordb --target ./data/vectordb_sections --shard-by section
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag.vectorstore import AyurvedicVectorStore, SHARD_KEYS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a single-collection index into a sharded one")
+    parser.add_argument("--source", default="./data/vectordb")
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--shard-by", choices=SHARD_KEYS, default="category")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    source = AyurvedicVectorStore(args.source)
+    if source.sharded:
+        print(f"{args.source} is already sharded by {source.shard_by}")
+        sys.exit(1)
+    signature = source.get_embedding_signature()
+    if not signature:
+        print(f"{args.source} has no embedding signature; rebuild it with scripts/02_build_vectordb.py first")
+        sys.exit(1)
+
+    target = AyurvedicVectorStore(args.target, layout="sharded", shard_by=args.shard_by)
+    if target.count():
+        print(f"{args.target} already holds {target.count()} chunks; choose an empty directory")
+        sys.exit(1)
+    target.ensure_compatible(signature)
+
+    copied = 0
+    for page in source.iter_rows(args.page_size, include=('documents', 'metadatas', 'embeddings')):
+        chunks = [{'text': text, 'metadata': metadata} for text, metadata in zip(page['documents'], page['metadatas'])]
+        target.add_chunks(chunks, page['embeddings'], ids=page['ids'])
+        copied += len(chunks)
+
+    stats = target.get_stats()
+    print(f"Copied {copied} chunks from {args.source} to {args.target} (sharded by {args.shard_by})")
+    for shard, count in sorted(stats['shards'].items()):
+        print(f"  {shard:<20} {count:>7} chunks")
+    print(f"Set VECTOR_DB_PATH={args.target} to use it")
+
+
+if __name__ == "__main__":
+    main()
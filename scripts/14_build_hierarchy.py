@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script 14: Build the Hierarchical (chapter -> chunk) Index
+
+Computes section and chapter centroids from the embeddings already stored in
+the vector store, saves them next to the index (hierarchy.npz), then reports
+recall@k and per-query latency of flat Chroma search and of chapter-first
+search at several --top-chapters settings. Exact brute-force search over all
+stored embeddings is the ground truth.
+
+Queries are stored chunk embeddings with Gaussian noise added (so they sit
+near, not on, a chunk), or the benchmark questions embedded with the
+configured model when --embed-queries is given.
+
+Enable at query time with HIERARCHICAL_RETRIEVAL=true (HIER_TOP_CHAPTERS,
+HIER_TOP_SECTIONS tune it).
+
+Usage:
+    python scripts/14_build_hierarchy.py
+    python scripts/14_build_hierarchy.py --top-chapters 2,4,8,16 --queries 500 --noise 0.05
+    python scripts/14_build_hierarchy.py --embed-queries --category treatment
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.hierarchy import HierarchicalIndex
+
+load_dotenv()
+
+
+def exact_top_k(index: HierarchicalIndex, queries: np.ndarray, k: int, category=None):
+    distances = index.sq_norms[None, :] - 2.0 * (queries @ index.embeddings.T)
+    if category:
+        distances[:, ~index.category_mask(category)] = np.inf
+    nearest = np.argsort(distances, axis=1)[:, :k]
+    return [{index.ids[i] for i in row if np.isfinite(distances[r, i])} for r, row in enumerate(nearest)]
+
+
+def evaluate(search, queries: np.ndarray, truth, k: int, category=None):
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = search(query, k, category)
+        latencies.append(time.perf_counter() - start)
+        if expected:
+            recalls.append(len(set(results.ids) & expected) / len(expected))
+    return float(np.mean(recalls)), float(np.percentile(latencies, 50) * 1000), float(np.percentile(latencies, 95) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and evaluate the hierarchical index")
+    parser.add_argument("--vectordb", default=None, help="Vector store directory (default: VECTOR_DB_PATH)")
+    parser.add_argument("--top-chapters", default="2,4,8,16")
+    parser.add_argument("--top-sections", type=int, default=0)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05, help="Std-dev of noise added to sampled chunk embeddings")
+    parser.add_argument("--embed-queries", action="store_true", help="Embed the benchmark questions instead")
+    parser.add_argument("--category", default=None, help="Evaluate filtered search for this category")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vectorstore = AyurvedicVectorStore(args.vectordb)
+    start = time.perf_counter()
+    index = HierarchicalIndex.build(vectorstore, top_sections=args.top_sections)
+    path = index.save(str(vectorstore.persist_directory))
+    print(f"Built {len(index)} chunks / {len(index.chapter_keys)} chapters / {len(index.section_names)} sections "
+          f"in {time.perf_counter() - start:.1f}s -> {path}")
+
+    if args.embed_queries:
+        from src.rag.embeddings import EmbeddingGenerator
+        from src.benchmarks.corpus import BENCHMARK_QUERIES
+        queries = np.asarray(EmbeddingGenerator().embed_batch(BENCHMARK_QUERIES, show_progress_bar=False), dtype=np.float32)
+    else:
+        rng = np.random.default_rng(args.seed)
+        sample = rng.choice(len(index), size=min(args.queries, len(index)), replace=False)
+        queries = index.embeddings[sample] + rng.normal(0, args.noise, (len(sample), index.embeddings.shape[1])).astype(np.float32)
+
+    truth = exact_top_k(index, queries, args.k, args.category)
+    rows = [("flat (chroma)",) + evaluate(
+        lambda q, k, c: vectorstore.search_batch(q, k, c, include_documents=False), queries, truth, args.k, args.category)]
+    for top in (int(value) for value in args.top_chapters.split(",")):
+        index.top_chapters = top
+        rows.append((f"chapters={top}",) + evaluate(index.search_batch, queries, truth, args.k, args.category))
+
+    print(f"\n{len(queries)} queries, k={args.k}, category={args.category or 'all'}")
+    print(f"{'search':<16}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, recall, p50, p95 in rows:
+        print(f"{name:<16}{recall:>10.3f}{p50:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script 15: Run the AyurMind HTTP API
+
+Serves /v1/consult (JSON or SSE), /v1/retrieve, /health and /metrics with
+uvicorn. Each worker is a separate process with its own models, index
+handle and LLM scheduler, so Python-side work (embedding, retrieval,
+prompt building) uses several cores; put a load balancer in front for more
+machines. Clients that send back the returned "memory" can hit any worker.
+
+With --preload (API_PRELOAD=true) the embedding model and a read-only
+in-memory copy of the index are loaded once and the workers are forked from
+that process, sharing them copy-on-write (see src/api/prefork.py);
+scripts/16_memory_report.py compares the two modes.
+
+The Gradio UI becomes a client of this API when AYURMIND_API_URL is set.
+
+Usage:
+    python scripts/15_run_api.py
+    python scripts/15_run_api.py --host 0.0.0.0 --port 8000 --workers 4
+    python scripts/15_run_api.py --workers 4 --preload
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AyurMind HTTP API")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "2")))
+    parser.add_argument("--preload", action="store_true", default=os.getenv("API_PRELOAD", "false").lower() == "true",
+                        help="Load the model and index once and fork the workers (shared copy-on-write)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if args.preload:
+        import logging
+        from src.api.prefork import serve
+        logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+        serve(args.host, args.port, args.workers, args.log_level)
+        return
+
+    # Workers import the app by name, so the repo root must be importable in each of them
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).parent.parent), os.getenv("PYTHONPATH")]))
+    uvicorn.run("src.api.app:create_app", factory=True, host=args.host, port=args.port,
+                workers=args.workers, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
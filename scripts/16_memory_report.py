@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Script 16: Memory Report for the API Serving Modes
+
+Starts scripts/15_run_api.py in each mode with the same number of workers,
+waits until every worker answers /health, warms them with /v1/retrieve
+requests (so the model and index pages are actually touched), then reads
+/proc for every process of the server and prints RSS, PSS and unique memory
+(USS) per process.
+
+USS is what each extra worker really costs; PSS summed over the tree is the
+server's real footprint. In "spawn" mode (uvicorn workers) each worker
+holds its own model and index, so its USS is large; in "preload" mode the
+forked workers share them with the parent, and their USS is only their own
+state. Linux only.
+
+Usage:
+    python scripts/16_memory_report.py
+    python scripts/16_memory_report.py --workers 4 --requests 50 --output memory.json
+    python scripts/16_memory_report.py --modes preload
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+from dotenv import load_dotenv
+
+from src.monitoring.memory import process_memory, process_tree
+from src.benchmarks.corpus import BENCHMARK_QUERIES
+
+load_dotenv()
+
+MiB = 2 ** 20
+
+
+def wait_for_workers(base_url: str, workers: int, server: subprocess.Popen, timeout: float) -> set:
+    """Poll /health on fresh connections until `workers` distinct worker pids have answered"""
+    pids, deadline = set(), time.monotonic() + timeout
+    while len(pids) < workers:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with {server.returncode} during startup")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Only {len(pids)}/{workers} workers answered within {timeout:.0f}s")
+        try:
+            pids.add(requests.get(f"{base_url}/health", timeout=5).json()['worker_pid'])
+        except requests.RequestException:
+            time.sleep(0.5)
+    return pids
+
+
+def measure(mode: str, args) -> dict:
+    script = Path(__file__).parent / "15_run_api.py"
+    command = [sys.executable, str(script), "--host", "127.0.0.1", "--port", str(args.port),
+               "--workers", str(args.workers), "--log-level", "warning"]
+    if mode == "preload":
+        command.append("--preload")
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    started = time.monotonic()
+    server = subprocess.Popen(command, start_new_session=True)
+    try:
+        worker_pids = wait_for_workers(base_url, args.workers, server, args.startup_timeout)
+        ready = time.monotonic() - started
+        for i in range(args.requests * args.workers):
+            requests.post(f"{base_url}/v1/retrieve", json={'query': BENCHMARK_QUERIES[i % len(BENCHMARK_QUERIES)]},
+                          timeout=60).raise_for_status()
+
+        processes = []
+        for pid in process_tree(server.pid):
+            memory = process_memory(pid)
+            if memory:
+                role = "worker" if pid in worker_pids else ("main" if pid == server.pid else "helper")
+                processes.append({'pid': pid, 'role': role, **memory})
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+
+    workers = [process for process in processes if process['role'] == "worker"]
+    return {
+        'mode': mode,
+        'startup_seconds': round(ready, 1),
+        'processes': processes,
+        'worker_uss_mean': sum(process['uss'] for process in workers) / max(1, len(workers)),
+        'total_pss': sum(process['pss'] for process in processes),
+        'total_rss': sum(process['rss'] for process in processes),
+    }
+
+
+def print_report(report: dict):
+    print(f"\n== {report['mode']} (ready in {report['startup_seconds']}s) ==")
+    print(f"{'pid':>8}  {'role':<7}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}{'shared MiB':>12}")
+    for process in report['processes']:
+        print(f"{process['pid']:>8}  {process['role']:<7}{process['rss'] / MiB:>10.1f}{process['pss'] / MiB:>10.1f}"
+              f"{process['uss'] / MiB:>10.1f}{process['shared'] / MiB:>12.1f}")
+    print(f"mean worker USS {report['worker_uss_mean'] / MiB:.1f} MiB, total PSS {report['total_pss'] / MiB:.1f} MiB "
+          f"(summed RSS {report['total_rss'] / MiB:.1f} MiB counts shared pages in every process)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-worker memory of the API serving modes")
+    parser.add_argument("--modes", default="spawn,preload", help="Comma-separated: spawn, preload")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=20, help="Warm-up retrievals per worker")
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--output", default=None, help="Write the reports as JSON")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("This report needs Linux /proc/<pid>/smaps_rollup")
+        sys.exit(1)
+
+    reports = []
+    for mode in args.modes.split(","):
+        report = measure(mode.strip(), args)
+        print_report(report)
+        reports.append(report)
+
+    if len(reports) > 1:
+        print(f"\n{'mode':<10}{'worker USS MiB':>16}{'total PSS MiB':>16}")
+        for report in reports:
+            print(f"{report['mode']:<10}{report['worker_uss_mean'] / MiB:>16.1f}{report['total_pss'] / MiB:>16.1f}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2))
+        print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script 17: Export, Verify and Import Single-File Index Snapshots
+
+A snapshot is the whole index (embeddings, chunk texts, metadata, category
+masks, embedding model signature and chunker settings) in one versioned,
+checksummed, memory-mappable file. Copy it to a node and set
+VECTOR_SNAPSHOT=/path/to/index.ayursnap: the retriever, the API and the UI
+then serve from the mapped file without opening Chroma.
+
+    export   Chroma index -> snapshot file
+    verify   check the checksum and time opening the snapshot
+    info     print the header
+    import   snapshot file -> new Chroma index (for nodes that add chunks)
+
+Usage:
+    python scripts/17_snapshot.py export --output ./data/index.ayursnap
+    python scripts/17_snapshot.py verify ./data/index.ayursnap
+    python scripts/17_snapshot.py info ./data/index.ayursnap
+    python scripts/17_snapshot.py import ./data/index.ayursnap --target ./data/vectordb_restored
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.chunk_table import ChunkTable
+from src.rag.snapshot import SnapshotError, load_snapshot, read_header, verify_snapshot
+
+load_dotenv()
+
+
+def export(args):
+    start = time.perf_counter()
+    vectorstore = AyurvedicVectorStore(args.vectordb)
+    header = vectorstore.export_snapshot(args.output)
+    size = Path(args.output).stat().st_size
+    print(f"Exported {header['count']} chunks ({header['dim']}-d) to {args.output} "
+          f"({size / 2**20:.1f} MiB) in {time.perf_counter() - start:.1f}s")
+    print(f"sha256 {header['sha256']}")
+    if not header['chunker']:
+        print("Note: the index has no recorded chunker settings (rebuild with scripts/02_build_vectordb.py to add them)")
+
+
+def verify(args):
+    try:
+        start = time.perf_counter()
+        verify_snapshot(args.snapshot)
+        checked = time.perf_counter() - start
+    except SnapshotError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    start = time.perf_counter()
+    store = load_snapshot(args.snapshot, verify=False)
+    opened = time.perf_counter() - start
+    start = time.perf_counter()
+    store.search_batch(store.embeddings[:1], n_results=5)
+    first = time.perf_counter() - start
+    print(f"✅ {args.snapshot}: checksum OK ({checked * 1000:.0f} ms); "
+          f"opened in {opened * 1000:.1f} ms, first search {first * 1000:.1f} ms, {len(store)} chunks")
+
+    if args.compare:
+        start = time.perf_counter()
+        vectorstore = AyurvedicVectorStore(args.compare)
+        ChunkTable(vectorstore).load()
+        vectorstore.search_batch(np.asarray(store.embeddings[:1]), n_results=5, include_documents=False)
+        print(f"Chroma index at {args.compare}: opened, chunk table loaded and searched in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def info(args):
+    header = read_header(args.snapshot)
+    header['sections'] = {name: f"{length} bytes @ {offset}" for name, (offset, length) in header['sections'].items()}
+    print(json.dumps(header, indent=2, ensure_ascii=False))
+
+
+def restore(args):
+    start = time.perf_counter()
+    vectorstore = AyurvedicVectorStore.import_snapshot(args.snapshot, args.target, verify=not args.no_verify)
+    print(f"Imported {vectorstore.count()} chunks into {args.target} in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-file index snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("export", help="Write a snapshot of a Chroma index")
+    command.add_argument("--vectordb", default=None, help="Vector store directory (default: VECTOR_DB_PATH)")
+    command.add_argument("--output", required=True)
+    command.set_defaults(run=export)
+
+    command = commands.add_parser("verify", help="Check a snapshot's checksum and time loading it")
+    command.add_argument("snapshot")
+    command.add_argument("--compare", default=None, help="Also time opening this Chroma index")
+    command.set_defaults(run=verify)
+
+    command = commands.add_parser("info", help="Print a snapshot's header")
+    command.add_argument("snapshot")
+    command.set_defaults(run=info)
+
+    command = commands.add_parser("import", help="Rebuild a Chroma index from a snapshot")
+    command.add_argument("snapshot")
+    command.add_argument("--target", required=True, help="New, empty vector store directory")
+    command.add_argument("--no-verify", action="store_true")
+    command.set_defaults(run=restore)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
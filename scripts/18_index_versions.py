@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Script 18: Manage Versioned Index Directories
+
+Versions live under INDEX_ROOT/versions/ and INDEX_ROOT/CURRENT names the one
+being served. Apps started with INDEX_ROOT set (scripts/04_run_app.py,
+scripts/15_run_api.py) poll CURRENT every INDEX_POLL_SECONDS and hot-swap to
+a newly published version: consultations already running finish on the old
+one, new ones use the new one, nothing restarts.
+
+scripts/02_build_vectordb.py builds and publishes a new version by itself
+when INDEX_ROOT is set. This script handles the rest:
+
+    list       versions, marking the current one
+    add        copy an existing Chroma directory or snapshot file in as a new version
+    snapshot   add a snapshot-backed copy of a version (memory-mapped, shared by workers)
+    publish    point CURRENT at a version
+    rollback   point CURRENT at the version before the current one
+    prune      delete versions older than the current one, keeping it and the N-1 before it
+               (never fewer than one, for rollback; newer, unpublished versions are kept)
+
+Usage:
+    python scripts/18_index_versions.py list
+    python scripts/18_index_versions.py add ./data/vectordb --publish
+    python scripts/18_index_versions.py snapshot --publish
+    python scripts/18_index_versions.py publish 20261019T101500
+    python scripts/18_index_versions.py rollback
+    python scripts/18_index_versions.py prune --keep 3
+"""
+
+import sys
+import shutil
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from src.rag.index_versions import IndexVersions, SNAPSHOT_FILE
+from src.rag.snapshot import read_header
+
+load_dotenv()
+
+
+def describe(versions: IndexVersions, version: str) -> str:
+    path = versions.path(version)
+    if (path / SNAPSHOT_FILE).exists():
+        header = read_header(str(path / SNAPSHOT_FILE))
+        return f"snapshot, {header['count']} chunks, {header['embedding_signature'].get('embedding_model', '?')}"
+    if versions.is_complete(version):
+        return "chroma"
+    return "incomplete"
+
+
+def list_versions(versions: IndexVersions, args):
+    current = versions.current()
+    for version in versions.list():
+        print(f"{'*' if version == current else ' '} {version}  ({describe(versions, version)})")
+    if current is None:
+        print(f"No version published under {versions.root}")
+
+
+def add(versions: IndexVersions, args):
+    source = Path(args.source)
+    version, path = versions.create(args.label)
+    if source.is_dir():
+        shutil.copytree(source, path, dirs_exist_ok=True)
+    else:
+        read_header(str(source))  # refuse anything that is not a snapshot
+        shutil.copy2(source, path / SNAPSHOT_FILE)
+    print(f"Added {source} as version {version}")
+    if args.publish:
+        versions.publish(version)
+        print(f"Published {version}")
+
+
+def snapshot(versions: IndexVersions, args):
+    base = args.version or versions.current()
+    if base is None:
+        print("No version to snapshot")
+        sys.exit(1)
+    vectorstore = versions.open(base)
+    if (versions.path(base) / SNAPSHOT_FILE).exists():
+        print(f"{base} is already a snapshot")
+        sys.exit(1)
+    version, path = versions.create(args.label or "snapshot")
+    header = vectorstore.export_snapshot(str(path / SNAPSHOT_FILE))
+    print(f"Snapshot of {base} ({header['count']} chunks) added as version {version}")
+    if args.publish:
+        versions.publish(version)
+        print(f"Published {version}")
+
+
+def publish(versions: IndexVersions, args):
+    versions.publish(args.version)
+    print(f"Published {args.version}")
+
+
+def rollback(versions: IndexVersions, args):
+    current = versions.current()
+    older = [version for version in versions.list() if current is None or version < current]
+    older = [version for version in older if versions.is_complete(version)]
+    if not older:
+        print("No earlier version to roll back to")
+        sys.exit(1)
+    versions.publish(older[-1])
+    print(f"Rolled back {current} -> {older[-1]}")
+
+
+def prune(versions: IndexVersions, args):
+    removed = versions.prune(args.keep)
+    print(f"Removed {len(removed)} version(s): {', '.join(removed) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned index directories")
+    parser.add_argument("--root", default=None, help="Index root (default: INDEX_ROOT or ./data/indexes)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list").set_defaults(run=list_versions)
+
+    command = commands.add_parser("add")
+    command.add_argument("source", help="Chroma directory or snapshot file")
+    command.add_argument("--label", default=None)
+    command.add_argument("--publish", action="store_true")
+    command.set_defaults(run=add)
+
+    command = commands.add_parser("snapshot")
+    command.add_argument("--version", default=None, help="Version to snapshot (default: current)")
+    command.add_argument("--label", default=None)
+    command.add_argument("--publish", action="store_true")
+    command.set_defaults(run=snapshot)
+
+    command = commands.add_parser("publish")
+    command.add_argument("version")
+    command.set_defaults(run=publish)
+
+    commands.add_parser("rollback").set_defaults(run=rollback)
+
+    command = commands.add_parser("prune")
+    command.add_argument("--keep", type=int, default=2)
+    command.set_defaults(run=prune)
+
+    args = parser.parse_args()
+    args.run(IndexVersions(args.root), args)
+
+
+if __name__ == "__main__":
+    main()
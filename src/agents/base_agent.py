@@ -2,13 +2,18 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
 
+from src.monitoring.tracing import span
+from src.llm.options import get_profile
+
 class BaseAgent(ABC):
-    def __init__(self, name: str, rag_retriever, llm_client, temperature: float = 0.3, max_tokens: int = 800):
+    def __init__(self, name: str, rag_retriever, llm_client, temperature: float = 0.3, max_tokens: int = None, profile: str = "default"):
         self.name = name
         self.rag_retriever = rag_retriever
         self.llm_client = llm_client
         self.temperature = temperature
-        self.max_tokens = max_tokens
+        # Decode budget, context window and timeout for this agent's stage (see src/llm/options.py)
+        self.generation_options = get_profile(profile).merged(max_tokens=max_tokens)
+        self.max_tokens = self.generation_options.max_tokens
     
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -18,7 +23,8 @@ class BaseAgent(ABC):
     def get_category_filter(self) -> Optional[str]:
         pass
     
-    def retrieve_context(self, query: str, n_results: int = 5) -> str:
+    def retrieve_context(self, query: str, n_results: int = None) -> str:
+        # k defaults to the retriever's (MAX_CHUNKS_PER_QUERY), the same k batch prefetches use
         category_filter = self.get_category_filter()
         return self.rag_retriever.build_context(query=query, n_results=n_results, category_filter=category_filter, include_metadata=True)
     
@@ -26,18 +32,14 @@ class BaseAgent(ABC):
         if context is None:
             context = self.retrieve_context(query)
         
-        if additional_info:
-            info_str = "\n".join([f"{key}: {value}" for key, value in additional_info.items()])
-            enhanced_query = f"{query}\n\nAdditional Information:\n{info_str}"
-        else:
-            enhanced_query = query
-        
+        # Earlier agents' findings go between the context and the query (see src/llm/prompts.py)
         return self.llm_client.generate_with_context(
-            query=enhanced_query, context=context, system_prompt=self.get_system_prompt(),
-            temperature=self.temperature, max_tokens=self.max_tokens
+            query=query, context=context, system_prompt=self.get_system_prompt(),
+            temperature=self.temperature, additional_info=additional_info or None, options=self.generation_options
         )
     
     def process(self, query: str, additional_info: Dict = None) -> Dict:
-        context = self.retrieve_context(query)
-        response = self.generate_response(query, context, additional_info)
+        with span("agent.process", labels={'agent': self.name}):
+            context = self.retrieve_context(query)
+            response = self.generate_response(query, context, additional_info)
         return {'agent': self.name, 'response': response, 'context': context, 'query': query}
@@ -0,0 +1,119 @@
+"""Batch Runner - Consult many queries at once with incremental, resumable JSONL output"""
+import json
+import time
+import hashlib
+import threading
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.monitoring.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def query_id(query: str) -> str:
+    """Stable id so a resumed run recognises finished queries even if the file was reordered"""
+    return "q-" + hashlib.sha1(query.strip().encode('utf-8')).hexdigest()[:12]
+
+
+def load_queries(path: str) -> List[Dict]:
+    """Read a .jsonl file of {"id"?, "query"} objects or a plain text file with one query per line"""
+    items = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if path.endswith('.jsonl'):
+            item = json.loads(line)
+            items.append({'id': item.get('id') or query_id(item['query']), 'query': item['query']})
+        else:
+            items.append({'id': query_id(line), 'query': line})
+    return items
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Ids already answered successfully in an earlier (possibly interrupted) run"""
+    done = set()
+    path = Path(output_path)
+    if not path.exists():
+        return done
+    for line in path.read_text(encoding='utf-8').splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # partial last line from an interrupted write
+        if 'error' not in record:
+            done.add(record['id'])
+    return done
+
+
+class BatchConsultationRunner:
+    """Prefetch embeddings and retrievals per chunk of queries, then run consultations in parallel.
+
+    Each chunk is embedded with one embed_batch call and retrieved with one
+    store query per agent category, so agents only wait on the LLM. Results
+    are appended to the output file as they finish.
+    """
+
+    def __init__(self, orchestrator, retriever, max_workers: int = 4, chunk_size: int = 64):
+        self.orchestrator = orchestrator
+        self.retriever = retriever
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = max(1, chunk_size)
+
+    def categories(self) -> List[Optional[str]]:
+        agents = [self.orchestrator.prakriti_agent, self.orchestrator.dosha_agent,
+                  self.orchestrator.treatment_agent, self.orchestrator.general_agent]
+        return list(dict.fromkeys(agent.get_category_filter() for agent in agents if agent is not None))
+
+    def _consult(self, item: Dict) -> Dict:
+        started = time.perf_counter()
+        record = {'id': item['id'], 'query': item['query']}
+        try:
+            with self.retriever.pinned_index():
+                result = self.orchestrator.process_query(item['query'])
+            record.update({
+                'final_response': result['final_response'],
+                'agents': [name for name, active in result['agent_activation'].items() if active is True],
+                'synthesis': result.get('synthesis'),
+            })
+        except Exception as e:
+            logger.warning(f"Query {item['id']} failed: {e}")
+            record['error'] = str(e)
+        record['seconds'] = time.perf_counter() - started
+        return record
+
+    def run(self, items: Iterable[Dict], output_path: str, resume: bool = True) -> Dict:
+        items = list(items)
+        done = completed_ids(output_path) if resume else set()
+        pending = [item for item in items if item['id'] not in done]
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        summary = {'total': len(items), 'skipped': len(items) - len(pending), 'succeeded': 0, 'failed': 0}
+        write_lock = threading.Lock()
+        started = time.perf_counter()
+        categories = self.categories()
+
+        with open(output, 'a' if resume else 'w', encoding='utf-8') as out, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool:
+            for start in range(0, len(pending), self.chunk_size):
+                chunk = pending[start:start + self.chunk_size]
+                with span("batch.chunk", queries=len(chunk)):
+                    self.retriever.prefetch([item['query'] for item in chunk], categories)
+                    futures = [pool.submit(self._consult, item) for item in chunk]
+                    for future in as_completed(futures):
+                        record = future.result()
+                        with write_lock:
+                            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                            out.flush()
+                        summary['failed' if 'error' in record else 'succeeded'] += 1
+                    self.retriever.clear_prefetch()
+                logger.info(f"Batch progress: {summary['succeeded'] + summary['failed']}/{len(pending)}")
+
+        summary['seconds'] = time.perf_counter() - started
+        processed = summary['succeeded'] + summary['failed']
+        summary['queries_per_sec'] = processed / summary['seconds'] if processed else 0.0
+        return summary
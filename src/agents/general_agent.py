@@ -0,0 +1,13 @@
+"""General Agent - Direct answers for definitional questions"""
+from .base_agent import BaseAgent
+from typing import Optional
+
+class GeneralAgent(BaseAgent):
+    def __init__(self, rag_retriever, llm_client):
+        super().__init__(name="Ayurveda Reference", rag_retriever=rag_retriever, llm_client=llm_client, temperature=0.2, profile="general")
+
+    def get_system_prompt(self) -> str:
+        return """You are a knowledgeable guide to classical Ayurvedic texts. Answer the question directly and concisely using the provided context, citing the section and chapter where relevant. Keep it clear and compassionate."""
+
+    def get_category_filter(self) -> Optional[str]:
+        return None
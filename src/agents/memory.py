@@ -0,0 +1,192 @@
+"""Conversation Memory - Bounded per-session history with a rolling summary"""
+import os
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+import tiktoken
+
+from src.rag.working_set import SessionWorkingSet
+
+logger = logging.getLogger(__name__)
+
+# Words that mean the user is giving new evidence, so a remembered assessment should be redone
+REASSESS_TERMS = {
+    'prakriti': ('constitution', 'prakriti', 'body type', 'naturally', 'always been', 'since childhood', 'reassess'),
+    'dosha': ('symptom', 'now i', 'recently', 'new', 'started', 'worse', 'pain', 'feel', 'reassess'),
+}
+
+
+# Rough size of a token in characters, for when the tokenizer cannot be loaded
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """cl100k_base, or None if it cannot be loaded: tiktoken downloads it on first use, which fails
+    offline unless TIKTOKEN_CACHE_DIR points at a copy; budgets then use an approximate count"""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable ({e}); approximating memory token counts. "
+                       "Set TIKTOKEN_CACHE_DIR to a cached cl100k_base for exact budgets.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def _tail_tokens(text: str, budget: int) -> str:
+    """Keep the last `budget` tokens of text"""
+    encoding = _encoding()
+    if encoding is None:
+        return text[-budget * CHARS_PER_TOKEN:] if budget > 0 else ""
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= budget else encoding.decode(tokens[-budget:])
+
+
+class ConversationMemory:
+    """Last turns within a token budget, a summary of older turns, and remembered assessments.
+
+    Holds plain data only (no clients), so it can live in per-session UI state,
+    together with the session's retrieval working set.
+    Turns pushed out of the budget are folded into the summary by the
+    `summarize(previous_summary, turns)` callable given to add_turn.
+    """
+
+    def __init__(self, max_history_tokens: int = None, max_turns: int = None, summary_tokens: int = None,
+                 dosha_ttl_turns: int = None):
+        if max_history_tokens is None:
+            max_history_tokens = int(os.getenv("MEMORY_HISTORY_TOKENS", "1200"))
+        if max_turns is None:
+            max_turns = int(os.getenv("MEMORY_MAX_TURNS", "6"))
+        if summary_tokens is None:
+            summary_tokens = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+        if dosha_ttl_turns is None:
+            dosha_ttl_turns = int(os.getenv("MEMORY_DOSHA_TTL_TURNS", "3"))
+
+        self.max_history_tokens = max_history_tokens
+        self.max_turns = max_turns
+        self.summary_tokens = summary_tokens
+        # Constitution is lifelong; an imbalance assessment goes stale after a few turns
+        self.ttl_turns = {'prakriti': None, 'dosha': dosha_ttl_turns}
+
+        self.turns: deque = deque()
+        self.summary = ""
+        self.turn_count = 0
+        self.assessments: Dict[str, Dict] = {}
+        # Chunks this session already retrieved, reused for follow-up questions
+        self.working_set = SessionWorkingSet() if os.getenv("WORKING_SET", "true").lower() == "true" else None
+
+    def __len__(self) -> int:
+        return self.turn_count
+
+    @property
+    def history_tokens(self) -> int:
+        return sum(turn['tokens'] for turn in self.turns)
+
+    def reusable_assessments(self, query: str) -> Dict[str, str]:
+        """Remembered prakriti/dosha conclusions that still hold for this query"""
+        query_lower = query.lower()
+        reusable = {}
+        for key, assessment in self.assessments.items():
+            ttl = self.ttl_turns.get(key)
+            if ttl is not None and self.turn_count - assessment['turn'] >= ttl:
+                continue
+            if any(term in query_lower for term in REASSESS_TERMS.get(key, ())):
+                continue
+            reusable[key] = assessment['text']
+        return reusable
+
+    def render(self) -> str:
+        """Summary plus recent turns, for the agents' additional information"""
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation: {self.summary}")
+        for turn in self.turns:
+            parts.append(f"User: {turn['query']}\nAyurMind: {turn['response']}")
+        return "\n\n".join(parts)
+
+    def add_turn(self, query: str, result: Dict, summarize: Optional[Callable[[str, List[Dict]], str]] = None):
+        self.turn_count += 1
+        for key in ('prakriti', 'dosha'):
+            if key in result.get('agent_responses', {}) and key not in result.get('reused', ()):
+                self.assessments[key] = {'text': result['agent_responses'][key], 'turn': self.turn_count}
+
+        response = result['final_response']
+        self.turns.append({'query': query, 'response': response, 'tokens': count_tokens(query) + count_tokens(response)})
+
+        evicted = []
+        while self.turns and (len(self.turns) > self.max_turns or self.history_tokens > self.max_history_tokens):
+            evicted.append(self.turns.popleft())
+        if evicted:
+            self._fold(evicted, summarize)
+
+    def _fold(self, evicted: List[Dict], summarize):
+        summary = None
+        if summarize is not None:
+            try:
+                summary = summarize(self.summary, evicted)
+            except Exception:
+                summary = None  # keep the conversation going with the extractive fallback
+        if not summary:
+            asked = "; ".join(turn['query'] for turn in evicted)
+            summary = f"{self.summary} Earlier the user asked: {asked}.".strip()
+        self.summary = _tail_tokens(summary, self.summary_tokens)
+
+    def to_dict(self) -> Dict:
+        """JSON-safe conversation state, so a client can carry it between stateless API workers"""
+        return {'summary': self.summary, 'turn_count': self.turn_count, 'turns': list(self.turns),
+                'assessments': self.assessments}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "ConversationMemory":
+        """Rebuild memory from client-held state (ValueError if malformed), within this process's budgets"""
+        # The retrieval working set is not carried over; it refills after a few turns
+        if not isinstance(state, dict):
+            raise ValueError("Invalid conversation memory: expected an object")
+        summary = state.get('summary', "")
+        turn_count = state.get('turn_count', 0)
+        turns = state.get('turns', [])
+        assessments = state.get('assessments', {})
+        if not isinstance(summary, str):
+            raise ValueError("Invalid conversation memory: 'summary' must be a string")
+        if not isinstance(turn_count, int) or isinstance(turn_count, bool) or turn_count < 0:
+            raise ValueError("Invalid conversation memory: 'turn_count' must be a non-negative integer")
+        if not isinstance(turns, list) or not isinstance(assessments, dict):
+            raise ValueError("Invalid conversation memory: 'turns' must be a list and 'assessments' an object")
+        for turn in turns:
+            if not (isinstance(turn, dict) and isinstance(turn.get('query'), str) and isinstance(turn.get('response'), str)):
+                raise ValueError("Invalid conversation memory: every turn needs string 'query' and 'response'")
+        for key, assessment in assessments.items():
+            if key not in REASSESS_TERMS or not (isinstance(assessment, dict) and isinstance(assessment.get('text'), str)
+                                                 and isinstance(assessment.get('turn'), int)):
+                raise ValueError(f"Invalid conversation memory: bad assessment {key!r}")
+
+        memory = cls()
+        memory.summary = _tail_tokens(summary, memory.summary_tokens)
+        memory.turn_count = max(turn_count, len(turns))
+        memory.assessments = {key: {'text': value['text'], 'turn': value['turn']} for key, value in assessments.items()}
+        # Token counts are recomputed, and the turn and token budgets applied, as add_turn would
+        evicted = turns[:-memory.max_turns] if memory.max_turns > 0 else list(turns)
+        for turn in turns[len(evicted):]:
+            memory.turns.append({'query': turn['query'], 'response': turn['response'],
+                                 'tokens': count_tokens(turn['query']) + count_tokens(turn['response'])})
+        evicted = [{'query': turn['query']} for turn in evicted]
+        while memory.turns and memory.history_tokens > memory.max_history_tokens:
+            evicted.append(memory.turns.popleft())
+        if evicted:
+            memory._fold(evicted, None)
+        return memory
+
+    def clear(self):
+        self.turns.clear()
+        self.summary = ""
+        self.turn_count = 0
+        self.assessments = {}
+        if self.working_set is not None:
+            self.working_set = SessionWorkingSet(self.working_set.max_chunks, self.working_set.slack)
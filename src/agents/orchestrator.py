@@ -2,15 +2,37 @@
 import os
 from typing import Dict, List
 
+from src.monitoring.tracing import span
+from src.llm.options import get_profile
+from src.rag.working_set import use_working_set
+from .memory import ConversationMemory
+from .synthesis import get_synthesis_policy, template_merge, record_saved, PASS_THROUGH, TEMPLATE
+
 class OrchestratorAgent:
-    def __init__(self, prakriti_agent, dosha_agent, treatment_agent, llm_client):
+    def __init__(self, prakriti_agent, dosha_agent, treatment_agent, llm_client, router=None, general_agent=None, synthesis_policy=None):
         self.prakriti_agent = prakriti_agent
         self.dosha_agent = dosha_agent
         self.treatment_agent = treatment_agent
         self.llm_client = llm_client
+        self.router = router
+        self.general_agent = general_agent
+        self.synthesis_policy = synthesis_policy or get_synthesis_policy()
         self.temperature = float(os.getenv("ORCHESTRATOR_TEMP", "0.2"))
+        self.synthesis_options = get_profile("synthesis")
+        self.summary_options = get_profile("summary")
     
     def analyze_query(self, query: str) -> Dict:
+        if self.router is not None:
+            activation = self.router.route(query)
+            if activation['direct'] and self.general_agent is None:
+                # No fast-path agent configured; fall back to the best specialist
+                best = max(('prakriti', 'dosha', 'treatment'), key=lambda intent: activation['scores'][intent])
+                activation.update({'direct': False, best: True})
+            return activation
+        return self.keyword_activation(query)
+    
+    @staticmethod
+    def keyword_activation(query: str) -> Dict:
         query_lower = query.lower()
         needs_prakriti = any(term in query_lower for term in ['constitution', 'prakriti', 'vata', 'pitta', 'kapha', 'body type'])
         needs_dosha = any(term in query_lower for term in ['symptom', 'problem', 'pain', 'disorder', 'disease', 'sick', 'imbalance'])
@@ -19,34 +41,69 @@ class OrchestratorAgent:
         if not (needs_prakriti or needs_dosha or needs_treatment):
             needs_prakriti = needs_dosha = needs_treatment = True
         
-        return {'prakriti': needs_prakriti, 'dosha': needs_dosha, 'treatment': needs_treatment}
+        return {'prakriti': needs_prakriti, 'dosha': needs_dosha, 'treatment': needs_treatment, 'direct': False}
+    
+    def process_query(self, query: str, conversation_history: List[Dict] = None, memory: ConversationMemory = None) -> Dict:
+        working_set = memory.working_set if memory is not None else None
+        with span("orchestrator.process_query") as query_span, use_working_set(working_set):
+            result = self._process_query(query, conversation_history, memory)
+            query_span.set('agents', [name for name, active in result['agent_activation'].items() if active is True])
+            if result['reused']:
+                query_span.set('reused', result['reused'])
+            if memory is not None:
+                memory.add_turn(query, result, summarize=self.summarize_turns)
+            return result
     
-    def process_query(self, query: str, conversation_history: List[Dict] = None) -> Dict:
+    def _process_query(self, query: str, conversation_history: List[Dict] = None, memory: ConversationMemory = None) -> Dict:
         agent_activation = self.analyze_query(query)
         results = {}
         
-        if agent_activation['prakriti']:
-            prakriti_result = self.prakriti_agent.process(query)
+        # Earlier turns reach every agent; still-valid assessments are reused instead of regenerated,
+        # but only as context for the agents that run: a remembered answer is never this turn's answer
+        conversation = {'Conversation So Far': memory.render()} if memory is not None and len(memory) else {}
+        remembered = memory.reusable_assessments(query) if memory is not None else {}
+        activated = [key for key in ('prakriti', 'dosha', 'treatment') if agent_activation.get(key)]
+        reused = [key for key in activated if key in remembered]
+        if reused and len(reused) == len(activated):
+            reused.pop()  # the last of them runs again, with the others as its context
+        
+        if agent_activation.get('direct'):
+            general_result = self.general_agent.process(query, conversation)
+            return {'query': query, 'agent_responses': {'general': general_result['response']}, 'final_response': general_result['response'], 'agent_activation': agent_activation, 'synthesis': PASS_THROUGH, 'reused': reused}
+        
+        if agent_activation['prakriti'] and 'prakriti' not in reused:
+            prakriti_result = self.prakriti_agent.process(query, conversation)
             results['prakriti'] = prakriti_result['response']
         
-        if agent_activation['dosha']:
-            additional_info = {'Prakriti Assessment': results['prakriti']} if 'prakriti' in results else {}
+        prakriti = results.get('prakriti') or remembered.get('prakriti')
+        if agent_activation['dosha'] and 'dosha' not in reused:
+            additional_info = dict(conversation)
+            if prakriti:
+                additional_info['Prakriti Assessment'] = prakriti
             dosha_result = self.dosha_agent.process(query, additional_info)
             results['dosha'] = dosha_result['response']
         
+        dosha = results.get('dosha') or remembered.get('dosha')
         if agent_activation['treatment']:
-            additional_info = {}
-            if 'prakriti' in results:
-                additional_info['Prakriti'] = results['prakriti']
-            if 'dosha' in results:
-                additional_info['Dosha Imbalance'] = results['dosha']
+            additional_info = dict(conversation)
+            if prakriti:
+                additional_info['Prakriti'] = prakriti
+            if dosha:
+                additional_info['Dosha Imbalance'] = dosha
             
             treatment_result = self.treatment_agent.process(query, additional_info)
             results['treatment'] = treatment_result['response']
         
-        synthesized_response = self.synthesize_response(query, results)
+        synthesis_mode = self.synthesis_policy.decide(results)
+        record_saved(synthesis_mode)
+        if synthesis_mode == PASS_THROUGH:
+            synthesized_response = next(iter(results.values()))
+        elif synthesis_mode == TEMPLATE:
+            synthesized_response = template_merge(query, results)
+        else:
+            synthesized_response = self.synthesize_response(query, results)
         
-        return {'query': query, 'agent_responses': results, 'final_response': synthesized_response, 'agent_activation': agent_activation}
+        return {'query': query, 'agent_responses': results, 'final_response': synthesized_response, 'agent_activation': agent_activation, 'synthesis': synthesis_mode, 'reused': reused}
     
     def synthesize_response(self, query: str, agent_results: Dict) -> str:
         synthesis_context = "Agent Analyses:\n\n"
@@ -60,10 +117,20 @@ class OrchestratorAgent:
         
         system_prompt = """You are the Orchestrator synthesizing Ayurvedic consultation. Create a unified, holistic report. Keep it clear and compassionate."""
         
-        synthesis_prompt = f"""Original Query: {query}\n\n{synthesis_context}\n\nPlease synthesize the above analyses into a cohesive consultation response."""
+        # Query last so the fixed system prompt and the analyses form the cacheable prefix
+        synthesis_prompt = f"""{synthesis_context}Original Query: {query}\n\nPlease synthesize the above analyses into a cohesive consultation response."""
         
-        return self.llm_client.generate(prompt=synthesis_prompt, system_prompt=system_prompt, temperature=self.temperature, max_tokens=1200)
+        with span("orchestrator.synthesize", agents=len(agent_results)):
+            return self.llm_client.generate(prompt=synthesis_prompt, system_prompt=system_prompt, temperature=self.temperature, options=self.synthesis_options)
+    
+    def summarize_turns(self, previous_summary: str, turns: List[Dict]) -> str:
+        """Fold turns that left the memory window into the running summary"""
+        transcript = "\n\n".join(f"User: {turn['query']}\nAyurMind: {turn['response']}" for turn in turns)
+        system_prompt = """You maintain a running summary of an Ayurvedic consultation. Merge the new exchanges into the summary, keeping the user's traits, symptoms, assessments and advice given. Reply with the updated summary only."""
+        prompt = f"""Current summary: {previous_summary or '(none yet)'}\n\nNew exchanges:\n{transcript}\n\nUpdated summary:"""
+        with span("orchestrator.summarize", turns=len(turns)):
+            return self.llm_client.generate(prompt=prompt, system_prompt=system_prompt, temperature=0.1, options=self.summary_options)
     
-    def simple_query(self, query: str) -> str:
-        result = self.process_query(query)
+    def simple_query(self, query: str, memory: ConversationMemory = None) -> str:
+        result = self.process_query(query, memory=memory)
         return result['final_response']
@@ -0,0 +1,127 @@
+"""Query Router - Pick agents by comparing the query embedding to intent prototypes"""
+import os
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+AGENT_INTENTS = ('prakriti', 'dosha', 'treatment')
+
+# A handful of representative queries per intent; their normalised mean is the centroid
+INTENT_PROTOTYPES = {
+    'prakriti': [
+        "What is my body constitution?",
+        "I am thin with dry skin and a racing mind, what is my prakriti?",
+        "I gain weight easily, have oily skin and a calm temperament. What might my dominant dosha be?",
+        "How is an individual's constitution determined?",
+        "Which dosha type am I based on my traits?",
+        "Am I vata, pitta or kapha?",
+    ],
+    'dosha': [
+        "I have acid reflux, skin rashes and irritability",
+        "I feel sluggish, heavy and congested every morning",
+        "I suffer from anxiety, insomnia and cracking joints",
+        "Which dosha imbalance causes a burning sensation in my chest?",
+        "What are the causes and premonitory signs of fever?",
+        "My digestion is slow and I feel bloated after meals",
+    ],
+    'treatment': [
+        "What foods should I eat to improve my sleep?",
+        "Which herbs help with anxiety?",
+        "Suggest a diet and lifestyle plan to bring me back to balance",
+        "What is the recommended purification therapy for a kapha imbalance?",
+        "How can I treat my digestive problems naturally?",
+        "What remedies are recommended for diarrhea?",
+    ],
+    'direct': [
+        "What is Ayurveda?",
+        "What does the Sutra Sthana cover?",
+        "Explain the concept of tridosha",
+        "What are the six tastes in Ayurveda?",
+        "Define agni",
+        "What is the meaning of dinacharya?",
+        "Describe the five stages of disease pathogenesis",
+    ],
+}
+
+
+class IntentRouter:
+    """Prototype (nearest-centroid) router over the already-computed query embedding.
+
+    Agents whose centroid similarity reaches `agent_threshold` and lies within
+    `agent_margin` of the best agent are activated (always at least the best
+    one). When the 'direct' centroid beats every agent by `direct_margin`, the
+    query is answered in one generation without specialist agents.
+    """
+
+    def __init__(self, retriever, prototypes: Optional[Dict[str, List[str]]] = None,
+                 agent_threshold: float = None, agent_margin: float = None, direct_margin: float = None):
+        if agent_threshold is None:
+            agent_threshold = float(os.getenv("ROUTER_AGENT_THRESHOLD", "0.35"))
+        if agent_margin is None:
+            agent_margin = float(os.getenv("ROUTER_AGENT_MARGIN", "0.05"))
+        if direct_margin is None:
+            direct_margin = float(os.getenv("ROUTER_DIRECT_MARGIN", "0.03"))
+
+        self.retriever = retriever
+        self.prototypes = prototypes or INTENT_PROTOTYPES
+        self.agent_threshold = agent_threshold
+        self.agent_margin = agent_margin
+        self.direct_margin = direct_margin
+
+        self.intents: List[str] = list(self.prototypes)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    rows = []
+                    generator = self.retriever.embedding_generator
+                    for intent in self.intents:
+                        embeddings = np.asarray(generator.embed_batch(self.prototypes[intent], show_progress_bar=False),
+                                                dtype=np.float32)
+                        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+                        centroid = embeddings.mean(axis=0)
+                        rows.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = np.vstack(rows)
+        return self._centroids
+
+    def scores(self, query: str) -> Dict[str, float]:
+        embedding = np.asarray(self.retriever.embed_query(query), dtype=np.float32)
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        similarities = self.centroids @ embedding
+        return {intent: float(score) for intent, score in zip(self.intents, similarities)}
+
+    def route(self, query: str) -> Dict:
+        scores = self.scores(query)
+        agent_scores = {intent: scores[intent] for intent in AGENT_INTENTS if intent in scores}
+        best_agent = max(agent_scores, key=agent_scores.get)
+        best_score = agent_scores[best_agent]
+
+        if 'direct' in scores and scores['direct'] >= best_score + self.direct_margin:
+            activation = {intent: False for intent in AGENT_INTENTS}
+            activation['direct'] = True
+        else:
+            activation = {
+                intent: intent == best_agent or (
+                    score >= self.agent_threshold and score >= best_score - self.agent_margin)
+                for intent, score in agent_scores.items()
+            }
+            activation['direct'] = False
+
+        activation['scores'] = scores
+        return activation
+
+
+def count_generations(activation: Dict, synthesize_single: bool = False) -> int:
+    """Upper bound on LLM calls for this activation: agents plus synthesis.
+
+    The default adaptive synthesis policy passes a lone agent's answer through,
+    so a single agent costs one call unless `synthesize_single` is set.
+    """
+    if activation.get('direct'):
+        return 1
+    agents = sum(1 for intent in AGENT_INTENTS if activation.get(intent))
+    return agents + (1 if agents > 1 or synthesize_single else 0)
@@ -0,0 +1,91 @@
+"""Synthesis Policy - Decide whether a consultation needs an LLM synthesis pass"""
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict
+
+from src.monitoring.metrics import REGISTRY
+
+PASS_THROUGH = 'pass_through'
+TEMPLATE = 'template'
+LLM = 'llm'
+
+SECTION_TITLES = {
+    'prakriti': "Constitutional Assessment",
+    'dosha': "Imbalance Analysis",
+    'treatment': "Treatment Recommendations",
+}
+
+_NUMBERED_ITEM = re.compile(r'^\s*(?:\*\*)?\d+[.)]', re.MULTILINE)
+
+_generations_saved = REGISTRY.counter(
+    "ayurmind_synthesis_generations_saved_total", "LLM synthesis calls skipped by the synthesis policy")
+
+
+def is_structured(response: str, min_items: int = 2) -> bool:
+    """True when a response follows the agents' numbered 'Format: 1. ... 2. ...' layout"""
+    return len(_NUMBERED_ITEM.findall(response)) >= min_items
+
+
+class SynthesisPolicy(ABC):
+    name = "base"
+
+    @abstractmethod
+    def decide(self, agent_results: Dict[str, str]) -> str:
+        """Return PASS_THROUGH, TEMPLATE or LLM for these agent responses"""
+        pass
+
+
+class AlwaysSynthesizePolicy(SynthesisPolicy):
+    """Previous behaviour: always run the LLM synthesis"""
+    name = "llm"
+
+    def decide(self, agent_results: Dict[str, str]) -> str:
+        return LLM
+
+
+class AdaptiveSynthesisPolicy(SynthesisPolicy):
+    """Pass a lone agent's answer through, merge structured multi-agent answers by template,
+    and only fall back to LLM synthesis for free-form responses."""
+    name = "adaptive"
+
+    def __init__(self, allow_template: bool = True):
+        self.allow_template = allow_template
+
+    def decide(self, agent_results: Dict[str, str]) -> str:
+        if len(agent_results) <= 1:
+            return PASS_THROUGH
+        if self.allow_template and all(is_structured(response) for response in agent_results.values()):
+            return TEMPLATE
+        return LLM
+
+
+POLICIES = {
+    'adaptive': AdaptiveSynthesisPolicy,
+    'llm': AlwaysSynthesizePolicy,
+    'single': lambda: AdaptiveSynthesisPolicy(allow_template=False),
+}
+
+
+def get_synthesis_policy(name: str = None) -> SynthesisPolicy:
+    if name is None:
+        name = os.getenv("SYNTHESIS_POLICY", "adaptive")
+    name = name.lower()
+    if name not in POLICIES:
+        raise ValueError(f"Unknown synthesis policy '{name}'. Choose one of: {', '.join(POLICIES)}")
+    return POLICIES[name]()
+
+
+def template_merge(query: str, agent_results: Dict[str, str]) -> str:
+    """Join agent sections under fixed headings, in consultation order"""
+    parts = []
+    for key, title in SECTION_TITLES.items():
+        if key in agent_results:
+            parts.append(f"## {title}\n\n{agent_results[key].strip()}")
+    parts.append("_This guidance is educational and drawn from classical texts; please consult a qualified practitioner._")
+    return "\n\n".join(parts)
+
+
+def record_saved(mode: str):
+    if mode != LLM:
+        _generations_saved.inc()
@@ -0,0 +1,155 @@
+"""
+HTTP API - Headless JSON/SSE serving of consultations and retrieval
+
+    POST /v1/consult    {"query", "session_id"?, "memory"?, "stream"?}
+    POST /v1/retrieve   {"query", "category"?, "k"?}
+    GET  /health        liveness plus index, scheduler and process memory
+    GET  /metrics       Prometheus text format (this worker's registry)
+
+Each worker process builds its own AyurMindService. Conversation memory is
+kept per worker and also returned to the client as "memory"; sending it back
+on the next turn lets any worker behind a load balancer continue the
+conversation. With "stream": true the consultation is sent as Server-Sent
+Events: "status" events while it is queued or running, then one "result"
+(or "error") event. Closing the stream cancels the consultation.
+
+Run with scripts/15_run_api.py (uvicorn, several workers).
+"""
+
+import json
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.llm.scheduler import QueueFullError
+from src.monitoring.metrics import REGISTRY, render_prometheus
+from src.monitoring.memory import record_process_memory
+
+logger = logging.getLogger(__name__)
+
+STATUS_INTERVAL = 0.5
+
+
+class ConsultRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    session_id: Optional[str] = None
+    memory: Optional[Dict] = None
+    stream: bool = False
+
+
+class RetrieveRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    category: Optional[str] = None
+    k: Optional[int] = Field(None, ge=1, le=50)
+
+
+def consultation_payload(result: Dict, session_id: str, memory) -> Dict:
+    return {
+        'session_id': session_id,
+        'final_response': result['final_response'],
+        'agents': [name for name, active in result['agent_activation'].items() if active is True],
+        'agent_responses': result.get('agent_responses', {}),
+        'synthesis': result.get('synthesis'),
+        'reused': list(result.get('reused', ())),
+        'memory': memory.to_dict(),
+    }
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _busy(error: Exception) -> JSONResponse:
+    return JSONResponse({'error': str(error)}, status_code=503, headers={'Retry-After': "1"})
+
+
+def create_app(service=None) -> FastAPI:
+    """App factory (uvicorn --factory); the service is built at startup unless one is given"""
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if app.state.service is None:
+            from .service import AyurMindService
+            app.state.service = await run_in_threadpool(AyurMindService)
+        yield
+
+    app = FastAPI(title="AyurMind API", version="1.0", lifespan=lifespan)
+    app.state.service = service
+
+    @app.middleware("http")
+    async def record_latency(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        # The route template, not the raw path, so scanners and 404s cannot create new series
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        labels = {'path': path, 'status': str(response.status_code)}
+        REGISTRY.counter("ayurmind_api_requests_total", "API requests", labels=labels).inc()
+        REGISTRY.histogram("ayurmind_api_request_seconds", "API request latency (to first byte for streams)",
+                           labels={'path': path}).observe(time.perf_counter() - started)
+        return response
+
+    @app.post("/v1/consult")
+    async def consult(body: ConsultRequest, request: Request):
+        service = app.state.service
+        session_id = body.session_id or uuid.uuid4().hex
+        try:
+            memory = service.sessions.get(session_id, body.memory)
+        except ValueError as e:
+            return JSONResponse({'error': str(e), 'session_id': session_id}, status_code=400)
+        if body.stream:
+            return StreamingResponse(_consult_events(service, body.query, session_id, memory, request),
+                                     media_type="text/event-stream", headers={'Cache-Control': "no-cache"})
+        try:
+            with service.consultation(body.query, session_id, memory) as future:
+                result = await asyncio.wrap_future(future)
+        except QueueFullError as e:
+            return _busy(e)
+        except Exception as e:
+            logger.exception(f"Consultation failed for session {session_id}")
+            return JSONResponse({'error': str(e), 'session_id': session_id}, status_code=500)
+        return consultation_payload(result, session_id, memory)
+
+    async def _consult_events(service, query: str, session_id: str, memory, request: Request):
+        try:
+            with service.consultation(query, session_id, memory) as future:
+                wrapped = asyncio.wrap_future(future)
+                while True:
+                    done, _ = await asyncio.wait({wrapped}, timeout=STATUS_INTERVAL)
+                    if done:
+                        break
+                    if await request.is_disconnected():
+                        return  # leaving the block with the work pending cancels it
+                    queued = service.scheduler.stats()['queued']
+                    yield _sse("status", {'state': "queued" if queued else "running", 'queued': queued})
+                result = wrapped.result()
+            yield _sse("result", consultation_payload(result, session_id, memory))
+        except QueueFullError as e:
+            yield _sse("error", {'error': str(e), 'status': 503})
+        except Exception as e:
+            logger.exception(f"Consultation failed for session {session_id}")
+            yield _sse("error", {'error': str(e), 'status': 500})
+
+    @app.post("/v1/retrieve")
+    async def retrieve(body: RetrieveRequest):
+        chunks = await run_in_threadpool(app.state.service.retriever.retrieve, body.query, body.k, body.category)
+        return {'query': body.query, 'category': body.category,
+                'chunks': [{**chunk.to_dict(), 'source': chunk.source} for chunk in chunks]}
+
+    @app.get("/health")
+    async def health():
+        return await run_in_threadpool(app.state.service.health)
+
+    @app.get("/metrics")
+    async def metrics():
+        record_process_memory()
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    return app
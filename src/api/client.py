@@ -0,0 +1,60 @@
+"""API Client - Talk to a running AyurMind HTTP API (used by the Gradio UI when AYURMIND_API_URL is set)"""
+import os
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+import requests
+
+
+class APIError(RuntimeError):
+    """Raised for error responses and error events from the API"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AyurMindAPIClient:
+    def __init__(self, base_url: str = None, timeout: float = None):
+        if base_url is None:
+            base_url = os.getenv("AYURMIND_API_URL", "http://127.0.0.1:8000")
+        if timeout is None:
+            timeout = float(os.getenv("AYURMIND_API_TIMEOUT", "330"))
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise APIError(response.json().get('error', response.text), response.status_code)
+        return response.json()
+
+    def consult(self, query: str, session_id: str = None, memory: Optional[Dict] = None) -> Dict:
+        return self._post("/v1/consult", {'query': query, 'session_id': session_id, 'memory': memory})
+
+    def consult_stream(self, query: str, session_id: str = None, memory: Optional[Dict] = None) -> Iterator[Tuple[str, Dict]]:
+        """Yield ("status", {...}) events, then ("result", payload); raises APIError on an error event"""
+        payload = {'query': query, 'session_id': session_id, 'memory': memory, 'stream': True}
+        with self.session.post(f"{self.base_url}/v1/consult", json=payload, stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise APIError(response.text, response.status_code)
+            event, data = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and event:
+                    body = json.loads("\n".join(data)) if data else {}
+                    if event == "error":
+                        raise APIError(body.get('error', "consultation failed"), body.get('status'))
+                    yield event, body
+                    event, data = None, []
+
+    def retrieve(self, query: str, category: Optional[str] = None, k: Optional[int] = None) -> List[Dict]:
+        return self._post("/v1/retrieve", {'query': query, 'category': category, 'k': k})['chunks']
+
+    def health(self) -> Dict:
+        response = self.session.get(f"{self.base_url}/health", timeout=10)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,168 @@
+"""
+Preload-then-fork Serving - One copy of the model and index for all API workers
+
+uvicorn's own workers are spawned processes that each load the embedding
+model and open the index, so N workers cost N copies. Here the parent loads
+the shared, read-only parts once (embedding model weights, the index as an
+InMemoryVectorStore or the mapped VECTOR_SNAPSHOT file, the hierarchical
+index if enabled), then fork()s the workers, which inherit those pages
+copy-on-write. Each worker builds only
+its own mutable parts (micro-batcher, LLM scheduler, agents, sessions) and
+serves the listening socket the parent bound.
+
+What keeps the shared pages shared:
+- gc.disable() while preloading and gc.freeze() before forking, so no
+  collection in a worker writes to the GC headers of inherited objects
+  (workers re-enable gc for their own objects);
+- the in-memory index keeps embeddings, texts and metadata in a few large
+  buffers instead of per-chunk objects whose refcounts would be written;
+- torch runs with one intra-op thread in the parent and never encodes
+  there, so no OpenMP pool exists at fork time (libgomp does not survive a
+  fork); each worker then sets TORCH_THREADS_PER_WORKER threads
+  (default: cores / workers) before its first encode.
+
+The ONNX backend starts its thread pool when the session is created, so with
+EMBEDDING_BACKEND=onnx the model is loaded per worker and only the index is
+shared. With versioned indexes (INDEX_ROOT) each worker swaps to a newly
+published version on its own; publish snapshot versions to keep the new
+index shared too (through the page cache). Linux/macOS only (os.fork).
+"""
+
+import gc
+import os
+import time
+import signal
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# A worker that exits sooner than this after starting is taken as a startup failure, not restarted
+MIN_WORKER_UPTIME = 10.0
+
+
+def torch_threads_per_worker(workers: int) -> int:
+    return int(os.getenv("TORCH_THREADS_PER_WORKER", str(max(1, (os.cpu_count() or 1) // max(1, workers)))))
+
+
+def set_torch_threads(threads: int):
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+class SharedResources:
+    """Read-only components loaded once in the parent and inherited by every worker"""
+
+    def __init__(self, vectorstore, embedding_generator=None, hierarchy=None):
+        self.vectorstore = vectorstore
+        self.embedding_generator = embedding_generator
+        self.hierarchy = hierarchy
+
+
+def preload() -> SharedResources:
+    """Load the index (and the embedding model unless it is not fork-safe) without starting any threads"""
+    gc.disable()
+    set_torch_threads(1)
+
+    from src.rag.embeddings import EmbeddingGenerator
+    from src.rag.memory_store import InMemoryVectorStore
+    from src.rag.snapshot import open_vectorstore
+    from src.rag.hierarchy import HierarchicalIndex
+
+    vectorstore = open_vectorstore()
+    if not isinstance(vectorstore, InMemoryVectorStore):
+        chroma = vectorstore
+        vectorstore = InMemoryVectorStore.from_vectorstore(chroma)
+        # Workers must not inherit the Chroma client's SQLite handles or its threads
+        chroma.close()
+
+    embedding_generator = None
+    if os.getenv("EMBEDDING_BACKEND", "torch").lower() == "onnx":
+        logger.warning("ONNX Runtime sessions are not fork-safe; each worker loads its own embedding model")
+    else:
+        embedding_generator = EmbeddingGenerator()
+        vectorstore.ensure_compatible(embedding_generator.get_signature())
+
+    hierarchy = None
+    if os.getenv("HIERARCHICAL_RETRIEVAL", "false").lower() == "true":
+        hierarchy = HierarchicalIndex.load_current(vectorstore)
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded {len(vectorstore)} chunks ({vectorstore.nbytes / 2**20:.1f} MiB), "
+                f"{gc.get_freeze_count()} objects frozen")
+    return SharedResources(vectorstore, embedding_generator, hierarchy)
+
+
+def _run_worker(shared: SharedResources, sock, threads: int, log_level: str):
+    import uvicorn
+    from .app import create_app
+    from .service import AyurMindService
+
+    gc.enable()
+    set_torch_threads(threads)
+    service = AyurMindService(shared.vectorstore, shared.embedding_generator, shared.hierarchy)
+    config = uvicorn.Config(create_app(service), log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info"):
+    """Preload, bind, fork `workers` servers and supervise them until SIGINT/SIGTERM"""
+    import uvicorn
+
+    threads = torch_threads_per_worker(workers)
+    shared = preload()
+    sock = uvicorn.Config("src.api.app:create_app", host=host, port=port).bind_socket()
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                _run_worker(shared, sock, threads, log_level)
+            except BaseException:
+                logger.exception("API worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+        logger.info(f"Started API worker {pid} ({threads} torch threads)")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    logger.info(f"Serving on http://{host}:{port} with {workers} preforked workers (parent {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            logger.error(f"API worker {pid} exited during startup ({code}); stopping")
+            stop(None, None)
+        else:
+            logger.warning(f"API worker {pid} exited ({code}); restarting it")
+            spawn()
+    sock.close()
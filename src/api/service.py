@@ -0,0 +1,151 @@
+"""AyurMind Service - The consultation stack, built once per process, for any front end"""
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.microbatch import MicroBatchingEmbedder
+from src.rag.snapshot import open_vectorstore
+from src.rag.index_versions import IndexVersions, IndexWatcher
+from src.rag.retriever import RAGRetriever
+from src.llm.factory import create_llm_client
+from src.llm.scheduler import LLMScheduler, QueueFullError, current_consultation
+from src.agents.prakriti_agent import PrakritiAgent
+from src.agents.dosha_agent import DoshaAgent
+from src.agents.treatment_agent import TreatmentAgent
+from src.agents.general_agent import GeneralAgent
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.router import IntentRouter
+from src.agents.memory import ConversationMemory
+from src.monitoring.memory import record_process_memory
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Conversation memories by session id, least recently used first out, idle ones expire"""
+
+    def __init__(self, max_sessions: int = None, ttl: float = None):
+        if max_sessions is None:
+            max_sessions = int(os.getenv("API_MAX_SESSIONS", "1000"))
+        if ttl is None:
+            ttl = float(os.getenv("API_SESSION_TTL", "3600"))
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str, state: Optional[Dict] = None) -> ConversationMemory:
+        """This worker's memory for the session; else one rebuilt from client-held `state`; else a new one"""
+        # Validated before taking the lock; raises ValueError for malformed state
+        restored = ConversationMemory.from_dict(state) if state else None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            # An expired session forgets its memory but keeps its lock, which a running turn may hold
+            session_lock = entry[2] if entry is not None else threading.Lock()
+            memory = entry[0] if entry is not None and now - entry[1] <= self.ttl else None
+            if memory is None or (restored is not None and restored.turn_count > memory.turn_count):
+                memory = restored or ConversationMemory()
+            self._sessions[session_id] = (memory, now, session_lock)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return memory
+
+    def lock(self, session_id: str) -> threading.Lock:
+        """Held while a consultation updates the session's memory, so overlapping requests take turns"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[2] if entry is not None else threading.Lock()
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class AyurMindService:
+    """Retriever, scheduled LLM client, agents and orchestrator, plus the sessions using them"""
+
+    def __init__(self, vectorstore=None, embedding_generator=None, hierarchy=None):
+        """Components passed in were preloaded (see src/api/prefork.py); the rest is built here"""
+        logger.info("Initializing AyurMind service...")
+
+        self.embedding_generator = embedding_generator if embedding_generator is not None else EmbeddingGenerator()
+        if os.getenv("EMBEDDING_MICROBATCH", "true").lower() == "true":
+            # Concurrent sessions share one encode call instead of contending for torch threads
+            self.embedding_generator = MicroBatchingEmbedder(self.embedding_generator)
+        self.retriever = RAGRetriever(vectorstore if vectorstore is not None else open_vectorstore(), self.embedding_generator, hierarchy=hierarchy)
+
+        # A configured backend pool, else local first, with retries, stage deadlines and
+        # optional hedging (see src/llm/factory.py); every call shares one fair in-flight budget
+        self.scheduler = LLMScheduler()
+        self.llm_client = create_llm_client(scheduler=self.scheduler)
+        self.executor = ThreadPoolExecutor(max_workers=self.scheduler.capacity, thread_name_prefix="consultation")
+
+        self.prakriti_agent = PrakritiAgent(self.retriever, self.llm_client)
+        self.dosha_agent = DoshaAgent(self.retriever, self.llm_client)
+        self.treatment_agent = TreatmentAgent(self.retriever, self.llm_client)
+        self.general_agent = GeneralAgent(self.retriever, self.llm_client)
+
+        # Embedding router activates only the agents a query needs ("keyword" keeps the old matching)
+        router = IntentRouter(self.retriever) if os.getenv("QUERY_ROUTER", "embedding").lower() == "embedding" else None
+        self.orchestrator = OrchestratorAgent(
+            self.prakriti_agent,
+            self.dosha_agent,
+            self.treatment_agent,
+            self.llm_client,
+            router=router,
+            general_agent=self.general_agent
+        )
+
+        self.sessions = SessionStore()
+
+        # Versioned indexes (INDEX_ROOT): pick up newly published versions without a restart
+        self.index_watcher = None
+        if self.retriever.index_version is not None and os.getenv("INDEX_WATCH", "true").lower() == "true":
+            self.index_watcher = IndexWatcher(self.retriever, IndexVersions()).start()
+        logger.info(f"AyurMind service ready (index version {self.retriever.index_version or 'unversioned'})")
+
+    def _process(self, query: str, memory: Optional[ConversationMemory], session_lock: threading.Lock) -> Dict:
+        # Turns of one session run one at a time, so memory sees them in order; wait at most until the deadline
+        consultation = current_consultation()
+        while not session_lock.acquire(timeout=0.25):
+            if consultation is not None:
+                consultation.raise_if_cancelled()
+                if consultation.remaining() == 0:
+                    raise QueueFullError("An earlier request for this conversation is still running.")
+        try:
+            # Every retrieval of one consultation sees the same index version, even across a swap
+            with self.retriever.pinned_index():
+                return self.orchestrator.process_query(query, None, memory)
+        finally:
+            session_lock.release()
+
+    @contextmanager
+    def consultation(self, query: str, session_id: str, memory: ConversationMemory = None) -> Iterator[Future]:
+        """Admit and start a consultation (QueueFullError if full); leaving the block early cancels it"""
+        with self.scheduler.consultation(session_id) as consultation:
+            yield consultation.submit(self.executor, self._process, query, memory, self.sessions.lock(session_id))
+
+    def consult(self, query: str, session_id: str, memory: ConversationMemory = None) -> Dict:
+        with self.consultation(query, session_id, memory) as future:
+            return future.result()
+
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'worker_pid': os.getpid(),
+            'chunks': self.retriever.index_chunks,
+            'index_version': self.retriever.index_version,
+            'sessions': len(self.sessions),
+            'scheduler': self.scheduler.stats(),
+            'memory': record_process_memory(),
+        }
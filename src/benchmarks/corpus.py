@@ -0,0 +1,97 @@
+"""Synthetic corpus - Reproducible raw data in the scraper's on-disk layout"""
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+TOPICS = {
+    'prakriti': ["vata", "pitta", "kapha", "constitution", "prakriti", "body frame", "temperament", "skin"],
+    'vikriti': ["disease", "symptom", "fever", "jvara", "imbalance", "pathogenesis", "dosha", "disorder"],
+    'treatment': ["treatment", "therapy", "basti", "herb", "diet", "amalaki", "purification", "lifestyle"],
+    'general': ["digestion", "agni", "dinacharya", "season", "taste", "rasa", "mind", "sattva"],
+}
+
+SENTENCE_TEMPLATES = [
+    "The {a} is described in relation to {b} and {c}.",
+    "When {a} increases, the physician should examine {b} before recommending {c}.",
+    "Classical texts state that {a} governs {b}, while {c} supports balance.",
+    "A person with marked {a} shows signs of {b} and benefits from {c}.",
+    "{A} and {b} together determine the course of {c}.",
+]
+
+SECTIONS = [
+    ("Sutra_Sthana", "Section on Fundamental Principles", "I"),
+    ("Nidana_Sthana", "Section on Diagnostic Principles", "II"),
+    ("Chikitsa_Sthana", "Section on Therapeutic Principles", "VI"),
+    ("Sharira_Sthana", "Section on Human Being and Genesis", "IV"),
+]
+
+BENCHMARK_QUERIES = [
+    "What are Vata characteristics?",
+    "How to treat digestive problems with diet?",
+    "Pitta imbalance symptoms and fever",
+    "What is the importance of dinacharya?",
+    "Describe basti therapy and purification",
+    "Which herbs help kapha constitution?",
+    "Explain the six tastes and agni",
+    "What causes jvara according to the texts?",
+]
+
+
+def _sentence(rng: random.Random, topic: str) -> str:
+    words = rng.sample(TOPICS[topic], 3)
+    if rng.random() < 0.3:
+        words[2] = rng.choice(TOPICS[rng.choice(list(TOPICS))])
+    template = rng.choice(SENTENCE_TEMPLATES)
+    return template.format(a=words[0], A=words[0].capitalize(), b=words[1], c=words[2])
+
+
+def generate_raw_corpus(output_dir: str, chapters_per_section: int = 10, sentences_per_chapter: int = 120,
+                        seed: int = 42) -> Dict:
+    """Write a scraping_summary.json plus chapter text files that AyurvedicTextProcessor can consume"""
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    sections: List[Dict] = []
+    for section_key, section_name, section_code in SECTIONS:
+        section_dir = output_dir / section_key
+        section_dir.mkdir(exist_ok=True)
+        chapters = []
+
+        for number in range(1, chapters_per_section + 1):
+            topic = rng.choice(list(TOPICS))
+            paragraphs = []
+            for _ in range(0, sentences_per_chapter, 6):
+                paragraphs.append(" ".join(_sentence(rng, topic) for _ in range(6)))
+            text = "\n\n".join(paragraphs)
+
+            text_file = f"chapter_{number:02d}.txt"
+            (section_dir / text_file).write_text(text, encoding='utf-8')
+            chapters.append({
+                'number': number,
+                'title': f"{section_key.split('_')[0]} chapter {number} on {topic}",
+                'url': f"https://example.invalid/{section_key}/{number}",
+                'text_file': text_file,
+                'word_count': len(text.split()),
+                'topic': topic,
+            })
+
+        sections.append({
+            'section_key': section_key,
+            'section_code': section_code,
+            'section_name': section_name,
+            'total_chapters': len(chapters),
+            'chapters': chapters,
+            'total_words': sum(ch['word_count'] for ch in chapters),
+        })
+
+    summary = {
+        'total_sections': len(sections),
+        'total_chapters': sum(s['total_chapters'] for s in sections),
+        'total_words': sum(s['total_words'] for s in sections),
+        'sections': sections,
+        'seed': seed,
+    }
+    (output_dir / 'scraping_summary.json').write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return summary
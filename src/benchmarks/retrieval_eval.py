@@ -0,0 +1,185 @@
+"""
+Retrieval Evaluation - Quality vs speed across retrieval configurations
+
+Labeled queries are JSONL lines of the form
+    {"query": "...", "relevant_chapters": ["I:5", "Vata Kalakaliya"]}
+where each relevant chapter is either "<section_code>:<chapter_number>" or a
+chapter title. Hits are judged at chapter level: a chunk counts as relevant
+when its chapter is, and repeated chunks from one chapter count once.
+"""
+
+import json
+import math
+import time
+import shutil
+import itertools
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.benchmarks.corpus import generate_raw_corpus, TOPICS
+from src.benchmarks.stubs import HashingEmbedder
+from src.benchmarks.suite import percentiles
+from src.scraper.data_processor import AyurvedicTextProcessor
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.retriever import RAGRetriever
+
+
+def chapter_key(metadata: Dict) -> str:
+    return f"{metadata.get('section_code')}:{metadata.get('chapter_number')}"
+
+
+def load_labeled_queries(path: str) -> List[Dict]:
+    queries = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            item = json.loads(line)
+            queries.append({'query': item['query'], 'relevant_chapters': set(item['relevant_chapters'])})
+    return queries
+
+
+def synthetic_labeled_queries(raw_dir: str) -> List[Dict]:
+    """One query per synthetic topic; every chapter written on that topic is relevant"""
+    summary = json.loads((Path(raw_dir) / 'scraping_summary.json').read_text(encoding='utf-8'))
+    queries = []
+    for topic, terms in TOPICS.items():
+        relevant = {
+            f"{section['section_code']}:{chapter['number']}"
+            for section in summary['sections']
+            for chapter in section['chapters']
+            if chapter.get('topic') == topic
+        }
+        if relevant:
+            queries.append({'query': f"What do the texts say about {terms[0]} and {terms[1]}?", 'relevant_chapters': relevant})
+    return queries
+
+
+def ranked_chapters(chunks: List[Dict], relevant: set) -> List[bool]:
+    """Relevance flags for the distinct chapters among `chunks`, in rank order"""
+    seen = set()
+    flags = []
+    for chunk in chunks:
+        metadata = chunk['metadata']
+        key = chapter_key(metadata)
+        if key in seen:
+            continue
+        seen.add(key)
+        flags.append(key in relevant or metadata.get('chapter') in relevant)
+    return flags
+
+
+def recall_at_k(flags: List[bool], n_relevant: int) -> float:
+    return sum(flags) / n_relevant if n_relevant else 0.0
+
+
+def reciprocal_rank(flags: List[bool]) -> float:
+    for rank, is_relevant in enumerate(flags, 1):
+        if is_relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg(flags: List[bool], n_relevant: int) -> float:
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, is_relevant in enumerate(flags, 1) if is_relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(n_relevant, len(flags)) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def _directory_size_mb(path: Path) -> float:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file()) / (1024 * 1024)
+
+
+class RetrievalEvaluator:
+    """Build one index per (chunk size, overlap, backend) and score every k against it"""
+
+    def __init__(self, raw_dir: str, workdir: str, labeled_queries: List[Dict], repeats: int = 3):
+        self.raw_dir = raw_dir
+        self.workdir = Path(workdir)
+        self.labeled_queries = labeled_queries
+        self.repeats = repeats
+        self._embedders = {}
+
+    def get_embedder(self, backend: str):
+        if backend not in self._embedders:
+            if backend == 'hashing':
+                self._embedders[backend] = HashingEmbedder()
+            else:
+                from src.rag.embeddings import EmbeddingGenerator
+                self._embedders[backend] = EmbeddingGenerator(backend=backend)
+        return self._embedders[backend]
+
+    def build_index(self, chunk_size: int, chunk_overlap: int, backend: str):
+        name = f"cs{chunk_size}_ov{chunk_overlap}_{backend}"
+        processed_dir = self.workdir / name / 'processed'
+        index_dir = self.workdir / name / 'vectordb'
+        if index_dir.exists():
+            shutil.rmtree(index_dir)
+
+        processor = AyurvedicTextProcessor(input_dir=self.raw_dir, output_dir=str(processed_dir),
+                                           chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        processor.process_all()
+        chunks = json.loads((processed_dir / 'all_chunks.json').read_text(encoding='utf-8'))
+
+        embedder = self.get_embedder(backend)
+        start = time.perf_counter()
+        embeddings = embedder.embed_batch([chunk['text'] for chunk in chunks], show_progress_bar=False)
+        vectorstore = AyurvedicVectorStore(str(index_dir), embedder.get_signature())
+        vectorstore.add_chunks(chunks, embeddings.tolist())
+        build_seconds = time.perf_counter() - start
+
+        return RAGRetriever(vectorstore, embedder), {
+            'chunks': len(chunks),
+            'index_size_mb': _directory_size_mb(index_dir),
+            'build_seconds': build_seconds,
+        }
+
+    def evaluate(self, retriever: RAGRetriever, k: int) -> Dict:
+        recalls, rrs, ndcgs, latencies = [], [], [], []
+        for item in self.labeled_queries:
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                chunks = retriever.retrieve(item['query'], n_results=k)
+                latencies.append(time.perf_counter() - start)
+            flags = ranked_chapters(chunks, item['relevant_chapters'])
+            n_relevant = len(item['relevant_chapters'])
+            recalls.append(recall_at_k(flags, n_relevant))
+            rrs.append(reciprocal_rank(flags))
+            ndcgs.append(ndcg(flags, n_relevant))
+
+        count = len(self.labeled_queries)
+        return {
+            'recall': sum(recalls) / count,
+            'mrr': sum(rrs) / count,
+            'ndcg': sum(ndcgs) / count,
+            **percentiles(latencies),
+        }
+
+    def run_grid(self, chunk_sizes: Sequence[int], overlaps: Sequence[int], ks: Sequence[int],
+                 backends: Sequence[str]) -> List[Dict]:
+        rows = []
+        for chunk_size, overlap, backend in itertools.product(chunk_sizes, overlaps, backends):
+            if overlap >= chunk_size:
+                continue
+            retriever, index_stats = self.build_index(chunk_size, overlap, backend)
+            for k in ks:
+                rows.append({
+                    'chunk_size': chunk_size,
+                    'chunk_overlap': overlap,
+                    'backend': backend,
+                    'k': k,
+                    **index_stats,
+                    **self.evaluate(retriever, k),
+                })
+        return rows
+
+
+def fastest_meeting_target(rows: Iterable[Dict], metric: str = 'recall', target: float = 0.8) -> Optional[Dict]:
+    """Lowest-p95 configuration whose `metric` reaches `target`"""
+    eligible = [row for row in rows if row[metric] >= target]
+    return min(eligible, key=lambda row: row['p95_ms']) if eligible else None
+
+
+def prepare_synthetic(workdir: str, seed: int = 42):
+    raw_dir = str(Path(workdir) / 'raw')
+    generate_raw_corpus(raw_dir, seed=seed)
+    return raw_dir, synthetic_labeled_queries(raw_dir)
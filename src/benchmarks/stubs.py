@@ -0,0 +1,89 @@
+"""Deterministic stand-ins for the embedding model and LLM backends"""
+import re
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+from src.llm.prompts import build_context_prompt
+from src.llm.options import GenerationOptions, resolve_options
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Feature-hashing embedder with the EmbeddingGenerator interface.
+
+    Vectors are unit-normalised bags of hashed word unigrams and bigrams, so
+    texts sharing vocabulary land close together and results are identical
+    across runs and machines without downloading a model.
+    """
+
+    def __init__(self, embedding_dim: int = 384):
+        self.embedding_dim = embedding_dim
+        self.model_name = f"hashing-{embedding_dim}"
+        self.backend = "hashing"
+        self.output_dtype = "float32"
+
+    def _bucket(self, token: str) -> int:
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') % self.embedding_dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.embedding_dim, dtype=np.float32)
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        for token in tokens:
+            vector[self._bucket(token)] += 1.0
+        for first, second in zip(tokens, tokens[1:]):
+            vector[self._bucket(f"{first} {second}")] += 0.5
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_text(self, text: str) -> np.ndarray:
+        return self._embed(text)
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = True) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        return np.vstack([self._embed(text) for text in texts])
+
+    def get_embedding_dimension(self) -> int:
+        return self.embedding_dim
+
+    def get_signature(self) -> Dict:
+        return {'embedding_model': self.model_name, 'embedding_backend': self.backend, 'embedding_dim': self.embedding_dim}
+
+
+class StubLLMClient:
+    """LLM client that answers instantly (or after a fixed latency) with a reproducible text"""
+
+    def __init__(self, latency_ms: float = 0.0, ms_per_token: float = 0.0, model: str = "stub"):
+        self.model = model
+        self.latency = latency_ms / 1000.0
+        self.seconds_per_token = ms_per_token / 1000.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3,
+                 max_tokens: Optional[int] = None, options: Optional[GenerationOptions] = None, **kwargs) -> str:
+        max_tokens = resolve_options(options, max_tokens).max_tokens
+        with self._lock:
+            self.calls += 1
+        digest = hashlib.sha1(f"{system_prompt or ''}\n{prompt}".encode('utf-8')).hexdigest()[:12]
+        # Simulated decode time grows with the requested budget, like a real backend
+        delay = self.latency + self.seconds_per_token * min(max_tokens or 0, 200)
+        if delay:
+            time.sleep(delay)
+        lines = prompt.strip().splitlines()
+        subject = next((line for line in reversed(lines) if line.startswith("User Query:")), lines[-1])
+        return f"[stub:{digest}] 1. Summary for: {subject[:80]}"
+
+    def generate_with_context(self, query: str, context: str, system_prompt: str, temperature: float = 0.3,
+                              max_tokens: Optional[int] = None, additional_info: Optional[Dict] = None, **kwargs) -> str:
+        prompt = build_context_prompt(query, context, additional_info)
+        return self.generate(prompt=prompt, system_prompt=system_prompt, temperature=temperature,
+                             max_tokens=max_tokens, **kwargs)
@@ -0,0 +1,296 @@
+"""
+Benchmark Suite - Offline, reproducible performance measurements
+
+Runs the real processor, vector store, retriever and orchestrator against a
+synthetic corpus, a hashing embedder and a stub LLM, so numbers only move
+when our code (or a dependency) does. Results are plain JSON; compare two
+runs with compare_results() to flag regressions.
+"""
+
+import sys
+import json
+import time
+import platform
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+import numpy as np
+
+from src.benchmarks.corpus import generate_raw_corpus, BENCHMARK_QUERIES
+from src.benchmarks.stubs import HashingEmbedder, StubLLMClient
+from src.scraper.data_processor import AyurvedicTextProcessor
+from src.rag.vectorstore import AyurvedicVectorStore
+from src.rag.retriever import RAGRetriever
+from src.agents.prakriti_agent import PrakritiAgent
+from src.agents.dosha_agent import DoshaAgent
+from src.agents.treatment_agent import TreatmentAgent
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.batch_runner import BatchConsultationRunner, query_id
+from src.agents.memory import ConversationMemory
+from src.rag.working_set import SessionWorkingSet
+from src.llm.scheduler import LLMScheduler, ScheduledLLMClient
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 of latency samples given in seconds, reported in ms"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean()),
+    }
+
+
+def rss_high_water_mb():
+    """Peak resident set size of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class BenchmarkSuite:
+    def __init__(self, workdir: str, seed: int = 42, chapters_per_section: int = 10,
+                 sentences_per_chapter: int = 120, embedder=None, llm_latency_ms: float = 20.0,
+                 query_repeats: int = 20, concurrency: Sequence[int] = (1, 4, 8),
+                 consultations_per_user: int = 3, llm_slots: int = 2):
+        self.workdir = Path(workdir)
+        self.seed = seed
+        self.chapters_per_section = chapters_per_section
+        self.sentences_per_chapter = sentences_per_chapter
+        self.embedder = embedder or HashingEmbedder()
+        self.llm_latency_ms = llm_latency_ms
+        self.query_repeats = query_repeats
+        self.concurrency = list(concurrency)
+        self.consultations_per_user = consultations_per_user
+        self.llm_slots = llm_slots
+
+    def run(self) -> Dict:
+        results = {}
+
+        chunks, results['chunking'] = self.bench_chunking()
+        embeddings, results['embedding'] = self.bench_embedding([chunk['text'] for chunk in chunks])
+        vectorstore, results['index_build'] = self.bench_index_build(chunks, embeddings)
+        retriever = RAGRetriever(vectorstore, self.embedder)
+        results['query'] = self.bench_queries(retriever)
+        results['orchestrator'] = self.bench_orchestrator(retriever)
+        results['batch'] = self.bench_batch(retriever)
+        results['followups'] = self.bench_followups(retriever)
+
+        return {'meta': self.describe(), 'results': results}
+
+    def describe(self) -> Dict:
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': self.seed,
+            'chapters_per_section': self.chapters_per_section,
+            'sentences_per_chapter': self.sentences_per_chapter,
+            'embedder': self.embedder.get_signature(),
+            'llm_latency_ms': self.llm_latency_ms,
+            'llm_slots': self.llm_slots,
+        }
+
+    def bench_chunking(self):
+        raw_dir = self.workdir / 'raw'
+        processed_dir = self.workdir / 'processed'
+        generate_raw_corpus(str(raw_dir), self.chapters_per_section, self.sentences_per_chapter, self.seed)
+
+        processor = AyurvedicTextProcessor(input_dir=str(raw_dir), output_dir=str(processed_dir))
+        start = time.perf_counter()
+        summary = processor.process_all()
+        elapsed = time.perf_counter() - start
+
+        chunks = json.loads((processed_dir / 'all_chunks.json').read_text(encoding='utf-8'))
+        return chunks, {
+            'seconds': elapsed,
+            'chunks': summary['total_chunks'],
+            'chunks_per_sec': summary['total_chunks'] / elapsed,
+            'tokens_per_sec': summary['total_tokens'] / elapsed,
+            'rss_high_water_mb': rss_high_water_mb(),
+        }
+
+    def bench_embedding(self, texts: List[str]):
+        start = time.perf_counter()
+        embeddings = self.embedder.embed_batch(texts, show_progress_bar=False)
+        elapsed = time.perf_counter() - start
+        return embeddings, {
+            'seconds': elapsed,
+            'texts_per_sec': len(texts) / elapsed,
+            'rss_high_water_mb': rss_high_water_mb(),
+        }
+
+    def bench_index_build(self, chunks: List[Dict], embeddings: np.ndarray):
+        vectorstore = AyurvedicVectorStore(str(self.workdir / 'vectordb'), self.embedder.get_signature())
+        start = time.perf_counter()
+        vectorstore.add_chunks(chunks, embeddings.tolist())
+        elapsed = time.perf_counter() - start
+        return vectorstore, {
+            'seconds': elapsed,
+            'chunks_per_sec': len(chunks) / elapsed,
+            'rss_high_water_mb': rss_high_water_mb(),
+        }
+
+    def bench_queries(self, retriever: RAGRetriever) -> Dict:
+        results = {}
+        for label, category in (('unfiltered', None), ('filtered', 'treatment')):
+            latencies = []
+            for _ in range(self.query_repeats):
+                for query in BENCHMARK_QUERIES:
+                    start = time.perf_counter()
+                    retriever.retrieve(query, category_filter=category)
+                    latencies.append(time.perf_counter() - start)
+            results[label] = percentiles(latencies)
+        results['rss_high_water_mb'] = rss_high_water_mb()
+        return results
+
+    def bench_orchestrator(self, retriever: RAGRetriever) -> Dict:
+        results = {}
+        for users in self.concurrency:
+            stub = StubLLMClient(latency_ms=self.llm_latency_ms)
+            scheduler = LLMScheduler(max_in_flight=self.llm_slots, max_queue=users)
+            llm_client = ScheduledLLMClient(stub, scheduler)
+            orchestrator = OrchestratorAgent(
+                PrakritiAgent(retriever, llm_client),
+                DoshaAgent(retriever, llm_client),
+                TreatmentAgent(retriever, llm_client),
+                llm_client
+            )
+
+            latencies = []
+            skipped_synthesis = []
+            lock = threading.Lock()
+
+            def user_session(user: int):
+                for i in range(self.consultations_per_user):
+                    query = BENCHMARK_QUERIES[(user + i) % len(BENCHMARK_QUERIES)]
+                    with scheduler.consultation(f"user-{user}") as consultation:
+                        start = time.perf_counter()
+                        result = consultation.run(orchestrator.process_query, query)
+                        elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        skipped_synthesis.append(result['synthesis'] != 'llm')
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=users) as pool:
+                list(pool.map(user_session, range(users)))
+            wall = time.perf_counter() - start
+
+            results[f'users_{users}'] = {
+                **percentiles(latencies),
+                'consultations_per_sec': len(latencies) / wall,
+                'llm_calls_per_consultation': stub.calls / len(latencies),
+                'synthesis_skipped_fraction': sum(skipped_synthesis) / len(skipped_synthesis),
+            }
+        results['rss_high_water_mb'] = rss_high_water_mb()
+        return results
+
+    def bench_batch(self, retriever: RAGRetriever, workers: int = 8) -> Dict:
+        """Sequential simple_query loop vs the batch runner over the same query set"""
+        queries = [f"{query} (case {i})" for i in range(self.query_repeats) for query in BENCHMARK_QUERIES]
+        stub = StubLLMClient(latency_ms=self.llm_latency_ms)
+        orchestrator = OrchestratorAgent(
+            PrakritiAgent(retriever, stub),
+            DoshaAgent(retriever, stub),
+            TreatmentAgent(retriever, stub),
+            stub
+        )
+
+        start = time.perf_counter()
+        for query in queries:
+            orchestrator.simple_query(query)
+        sequential = len(queries) / (time.perf_counter() - start)
+
+        runner = BatchConsultationRunner(orchestrator, retriever, max_workers=workers)
+        output = self.workdir / 'batch_results.jsonl'
+        summary = runner.run([{'id': query_id(q), 'query': q} for q in queries], str(output), resume=False)
+
+        return {
+            'queries': len(queries),
+            'sequential_queries_per_sec': sequential,
+            'batch_queries_per_sec': summary['queries_per_sec'],
+            'speedup': summary['queries_per_sec'] / sequential,
+            'rss_high_water_mb': rss_high_water_mb(),
+        }
+
+    def bench_followups(self, retriever: RAGRetriever, slacks: Sequence[float] = (1.0, 1.5)) -> Dict:
+        """Store queries per session when follow-ups can be served from the session working set"""
+        stub = StubLLMClient(latency_ms=0)
+        orchestrator = OrchestratorAgent(
+            PrakritiAgent(retriever, stub),
+            DoshaAgent(retriever, stub),
+            TreatmentAgent(retriever, stub),
+            stub
+        )
+        sessions = [[query, f"{query} Please explain in more detail.", query] for query in BENCHMARK_QUERIES]
+
+        results = {}
+        for slack in slacks:
+            store_queries = retrievals = 0
+            latencies = []
+            for turns in sessions:
+                memory = ConversationMemory()
+                memory.working_set = SessionWorkingSet(slack=slack)
+                for i, query in enumerate(turns):
+                    start = time.perf_counter()
+                    orchestrator.process_query(query, memory=memory)
+                    if i:
+                        latencies.append(time.perf_counter() - start)
+                store_queries += memory.working_set.misses
+                retrievals += memory.working_set.hits + memory.working_set.misses
+            results[f'slack_{slack:g}'] = {
+                'store_queries_per_session': store_queries / len(sessions),
+                'retrievals_per_session': retrievals / len(sessions),
+                'hit_fraction': 1 - store_queries / retrievals if retrievals else 0.0,
+                'followup_p50_ms': percentiles(latencies)['p50_ms'],
+            }
+        results['rss_high_water_mb'] = rss_high_water_mb()
+        return results
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare_results(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """List metrics that got worse than `baseline` by more than `tolerance` (fraction).
+
+    Throughputs (*_per_sec) should not drop; latencies, durations and memory
+    (*_ms, seconds, *_mb) should not grow. Other numbers are informational.
+    """
+    base = _flatten(baseline.get('results', baseline))
+    now = _flatten(current.get('results', current))
+    regressions = []
+
+    for metric, old in base.items():
+        new = now.get(metric)
+        if new is None or old == 0:
+            continue
+        name = metric.rsplit('.', 1)[-1]
+        if name.endswith('_per_sec'):
+            change = (old - new) / old
+        elif name.endswith('_ms') or name.endswith('_mb') or name == 'seconds':
+            change = (new - old) / old
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({'metric': metric, 'baseline': old, 'current': new, 'change': change})
+
+    return regressions
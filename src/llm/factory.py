@@ -0,0 +1,52 @@
+"""LLM Client Factory - Build the configured LLM client stack from the environment"""
+import os
+import logging
+
+from .local_client import OllamaClient
+from .openrouter_client import OpenRouterClient
+from .pool import LLMRouterClient
+from .resilience import ResilientLLMClient
+from .scheduler import LLMScheduler, ScheduledLLMClient
+
+logger = logging.getLogger(__name__)
+
+
+def create_base_client():
+    """A configured backend pool (LLM_BACKENDS), else local Ollama with OpenRouter as fallback"""
+    if os.getenv("LLM_BACKENDS"):
+        client = LLMRouterClient.from_env()
+        logger.info(f"Using LLM backend pool: {client.model}")
+        return client
+
+    if os.getenv("USE_LOCAL_FALLBACK", "true").lower() == "true":
+        try:
+            client = OllamaClient()
+            if not client.is_available():
+                raise Exception("Ollama not running")
+            logger.info("✅ Using Local Ollama (free, unlimited)")
+            return client
+        except Exception as e:
+            logger.warning(f"Ollama unavailable: {e}")
+            logger.info("Falling back to OpenRouter API")
+            return OpenRouterClient()
+
+    logger.info("Using OpenRouter API")
+    return OpenRouterClient()
+
+
+def create_llm_client(base_client=None, scheduler: LLMScheduler = None) -> ResilientLLMClient:
+    """Base client wrapped with retries and stage deadlines; hedged across the pool when LLM_HEDGE=true.
+
+    With a scheduler, every attempt and hedge takes its own in-flight slot
+    below the retry loop, so backoff never holds one.
+    """
+    client = base = base_client or create_base_client()
+    if scheduler is not None:
+        client = ScheduledLLMClient(client, scheduler)
+
+    hedge = os.getenv("LLM_HEDGE", "false").lower() == "true"
+    if hedge and not (isinstance(base, LLMRouterClient) and len(base.backends) > 1):
+        # A hedge needs a second backend to go to
+        logger.warning("LLM_HEDGE needs an LLM_BACKENDS pool with at least two backends; hedging disabled")
+        hedge = False
+    return ResilientLLMClient(client, hedge_client=client if hedge else None)
@@ -4,9 +4,14 @@ Local Ollama Client - 100% Free, Unlimited
 
 import os
 import requests
-from typing import Optional
+from typing import Dict, Optional
 import logging
 
+from src.monitoring.tracing import span
+from .prompts import build_context_prompt, build_messages
+from .options import GenerationOptions, resolve_options
+from .resilience import LLMHTTPError, LLMTimeoutError, parse_retry_after
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -14,9 +19,13 @@ logger = logging.getLogger(__name__)
 class OllamaClient:
     """Client for local Ollama LLM"""
     
-    def __init__(self, model: str = None, base_url: str = "http://localhost:11434"):
+    default_timeout = 180  # 3 minutes max
+    
+    def __init__(self, model: str = None, base_url: str = None, keep_alive: str = None):
         self.model = model or os.getenv("LOCAL_MODEL", "llama3.2:3b")
-        self.base_url = base_url
+        self.base_url = base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        # How long Ollama keeps the model (and its cached prompt prefix) loaded after a call
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", "30m")
         
         logger.info(f"Initializing Ollama client with model: {self.model}")
         
@@ -37,80 +46,69 @@ class OllamaClient:
             return False
     
     def generate(self, prompt: str, system_prompt: Optional[str] = None, 
-                 temperature: float = 0.3, **kwargs) -> str:
+                 temperature: float = 0.3, max_tokens: Optional[int] = None,
+                 options: Optional[GenerationOptions] = None, **kwargs) -> str:
         """Generate response from local LLM
         
-        Note: max_tokens is ignored for Ollama (not supported)
+        max_tokens (or options.max_tokens) maps to Ollama's num_predict
         """
-        
-        # Remove max_tokens if present (Ollama doesn't support it)
-        kwargs.pop('max_tokens', None)
+        options = resolve_options(options, max_tokens)
         
         if not self.is_available():
-            raise RuntimeError(
+            raise LLMHTTPError(
                 "Ollama is not running!\n"
                 "It should be running automatically. Check with: ollama list"
             )
         
-        # Build the complete prompt
-        if system_prompt:
-            full_prompt = f"{system_prompt}\n\n{prompt}"
-        else:
-            full_prompt = prompt
-        
+        # Keep the system prompt as its own message so the server can reuse its KV cache
         payload = {
             "model": self.model,
-            "prompt": full_prompt,
+            "messages": build_messages(prompt, system_prompt),
             "stream": False,
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": temperature,
-                "num_predict": 800  # Ollama's equivalent to max_tokens
+                **options.to_ollama()
             }
         }
         
         try:
-            logger.info(f"Generating with Ollama ({self.model})...")
+            logger.info(f"Generating with Ollama ({self.model}, {options.profile}, max {options.max_tokens} tokens)...")
             
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=180  # 3 minutes max
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            generated = result.get('response', '')
+            with span("llm.generate", labels={'backend': 'ollama', 'model': self.model}, profile=options.profile) as llm_span:
+                response = requests.post(
+                    f"{self.base_url}/api/chat",
+                    json=payload,
+                    timeout=options.timeout or self.default_timeout
+                )
+                if response.status_code >= 400:
+                    raise LLMHTTPError(
+                        f"Ollama returned HTTP {response.status_code}: {response.text[:200]}",
+                        status_code=response.status_code,
+                        retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                    )
+                
+                result = response.json()
+                generated = (result.get('message') or {}).get('content', '')
+                llm_span.set('prompt_tokens', result.get('prompt_eval_count'))
+                llm_span.set('completion_tokens', result.get('eval_count'))
             
             logger.info(f"✓ Generated {len(generated)} characters")
             return generated
             
         except requests.exceptions.Timeout:
-            raise RuntimeError("Ollama generation timed out. Try a smaller model.")
+            raise LLMTimeoutError("Ollama generation timed out. Try a smaller model.")
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Ollama API error: {e}")
-            raise RuntimeError(f"Ollama error: {e}")
+            raise LLMHTTPError(f"Ollama error: {e}")
     
     def generate_with_context(self, query: str, context: str, 
                              system_prompt: str, temperature: float = 0.3,
-                             **kwargs) -> str:
-        """Generate response with RAG context
+                             additional_info: Optional[Dict] = None, **kwargs) -> str:
+        """Generate response with RAG context"""
         
-        Note: max_tokens is ignored for Ollama (not supported)
-        """
-        
-        # Remove max_tokens if present
-        kwargs.pop('max_tokens', None)
-        
-        prompt = f"""Context from Ayurvedic texts:
-
-{context}
-
----
-
-User Query: {query}
-
-Based on the context provided above, please provide a response."""
+        prompt = build_context_prompt(query, context, additional_info)
         
         return self.generate(
             prompt=prompt,
@@ -7,11 +7,18 @@ Get free API key: https://openrouter.ai/keys
 
 import os
 import requests
-from typing import Optional
+from typing import Dict, Optional
+
+from src.monitoring.tracing import span
+from .prompts import build_context_prompt, build_messages
+from .options import GenerationOptions, resolve_options
+from .resilience import LLMHTTPError, LLMTimeoutError, parse_retry_after
 
 class OpenRouterClient:
     """Client for OpenRouter API"""
     
+    default_timeout = 60
+    
     def __init__(self, api_key: str = None, model: str = None, base_url: str = "https://openrouter.ai/api/v1"):
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
@@ -30,54 +37,53 @@ class OpenRouterClient:
             "X-Title": "AyurMind"
         }
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3, max_tokens: int = 800, **kwargs) -> str:
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3, max_tokens: Optional[int] = None, options: Optional[GenerationOptions] = None, **kwargs) -> str:
         """Generate response from LLM"""
-        messages = []
-        
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        messages.append({"role": "user", "content": prompt})
-        
+        options = resolve_options(options, max_tokens)
         payload = {
             "model": self.model,
-            "messages": messages,
+            "messages": build_messages(prompt, system_prompt),
             "temperature": temperature,
-            "max_tokens": max_tokens,
+            **options.to_openai(),
             **kwargs
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            return result['choices'][0]['message']['content']
+            with span("llm.generate", labels={'backend': 'openrouter', 'model': self.model}, profile=options.profile) as llm_span:
+                response = requests.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=self.headers,
+                    json=payload,
+                    timeout=options.timeout or self.default_timeout
+                )
+                if response.status_code >= 400:
+                    raise LLMHTTPError(
+                        f"OpenRouter returned HTTP {response.status_code}: {response.text[:200]}",
+                        status_code=response.status_code,
+                        retry_after=parse_retry_after(response.headers.get('Retry-After'))
+                    )
+                
+                result = response.json()
+                usage = result.get('usage') or {}
+                llm_span.set('prompt_tokens', usage.get('prompt_tokens'))
+                llm_span.set('completion_tokens', usage.get('completion_tokens'))
+                return result['choices'][0]['message']['content']
             
+        except requests.exceptions.Timeout:
+            raise LLMTimeoutError("OpenRouter request timed out")
+        
         except requests.exceptions.RequestException as e:
             print(f"OpenRouter API error: {e}")
-            raise
+            raise LLMHTTPError(f"OpenRouter error: {e}")
     
-    def generate_with_context(self, query: str, context: str, system_prompt: str, temperature: float = 0.3, max_tokens: int = 800) -> str:
+    def generate_with_context(self, query: str, context: str, system_prompt: str, temperature: float = 0.3, max_tokens: Optional[int] = None, additional_info: Optional[Dict] = None, options: Optional[GenerationOptions] = None) -> str:
         """Generate response with RAG context"""
-        prompt = f"""Context from Ayurvedic texts:
-
-{context}
-
----
-
-User Query: {query}
-
-Based on the context provided above, please provide a response."""
+        prompt = build_context_prompt(query, context, additional_info)
         
         return self.generate(
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            options=options
         )
\ No newline at end of file
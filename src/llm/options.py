@@ -0,0 +1,78 @@
+"""Generation Options - One set of decode limits shared by every LLM backend"""
+import os
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class GenerationOptions:
+    """Per-call limits. `profile` names the pipeline stage the call belongs to.
+
+    num_ctx and num_thread only apply to Ollama; timeout is in seconds and
+    falls back to the client's own default when unset.
+    """
+    profile: str = "default"
+    max_tokens: int = 800
+    stop: List[str] = field(default_factory=list)
+    num_ctx: Optional[int] = None
+    num_thread: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def merged(self, **overrides) -> "GenerationOptions":
+        """Copy with every non-None override applied"""
+        return replace(self, **{key: value for key, value in overrides.items() if value is not None})
+
+    def to_ollama(self) -> Dict:
+        options = {"num_predict": self.max_tokens}
+        if self.stop:
+            options["stop"] = list(self.stop)
+        if self.num_ctx:
+            options["num_ctx"] = self.num_ctx
+        if self.num_thread:
+            options["num_thread"] = self.num_thread
+        return options
+
+    def to_openai(self) -> Dict:
+        params = {"max_tokens": self.max_tokens}
+        if self.stop:
+            params["stop"] = list(self.stop)
+        return params
+
+
+# Decode budgets per stage: specialists answer in a few numbered points,
+# synthesis merges up to three of them, summary condenses old conversation turns
+PROFILES: Dict[str, GenerationOptions] = {
+    'default': GenerationOptions(),
+    'general': GenerationOptions(profile='general', max_tokens=400),
+    'prakriti': GenerationOptions(profile='prakriti', max_tokens=500),
+    'dosha': GenerationOptions(profile='dosha', max_tokens=600),
+    'treatment': GenerationOptions(profile='treatment', max_tokens=800),
+    'synthesis': GenerationOptions(profile='synthesis', max_tokens=1200),
+    'summary': GenerationOptions(profile='summary', max_tokens=300),
+}
+
+
+def _env_number(name: str, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+def get_profile(name: str = "default") -> GenerationOptions:
+    """Options for a stage, with environment overrides.
+
+    LLM_MAX_TOKENS_<PROFILE> and LLM_TIMEOUT_<PROFILE> adjust one stage;
+    LLM_NUM_CTX, LLM_NUM_THREAD and LLM_TIMEOUT apply to every stage.
+    """
+    base = PROFILES.get(name) or replace(PROFILES['default'], profile=name)
+    suffix = name.upper()
+    return base.merged(
+        max_tokens=_env_number(f"LLM_MAX_TOKENS_{suffix}", int),
+        timeout=_env_number(f"LLM_TIMEOUT_{suffix}", float) or _env_number("LLM_TIMEOUT", float),
+        num_ctx=_env_number("LLM_NUM_CTX", int),
+        num_thread=_env_number("LLM_NUM_THREAD", int),
+    )
+
+
+def resolve_options(options: Optional[GenerationOptions] = None, max_tokens: Optional[int] = None) -> GenerationOptions:
+    """Options for one call; an explicit max_tokens wins over the profile"""
+    return (options or get_profile()).merged(max_tokens=max_tokens)
@@ -0,0 +1,263 @@
+"""
+LLM Backend Pool - One client interface over several Ollama/OpenRouter backends
+
+Each call goes to the least-loaded healthy backend that serves its profile
+(see src/llm/options.py), so small agents can run on a small model while
+synthesis uses a larger one. A backend that fails repeatedly is taken out of
+rotation and re-probed with is_available() after a cooldown; a call that
+failed on connection, timeout or a 5xx is retried on the next backend, while
+client errors (4xx, bad responses) are raised at once. Every backend has its
+own concurrency limit; waiting for a free slot ends at the call's deadline
+(its stage timeout, capped by the consultation deadline).
+
+Configure with LLM_BACKENDS, a JSON list such as
+[{"kind": "ollama", "model": "llama3.2:1b", "base_url": "http://gpu1:11434",
+  "max_concurrency": 2, "profiles": ["general", "prakriti", "dosha"]},
+ {"kind": "ollama", "model": "llama3.1:8b", "base_url": "http://gpu2:11434"},
+ {"kind": "openrouter"}]
+A backend without "profiles" serves every stage.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Dict, List, Optional, Sequence
+
+from src.monitoring.metrics import REGISTRY, MetricsRegistry
+from .options import GenerationOptions, resolve_options
+from .prompts import build_context_prompt
+from .resilience import LLMHTTPError, LLMTimeoutError
+from .scheduler import SlotUnavailable, call_deadline, current_consultation
+
+logger = logging.getLogger(__name__)
+
+
+class NoBackendAvailableError(RuntimeError):
+    """Raised when every backend for a call is unhealthy or has failed it"""
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Connection errors, timeouts and 5xx count against a backend; anything else is the request's fault"""
+    if isinstance(error, LLMHTTPError):
+        return error.status_code is None or error.status_code >= 500
+    return isinstance(error, LLMTimeoutError)
+
+
+class Backend:
+    """A client plus its routing state; `outstanding` counts calls in flight"""
+
+    def __init__(self, client, name: str = None, max_concurrency: int = 2, profiles: Optional[Sequence[str]] = None):
+        self.client = client
+        self.name = name or f"{getattr(client, 'model', client.__class__.__name__)}@{getattr(client, 'base_url', 'local')}"
+        self.max_concurrency = max(1, max_concurrency)
+        self.profiles = set(profiles) if profiles else None
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.unhealthy_since = 0.0
+        self.served = 0
+
+    def serves(self, profile: str) -> bool:
+        return self.profiles is None or profile in self.profiles
+
+    @property
+    def load(self) -> float:
+        return self.outstanding / self.max_concurrency
+
+
+def _build_client(spec: Dict):
+    kind = spec.get('kind', 'ollama').lower()
+    if kind == 'ollama':
+        from .local_client import OllamaClient
+        return OllamaClient(model=spec.get('model'), base_url=spec.get('base_url'), keep_alive=spec.get('keep_alive'))
+    if kind == 'openrouter':
+        from .openrouter_client import OpenRouterClient
+        kwargs = {'model': spec.get('model')}
+        if spec.get('base_url'):
+            kwargs['base_url'] = spec['base_url']
+        return OpenRouterClient(**kwargs)
+    raise ValueError(f"Unknown LLM backend kind '{kind}'. Choose 'ollama' or 'openrouter'")
+
+
+class LLMRouterClient:
+    """Least-outstanding-requests load balancer with failover, same interface as the clients"""
+
+    # generate() takes the routing keywords ResilientLLMClient uses for attempt budgets and hedging
+    routes_backends = True
+
+    def __init__(self, backends: List[Backend], failure_threshold: int = None, cooldown: float = None,
+                 registry: MetricsRegistry = REGISTRY):
+        if not backends:
+            raise ValueError("LLMRouterClient needs at least one backend")
+        if len({backend.name for backend in backends}) != len(backends):
+            raise ValueError("LLM backend names must be unique")
+        if failure_threshold is None:
+            failure_threshold = int(os.getenv("LLM_BACKEND_FAILURES", "2"))
+        if cooldown is None:
+            cooldown = float(os.getenv("LLM_BACKEND_COOLDOWN", "30"))
+
+        self.backends = backends
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.model = "+".join(backend.name for backend in backends)
+        self._cond = threading.Condition()
+
+        self._outstanding = {b.name: registry.gauge("ayurmind_llm_backend_outstanding", "LLM calls in flight per backend", labels={'backend': b.name}) for b in backends}
+        self._healthy = {b.name: registry.gauge("ayurmind_llm_backend_healthy", "1 when the backend is in rotation", labels={'backend': b.name}) for b in backends}
+        self._failures = {b.name: registry.counter("ayurmind_llm_backend_failures_total", "Failed LLM calls per backend", labels={'backend': b.name}) for b in backends}
+        for backend in backends:
+            self._healthy[backend.name].set(1)
+
+    @classmethod
+    def from_env(cls) -> "LLMRouterClient":
+        specs = json.loads(os.getenv("LLM_BACKENDS", "[]"))
+        backends = [
+            Backend(_build_client(spec), name=spec.get('name'), max_concurrency=int(spec.get('max_concurrency', 2)),
+                    profiles=spec.get('profiles'))
+            for spec in specs
+        ]
+        return cls(backends)
+
+    def is_available(self) -> bool:
+        self._probe_unhealthy()
+        return any(backend.healthy for backend in self.backends)
+
+    def _probe_unhealthy(self):
+        """Give backends whose cooldown has passed a health check (outside the lock)"""
+        now = time.monotonic()
+        due = [b for b in self.backends if not b.healthy and now - b.unhealthy_since >= self.cooldown]
+        for backend in due:
+            try:
+                alive = backend.client.is_available()
+            except Exception:
+                alive = False
+            with self._cond:
+                if alive:
+                    logger.info(f"LLM backend {backend.name} is healthy again")
+                    backend.healthy = True
+                    backend.consecutive_failures = 0
+                    self._healthy[backend.name].set(1)
+                    self._cond.notify_all()
+                else:
+                    backend.unhealthy_since = now
+
+    def _acquire(self, profile: str, exclude: set, deadline: Optional[float] = None, wait: bool = True) -> Backend:
+        """Block until a healthy backend serving `profile` has a free slot (least loaded wins),
+        raising LLMTimeoutError if none frees up before `deadline` (monotonic), or
+        SlotUnavailable at once when not allowed to wait"""
+        consultation = current_consultation()
+        with self._cond:
+            while True:
+                if consultation is not None:
+                    consultation.raise_if_cancelled()
+                healthy = [b for b in self.backends if b.healthy and b.name not in exclude]
+                # Nothing serving this stage is left; any backend beats failing the consultation
+                candidates = [b for b in healthy if b.serves(profile)] or healthy
+                if not candidates:
+                    raise NoBackendAvailableError(f"No healthy LLM backend for profile '{profile}'")
+                free = [b for b in candidates if b.outstanding < b.max_concurrency]
+                if free:
+                    backend = min(free, key=lambda b: (b.load, b.outstanding))
+                    backend.outstanding += 1
+                    self._outstanding[backend.name].set(backend.outstanding)
+                    return backend
+                if not wait:
+                    raise SlotUnavailable(f"No free LLM backend for profile '{profile}'")
+                if deadline is None:
+                    self._cond.wait(timeout=0.25)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMTimeoutError(f"No LLM backend slot for profile '{profile}' freed up before the deadline")
+                # Periodic wake-up keeps cancellation responsive, as in LLMScheduler.acquire
+                self._cond.wait(timeout=min(remaining, 0.25))
+
+    def _release(self, backend: Backend, error: Optional[BaseException]):
+        """Return the slot; `error` is a backend failure (see is_backend_failure) or None"""
+        with self._cond:
+            backend.outstanding -= 1
+            self._outstanding[backend.name].set(backend.outstanding)
+            if error is None:
+                backend.consecutive_failures = 0
+                backend.served += 1
+            else:
+                self._failures[backend.name].inc()
+                backend.consecutive_failures += 1
+                if backend.healthy and backend.consecutive_failures >= self.failure_threshold:
+                    logger.warning(f"Taking LLM backend {backend.name} out of rotation: {error}")
+                    backend.healthy = False
+                    backend.unhealthy_since = time.monotonic()
+                    self._healthy[backend.name].set(0)
+            self._cond.notify_all()
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3,
+                 max_tokens: Optional[int] = None, options: Optional[GenerationOptions] = None,
+                 attempted: Optional[List[str]] = None, exclude: Sequence[str] = (), max_backends: Optional[int] = None,
+                 wait: bool = True, **kwargs) -> str:
+        """Generate on the best backend, failing over on backend faults.
+
+        Routing keywords: `attempted` collects the name of every backend called,
+        `exclude` names backends to skip (a hedge avoids the primary's),
+        `max_backends` caps the backends tried (the caller's remaining attempt
+        budget) and wait=False raises SlotUnavailable instead of waiting for a
+        free backend. When every backend tried failed, the last error is raised.
+        """
+        options = resolve_options(options, max_tokens)
+        deadline = call_deadline(options.timeout)
+        self._probe_unhealthy()
+        tried = set(exclude)
+        limit = len(self.backends) if max_backends is None else max(1, max_backends)
+        calls = 0
+        last_error = None
+
+        while len(tried) < len(self.backends) and calls < limit:
+            try:
+                backend = self._acquire(options.profile, tried, deadline, wait)
+            except NoBackendAvailableError:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.add(backend.name)
+            calls += 1
+            if attempted is not None:
+                attempted.append(backend.name)
+            call_options = options
+            if deadline is not None:
+                # Time spent waiting for the slot comes out of this call's timeout
+                call_options = options.merged(timeout=max(0.001, deadline - time.monotonic()))
+            try:
+                result = backend.client.generate(prompt=prompt, system_prompt=system_prompt, temperature=temperature,
+                                                 options=call_options, **kwargs)
+            except Exception as e:
+                if not is_backend_failure(e):
+                    # Cancellation or a bad request: the backend is fine and the others would fail it too
+                    self._release(backend, None)
+                    raise
+                self._release(backend, e)
+                logger.warning(f"LLM backend {backend.name} failed: {e}")
+                last_error = e
+                continue
+            self._release(backend, None)
+            return result
+
+        if last_error is not None:
+            raise last_error
+        raise NoBackendAvailableError(f"No LLM backend left for profile '{options.profile}'")
+
+    def generate_with_context(self, query: str, context: str, system_prompt: str, temperature: float = 0.3,
+                              max_tokens: Optional[int] = None, additional_info: Optional[Dict] = None,
+                              options: Optional[GenerationOptions] = None, **kwargs) -> str:
+        prompt = build_context_prompt(query, context, additional_info)
+        return self.generate(prompt=prompt, system_prompt=system_prompt, temperature=temperature,
+                             max_tokens=max_tokens, options=options, **kwargs)
+
+    def stats(self) -> List[Dict]:
+        with self._cond:
+            return [
+                {'backend': b.name, 'healthy': b.healthy, 'outstanding': b.outstanding,
+                 'max_concurrency': b.max_concurrency, 'served': b.served,
+                 'profiles': sorted(b.profiles) if b.profiles else None}
+                for b in self.backends
+            ]
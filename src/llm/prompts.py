@@ -0,0 +1,52 @@
+"""Prompt Layout - Shared, prefix-first prompt construction for every LLM backend
+
+Servers that cache the KV state of a prompt prefix (Ollama keeps it for the
+loaded model, hosted APIs do prefix caching) only help when the long, stable
+parts come first. Every prompt is therefore laid out as:
+
+    system message (fixed per agent)
+    retrieved context
+    additional information from earlier agents
+    the user's query and the closing instruction
+
+so nothing that changes per request sits in front of text that repeats.
+"""
+from typing import Dict, List, Optional
+
+CONTEXT_HEADER = "Context from Ayurvedic texts:"
+CONTEXT_INSTRUCTION = "Based on the context provided above, please provide a response."
+
+
+def format_additional_info(additional_info: Optional[Dict]) -> str:
+    if not additional_info:
+        return ""
+    info_str = "\n".join(f"{key}: {value}" for key, value in additional_info.items())
+    return f"Additional Information:\n{info_str}"
+
+
+def build_context_prompt(query: str, context: str, additional_info: Optional[Dict] = None) -> str:
+    """User turn for a RAG generation: context, then earlier findings, then the query"""
+    parts = [f"{CONTEXT_HEADER}\n\n{context}", "---"]
+    info = format_additional_info(additional_info)
+    if info:
+        parts.append(info)
+    parts.append(f"User Query: {query}\n\n{CONTEXT_INSTRUCTION}")
+    return "\n\n".join(parts)
+
+
+def build_messages(prompt: str, system_prompt: Optional[str] = None) -> List[Dict[str, str]]:
+    """Chat messages with the (stable) system prompt kept as its own first message"""
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def shared_prefix_length(first: str, second: str) -> int:
+    """Characters two prompts have in common from the start"""
+    limit = min(len(first), len(second))
+    for i in range(limit):
+        if first[i] != second[i]:
+            return i
+    return limit
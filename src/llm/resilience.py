@@ -0,0 +1,237 @@
+"""
+LLM Resilience - Retries, deadlines and hedged requests around any LLM client
+
+Retryable failures (HTTP 429/5xx, timeouts, connection errors) are retried
+with exponential backoff and jitter, waiting at least as long as the
+server's Retry-After. Every call runs against a stage deadline: the stage's
+own timeout (GenerationOptions.timeout) capped by what is left of the
+consultation deadline, so one slow backend cannot eat the whole
+consultation. With a hedge client configured, a call that outlives the
+recent latency percentile for its stage is duplicated to the hedge backend
+and whichever answer arrives first wins.
+
+Over a backend pool (LLMRouterClient) one attempt budget covers both the
+pool's failover and these retries, and a hedge goes to a backend other than
+the primary's; it is skipped rather than queued when no such backend (or
+scheduler slot) is free.
+"""
+
+import os
+import time
+import random
+import threading
+import contextvars
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+import numpy as np
+
+from src.monitoring.metrics import REGISTRY, MetricsRegistry
+from src.monitoring.tracing import span
+from .options import GenerationOptions, resolve_options
+from .prompts import build_context_prompt
+from .scheduler import SlotUnavailable, call_deadline
+
+logger = logging.getLogger(__name__)
+
+
+class LLMHTTPError(RuntimeError):
+    """A backend call that failed at the HTTP/transport level; status_code is None when no response came back"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class LLMTimeoutError(RuntimeError):
+    """Raised when a call (or its stage deadline) runs out of time"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds, from either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    jitter: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number `attempt` (1-based); never shorter than Retry-After"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, LLMHTTPError):
+        return error.retryable
+    return isinstance(error, LLMTimeoutError)
+
+
+class ResilientLLMClient:
+    """Wrap an LLM client (or backend pool) with retries, deadlines and optional hedging"""
+
+    def __init__(self, llm_client, policy: RetryPolicy = None, default_stage_timeout: float = None,
+                 hedge_client=None, hedge_percentile: float = None, hedge_min_samples: int = 20,
+                 registry: MetricsRegistry = REGISTRY):
+        if default_stage_timeout is None:
+            default_stage_timeout = float(os.getenv("LLM_STAGE_TIMEOUT", "120"))
+        if hedge_percentile is None:
+            hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+
+        self.llm_client = llm_client
+        self.policy = policy or RetryPolicy.from_env()
+        self.default_stage_timeout = default_stage_timeout
+        self.hedge_client = hedge_client
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge") if hedge_client else None
+
+        self._retries = registry.counter("ayurmind_llm_retries_total", "LLM calls retried after a retryable failure")
+        self._hedges = registry.counter("ayurmind_llm_hedges_total", "Hedged LLM requests sent or skipped")
+        self._hedges_skipped = registry.counter("ayurmind_llm_hedges_skipped_total", "Hedges not sent because no other backend or slot was free")
+        self._hedge_wins = registry.counter("ayurmind_llm_hedge_wins_total", "Hedged requests that answered first")
+        self._deadline_exceeded = registry.counter("ayurmind_llm_deadline_exceeded_total", "LLM calls abandoned at their stage deadline")
+
+    def __getattr__(self, name):
+        return getattr(self.llm_client, name)
+
+    def stage_deadline(self, options: GenerationOptions) -> float:
+        """Monotonic deadline for one stage: its timeout, capped by the consultation deadline"""
+        return call_deadline(options.timeout or self.default_stage_timeout)
+
+    def hedge_delay(self, profile: str) -> Optional[float]:
+        """Recent latency percentile for this stage, once enough calls have been seen"""
+        with self._lock:
+            samples = list(self._latencies.get(profile, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return float(np.percentile(samples, self.hedge_percentile))
+
+    def _record_latency(self, profile: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(profile, deque(maxlen=200)).append(seconds)
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3,
+                 max_tokens: Optional[int] = None, options: Optional[GenerationOptions] = None, **kwargs) -> str:
+        options = resolve_options(options, max_tokens)
+        deadline = self.stage_deadline(options)
+        call = dict(prompt=prompt, system_prompt=system_prompt, temperature=temperature, **kwargs)
+        routed = getattr(self.llm_client, 'routes_backends', False)
+        attempts = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._deadline_exceeded.inc()
+                raise LLMTimeoutError(f"Stage '{options.profile}' ran out of time after {attempts} attempt(s)")
+
+            # A pool counts every backend it fails over to against the same budget
+            attempted = [] if routed else None
+            route = {'attempted': attempted, 'max_backends': self.policy.max_attempts - attempts} if routed else {}
+            started = time.monotonic()
+            try:
+                with span("llm.attempt", profile=options.profile, attempt=attempts + 1):
+                    result = self._attempt(call, route, options.merged(timeout=remaining), deadline)
+                self._record_latency(options.profile, time.monotonic() - started)
+                return result
+            except Exception as e:
+                attempts += max(1, len(attempted)) if attempted is not None else 1
+                if not _is_retryable(e) or attempts >= self.policy.max_attempts:
+                    raise
+                delay = self.policy.backoff(attempts, getattr(e, 'retry_after', None))
+                if time.monotonic() + delay >= deadline:
+                    self._deadline_exceeded.inc()
+                    raise LLMTimeoutError(f"Stage '{options.profile}' cannot retry before its deadline: {e}") from e
+                logger.warning(f"LLM call failed ({e}); attempt {attempts}/{self.policy.max_attempts}, retrying in {delay:.1f}s")
+                self._retries.inc()
+                time.sleep(delay)
+
+    def _attempt(self, call: Dict, route: Dict, options: GenerationOptions, deadline: float) -> str:
+        delay = self.hedge_delay(options.profile) if self.hedge_client is not None else None
+        if delay is None or delay >= options.timeout:
+            return self.llm_client.generate(options=options, **call, **route)
+
+        # Worker threads need the caller's context (consultation, parent span)
+        primary = self._executor.submit(contextvars.copy_context().run, self.llm_client.generate,
+                                        options=options, **call, **route)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge_route = {}
+        if getattr(self.hedge_client, 'routes_backends', False):
+            # Another backend than the primary's, and only if one is free right now
+            hedge_route = {'exclude': list(route.get('attempted') or ()), 'wait': False}
+        self._hedges.inc()
+        remaining = max(0.001, deadline - time.monotonic())
+        hedge = self._executor.submit(contextvars.copy_context().run, self._hedge,
+                                      options=options.merged(timeout=remaining), **call, **hedge_route)
+        pending = {primary, hedge}
+        errors = {}
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[future] = e
+                    continue
+                if future is hedge:
+                    self._hedge_wins.inc()
+                # The slower request is left to finish on its own (holding its scheduler slot); its answer is discarded
+                return result
+        # The primary's failure says more than a skipped or failed hedge
+        if errors:
+            raise errors.get(primary) or errors[hedge]
+        raise LLMTimeoutError(f"Stage '{options.profile}' timed out waiting for primary and hedged requests")
+
+    def _hedge(self, **call) -> str:
+        try:
+            return self.hedge_client.generate(**call)
+        except SlotUnavailable:
+            self._hedges_skipped.inc()
+            raise
+
+    def generate_with_context(self, query: str, context: str, system_prompt: str, temperature: float = 0.3,
+                              max_tokens: Optional[int] = None, additional_info: Optional[Dict] = None,
+                              options: Optional[GenerationOptions] = None, **kwargs) -> str:
+        prompt = build_context_prompt(query, context, additional_info)
+        return self.generate(prompt=prompt, system_prompt=system_prompt, temperature=temperature,
+                             max_tokens=max_tokens, options=options, **kwargs)
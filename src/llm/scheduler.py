@@ -0,0 +1,334 @@
+"""
+LLM Request Scheduler - Fair, bounded access to the LLM backend
+
+Consultations are admitted up to a fixed capacity (backpressure beyond it),
+every LLM call then waits for one of a bounded number of in-flight slots.
+Waiting calls are served round-robin across sessions, so one user's four-call
+consultation cannot starve everyone else, and a cancelled consultation gives
+up its place before its next call.
+"""
+
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import Executor, Future
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from src.monitoring.metrics import REGISTRY, MetricsRegistry
+from .options import resolve_options
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler cannot admit another consultation"""
+
+
+class RequestCancelled(RuntimeError):
+    """Raised inside a consultation whose client went away"""
+
+
+class SlotUnavailable(RuntimeError):
+    """Raised by a call that must not wait (a hedged request) when no slot or backend is free"""
+
+
+_current_consultation: contextvars.ContextVar = contextvars.ContextVar("ayurmind_consultation", default=None)
+
+
+class Consultation:
+    """One admitted request; carries the session id and cancellation flag to LLM calls"""
+
+    def __init__(self, scheduler: "LLMScheduler", session_id: str, timeout: Optional[float] = None):
+        self.scheduler = scheduler
+        self.session_id = session_id
+        self.admitted_at = time.monotonic()
+        # Overall budget; LLM stages derive their own deadlines from it (src/llm/resilience.py)
+        self.deadline = self.admitted_at + timeout if timeout else None
+        self._cancelled = threading.Event()
+        self._future: Optional[Future] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the consultation deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        if not self._cancelled.is_set():
+            self._cancelled.set()
+            self.scheduler._cancelled.inc()
+            self.scheduler._wake()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelled(f"Consultation for session {self.session_id} was cancelled")
+
+    def run(self, fn, *args, **kwargs):
+        """Call `fn` with this consultation bound, e.g. from a worker thread"""
+        token = _current_consultation.set(self)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_consultation.reset(token)
+
+    def submit(self, executor: Executor, fn, *args, **kwargs) -> Future:
+        """Run `fn` on `executor`; the consultation keeps its capacity until the future is done"""
+        self._future = executor.submit(self.run, fn, *args, **kwargs)
+        return self._future
+
+
+def current_consultation() -> Optional[Consultation]:
+    return _current_consultation.get()
+
+
+def call_deadline(timeout: Optional[float]) -> Optional[float]:
+    """Monotonic deadline for one LLM call: `timeout` seconds from now, capped by the
+    current consultation's deadline; None without either"""
+    deadline = time.monotonic() + timeout if timeout else None
+    consultation = current_consultation()
+    if consultation is not None and consultation.deadline is not None:
+        deadline = consultation.deadline if deadline is None else min(deadline, consultation.deadline)
+    return deadline
+
+
+def _deadline_passed(what: str):
+    from .resilience import LLMTimeoutError  # resilience builds on this module
+    return LLMTimeoutError(f"{what} before the call's deadline")
+
+
+class LLMScheduler:
+    """Global in-flight LLM budget with per-session round-robin fairness"""
+
+    def __init__(self, max_in_flight: int = None, max_queue: int = None, consultation_timeout: float = None,
+                 registry: MetricsRegistry = REGISTRY):
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "2"))
+        if max_queue is None:
+            max_queue = int(os.getenv("LLM_MAX_QUEUE", "16"))
+        if consultation_timeout is None:
+            consultation_timeout = float(os.getenv("CONSULTATION_TIMEOUT", "300"))
+
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.capacity = self.max_in_flight + self.max_queue
+        self.consultation_timeout = consultation_timeout or None
+
+        self._cond = threading.Condition()
+        self._waiting: "OrderedDict[str, deque]" = OrderedDict()
+        self._in_flight = 0
+        self._queued = 0
+        self._active = 0
+
+        self._queue_depth = registry.gauge("ayurmind_llm_queue_depth", "LLM calls waiting for a slot")
+        self._in_flight_gauge = registry.gauge("ayurmind_llm_in_flight", "LLM calls currently running")
+        self._active_gauge = registry.gauge("ayurmind_consultations_active", "Admitted consultations")
+        self._wait_time = registry.histogram("ayurmind_llm_queue_wait_seconds", "Time an LLM call waited for a slot")
+        self._rejected = registry.counter("ayurmind_consultations_rejected_total", "Consultations refused with backpressure")
+        self._cancelled = registry.counter("ayurmind_consultations_cancelled_total", "Consultations cancelled by the client")
+
+    @contextmanager
+    def consultation(self, session_id: str):
+        """Admit a consultation or raise QueueFullError; cancels it if the block exits early.
+
+        Early means with an exception, or (for work started with
+        Consultation.submit) while its future is still pending, e.g. a stream
+        that returns when its client disconnects. Capacity is held until the
+        work finishes: for submitted work that is when its future is done,
+        which may be after the caller has left the block (a cancelled call
+        still runs to its next cancellation check).
+        """
+        with self._cond:
+            if self._active >= self.capacity:
+                self._rejected.inc()
+                raise QueueFullError("AyurMind is busy right now. Please try again in a moment.")
+            self._active += 1
+            self._active_gauge.set(self._active)
+
+        consultation = Consultation(self, session_id, self.consultation_timeout)
+        completed = False
+        try:
+            yield consultation
+            completed = True
+        finally:
+            future = consultation._future
+            if not completed or (future is not None and not future.done()):
+                # Caller abandoned the work (client disconnect, stop button, error)
+                consultation.cancel()
+                if future is not None:
+                    future.cancel()  # frees the capacity at once if it never started
+            if future is not None:
+                future.add_done_callback(lambda _: self._finish())
+            else:
+                self._finish()
+
+    def _finish(self):
+        with self._cond:
+            self._active -= 1
+            self._active_gauge.set(self._active)
+
+    @contextmanager
+    def slot(self, consultation: Optional[Consultation] = None, deadline: Optional[float] = None):
+        """Hold one in-flight LLM slot for the duration of the block"""
+        self.acquire(consultation, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, consultation: Optional[Consultation] = None, deadline: Optional[float] = None):
+        """Wait for a slot in round-robin order; LLMTimeoutError if none is granted by `deadline` (monotonic)"""
+        session_id = consultation.session_id if consultation else "_anonymous"
+        waiter = object()
+        started = time.monotonic()
+
+        with self._cond:
+            self._waiting.setdefault(session_id, deque()).append(waiter)
+            self._queued += 1
+            self._queue_depth.set(self._queued)
+            granted = False
+            try:
+                while True:
+                    if consultation is not None:
+                        consultation.raise_if_cancelled()
+                    if self._in_flight < self.max_in_flight and self._peek() is waiter:
+                        self._grant(session_id)
+                        granted = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise _deadline_passed("No LLM slot freed up")
+                    # Periodic wake-up keeps cancellation responsive without extra signalling
+                    self._cond.wait(timeout=0.25 if remaining is None else min(0.25, remaining))
+            finally:
+                if not granted:
+                    self._remove(session_id, waiter)
+                self._queued -= 1
+                self._queue_depth.set(self._queued)
+
+        self._wait_time.observe(time.monotonic() - started)
+
+    def try_acquire(self, consultation: Optional[Consultation] = None) -> bool:
+        """Take a slot only if one is free and no call is waiting for it"""
+        with self._cond:
+            if consultation is not None:
+                consultation.raise_if_cancelled()
+            if self._in_flight >= self.max_in_flight or self._waiting:
+                return False
+            self._in_flight += 1
+            self._in_flight_gauge.set(self._in_flight)
+            return True
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._in_flight_gauge.set(self._in_flight)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'active_consultations': self._active,
+                'max_in_flight': self.max_in_flight,
+                'capacity': self.capacity,
+                'queue_wait_p95_seconds': self._wait_time.percentile(95),
+            }
+
+    def _peek(self):
+        # Sessions rotate to the back after being served, giving round-robin order
+        for waiters in self._waiting.values():
+            return waiters[0]
+        return None
+
+    def _grant(self, session_id: str):
+        waiters = self._waiting[session_id]
+        waiters.popleft()
+        if waiters:
+            self._waiting.move_to_end(session_id)
+        else:
+            del self._waiting[session_id]
+        self._in_flight += 1
+        self._in_flight_gauge.set(self._in_flight)
+        # The next waiter may be eligible too when more than one slot is free
+        self._cond.notify_all()
+
+    def _remove(self, session_id: str, waiter):
+        waiters = self._waiting.get(session_id)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            return
+        if not waiters:
+            del self._waiting[session_id]
+        self._cond.notify_all()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class ScheduledLLMClient:
+    """Wrap an LLM client so every generation goes through the scheduler.
+
+    Sits below ResilientLLMClient (src/llm/factory.py): each attempt, hedge
+    and abandoned slower request holds its own slot until it returns, and
+    retry backoff happens without one.
+    """
+
+    def __init__(self, llm_client, scheduler: LLMScheduler):
+        self.llm_client = llm_client
+        self.scheduler = scheduler
+
+    def generate(self, *args, wait: bool = True, **kwargs) -> str:
+        """wait=False (hedged requests) raises SlotUnavailable instead of queueing for a slot.
+
+        The wait for a slot ends at the call's deadline (its options.timeout, capped by the
+        consultation deadline) and whatever it used comes out of the call's timeout.
+        """
+        consultation = current_consultation()
+        deadline = self._deadline(kwargs)
+        if wait:
+            self.scheduler.acquire(consultation, deadline)
+        elif not self.scheduler.try_acquire(consultation):
+            raise SlotUnavailable("No free LLM slot")
+        try:
+            self._start(consultation, deadline, kwargs)
+            if not wait and getattr(self.llm_client, 'routes_backends', False):
+                kwargs['wait'] = False
+            return self.llm_client.generate(*args, **kwargs)
+        finally:
+            self.scheduler.release()
+
+    def generate_with_context(self, *args, **kwargs) -> str:
+        consultation = current_consultation()
+        deadline = self._deadline(kwargs)
+        with self.scheduler.slot(consultation, deadline):
+            self._start(consultation, deadline, kwargs)
+            return self.llm_client.generate_with_context(*args, **kwargs)
+
+    @staticmethod
+    def _deadline(kwargs: Dict) -> Optional[float]:
+        options = kwargs.get('options')
+        return call_deadline(options.timeout if options is not None else None)
+
+    @staticmethod
+    def _start(consultation: Optional[Consultation], deadline: Optional[float], kwargs: Dict):
+        """Last checks once a slot is held; the call gets only the time left before its deadline"""
+        if consultation is not None:
+            consultation.raise_if_cancelled()
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _deadline_passed("The LLM slot was granted too late")
+            kwargs['options'] = resolve_options(kwargs.get('options')).merged(timeout=remaining)
+
+    def __getattr__(self, name):
+        return getattr(self.llm_client, name)
@@ -0,0 +1,171 @@
+"""Stub LLM Server - Local HTTP stand-in for Ollama and OpenRouter that records every request
+
+Speaks enough of both APIs for OllamaClient and OpenRouterClient to run
+against it unchanged (point them at `server.base_url`), and keeps the parsed
+request bodies so scripts can check what actually goes over the wire.
+Faults (error statuses, Retry-After, extra latency) can be queued with
+inject() to exercise the retry and hedging paths.
+"""
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _count_tokens(text: str) -> int:
+    return len(text.split())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AyurMindStub/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _send_json(self, status: int, body: Dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.record("GET", self.path, None)
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": stub.model}]})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        stub.record("POST", self.path, body)
+
+        fault = stub.next_fault()
+        delay = stub.latency + (fault['delay_ms'] / 1000.0 if fault else 0.0)
+        if delay:
+            time.sleep(delay)
+        if fault and fault['status']:
+            data = json.dumps({"error": f"injected fault {fault['status']}"}).encode('utf-8')
+            self.send_response(fault['status'])
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if fault['retry_after'] is not None:
+                self.send_header("Retry-After", str(fault['retry_after']))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        if self.path == "/api/chat":
+            prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+            reply = stub.reply_for(prompt)
+            self._send_json(200, {
+                "model": body.get("model", stub.model),
+                "message": {"role": "assistant", "content": reply},
+                "done": True,
+                "prompt_eval_count": _count_tokens(prompt),
+                "eval_count": _count_tokens(reply),
+            })
+        elif self.path == "/api/generate":
+            prompt = body.get("prompt", "")
+            reply = stub.reply_for(prompt)
+            self._send_json(200, {
+                "model": body.get("model", stub.model),
+                "response": reply,
+                "done": True,
+                "prompt_eval_count": _count_tokens(prompt),
+                "eval_count": _count_tokens(reply),
+            })
+        elif self.path.endswith("/chat/completions"):
+            prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+            reply = stub.reply_for(prompt)
+            self._send_json(200, {
+                "model": body.get("model", stub.model),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": _count_tokens(prompt), "completion_tokens": _count_tokens(reply)},
+            })
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+
+class RecordingStubServer:
+    """Threaded stub server on localhost; use as a context manager or call start()/stop()"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, model: str = "stub", latency_ms: float = 0.0):
+        self.host = host
+        self.port = port
+        self.model = model
+        self.latency = latency_ms / 1000.0
+        self.requests: List[Dict] = []
+        self._faults: deque = deque()
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "RecordingStubServer":
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="llm-stub-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub LLM server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "RecordingStubServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def record(self, method: str, path: str, body: Optional[Dict]):
+        with self._lock:
+            self.requests.append({'method': method, 'path': path, 'body': body, 'time': time.time()})
+
+    def inject(self, status: Optional[int] = None, delay_ms: float = 0.0, retry_after: Optional[float] = None, count: int = 1):
+        """Queue a fault for the next `count` generation requests"""
+        with self._lock:
+            for _ in range(count):
+                self._faults.append({'status': status, 'delay_ms': delay_ms, 'retry_after': retry_after})
+
+    def next_fault(self) -> Optional[Dict]:
+        with self._lock:
+            return self._faults.popleft() if self._faults else None
+
+    def reply_for(self, prompt: str) -> str:
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]
+        return f"[stub:{digest}] 1. Assessment\n2. Recommendations"
+
+    def generation_requests(self) -> List[Dict]:
+        """Recorded POSTs, i.e. the actual generation calls"""
+        with self._lock:
+            return [entry for entry in self.requests if entry['method'] == "POST"]
+
+    def clear(self):
+        with self._lock:
+            self.requests.clear()
+            self._faults.clear()
@@ -0,0 +1,69 @@
+"""Process Memory - RSS, PSS and unique (USS) memory from /proc, for comparing serving modes
+
+RSS counts every resident page, including pages a forked worker still shares
+with its parent; USS counts only the pages a process alone holds (what
+killing it would free), and PSS splits shared pages among their sharers, so
+PSS summed over a process tree is its real footprint. Linux only; elsewhere
+the functions return empty results.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .metrics import REGISTRY, MetricsRegistry
+
+_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'uss',
+    'Private_Dirty': 'uss',
+    'Swap': 'swap',
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """Bytes of rss, pss, uss, shared and swap for `pid` (default: this process)"""
+    path = Path(f"/proc/{pid or os.getpid()}/smaps_rollup")
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return {}
+    memory = {kind: 0 for kind in _FIELDS.values()}
+    for line in lines:
+        field, _, value = line.partition(":")
+        kind = _FIELDS.get(field)
+        if kind is not None:
+            memory[kind] += int(value.split()[0]) * 1024
+    return memory
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of `pid`"""
+    children = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children.extend(int(child) for child in (task / "children").read_text().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def process_tree(pid: int) -> List[int]:
+    """`pid` and all of its descendants, parents before children"""
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop(0)
+        tree.append(current)
+        pending.extend(child_pids(current))
+    return tree
+
+
+def record_process_memory(registry: MetricsRegistry = REGISTRY) -> Dict[str, int]:
+    """Set ayurmind_process_memory_bytes{kind=...} gauges for this process"""
+    memory = process_memory()
+    for kind, value in memory.items():
+        registry.gauge("ayurmind_process_memory_bytes", "Memory of this worker process by kind (rss, pss, uss, shared, swap)",
+                       labels={'kind': kind}).set(value)
+    return memory
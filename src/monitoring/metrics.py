@@ -0,0 +1,195 @@
+"""Metrics - Lightweight in-process counters, gauges and histograms"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+# Seconds; tuned for embedding/search (ms) through LLM generation (minutes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    def __init__(self, name: str, help: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self, name: str, help: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def snapshot(self) -> Dict:
+        """Return count, sum and cumulative bucket counts keyed by upper bound"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            cumulative[bound] = running
+        return {'count': count, 'sum': total, 'buckets': cumulative}
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate the q-th percentile (0-100) as the upper bound of its bucket"""
+        snapshot = self.snapshot()
+        if not snapshot['count']:
+            return None
+        target = snapshot['count'] * q / 100.0
+        for bound, running in snapshot['buckets'].items():
+            if running >= target:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Get-or-create store for named metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, Tuple], object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, labels: Optional[Dict[str, str]], **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = cls(name, labels=labels, **kwargs)
+                self._metrics[key] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get_or_create(Counter, name, labels, help=help)
+
+    def gauge(self, name: str, help: str = "", labels: Optional[Dict[str, str]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, labels, help=help)
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS,
+                  labels: Optional[Dict[str, str]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, labels, help=help, buckets=buckets)
+
+    def collect(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict:
+        """Plain-dict view of every metric, for logging or JSON export"""
+        result = {}
+        for metric in self.collect():
+            key = metric.name
+            if metric.labels:
+                key += "{" + ",".join(f"{k}={v}" for k, v in sorted(metric.labels.items())) + "}"
+            result[key] = metric.snapshot() if isinstance(metric, Histogram) else metric.value
+        return result
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    merged = {**labels, **(extra or {})}
+    if not merged:
+        return ""
+    pairs = []
+    for key, value in sorted(merged.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus(registry: "MetricsRegistry" = None) -> str:
+    """Render every metric in the Prometheus text exposition format"""
+    registry = registry or REGISTRY
+    by_name: Dict[str, list] = {}
+    for metric in registry.collect():
+        by_name.setdefault(metric.name, []).append(metric)
+
+    lines = []
+    for name in sorted(by_name):
+        metrics = by_name[name]
+        kind = {Counter: 'counter', Gauge: 'gauge', Histogram: 'histogram'}[type(metrics[0])]
+        if metrics[0].help:
+            lines.append(f"# HELP {name} {metrics[0].help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for metric in metrics:
+            if isinstance(metric, Histogram):
+                snapshot = metric.snapshot()
+                for bound, count in snapshot['buckets'].items():
+                    lines.append(f"{name}_bucket{_format_labels(metric.labels, {'le': _format_value(bound)})} {count}")
+                lines.append(f"{name}_sum{_format_labels(metric.labels)} {_format_value(snapshot['sum'])}")
+                lines.append(f"{name}_count{_format_labels(metric.labels)} {snapshot['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(metric.labels)} {_format_value(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,184 @@
+"""
+Tracing - Span-based timing across the consultation pipeline
+
+Enable with AYURMIND_TRACE=json,metrics (either or both exporters):
+- json: one JSON line per finished span on the 'ayurmind.trace' logger
+- metrics: span durations and LLM token counts in the metrics registry,
+  renderable in Prometheus text format
+
+When AYURMIND_TRACE is unset, span() returns a shared no-op object, so
+instrumented code pays one attribute lookup and one branch per call.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import functools
+import contextvars
+from typing import Dict, List, Optional
+
+from .metrics import REGISTRY, MetricsRegistry
+
+trace_logger = logging.getLogger('ayurmind.trace')
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("ayurmind_span", default=None)
+
+
+class Span:
+    """A timed unit of work; nested spans share the root's trace_id"""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'labels', 'attributes',
+                 'start_time', 'duration', 'error', '_start', '_token')
+
+    def __init__(self, tracer: "Tracer", name: str, labels: Optional[Dict[str, str]], attributes: Dict):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.labels = labels or {}
+        self.attributes = attributes
+        self.start_time = None
+        self.duration = None
+        self.error = None
+        self._start = None
+        self._token = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration_ms': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'error': self.error,
+            **self.labels,
+            **self.attributes,
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, key: str, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLogExporter:
+    """Write each finished span as a JSON log line"""
+
+    def __init__(self, logger: logging.Logger = trace_logger):
+        self.logger = logger
+
+    def export(self, span: Span):
+        self.logger.info(json.dumps(span.to_dict(), default=str))
+
+
+class MetricsExporter:
+    """Aggregate span durations and token counts into the metrics registry"""
+
+    TOKEN_ATTRIBUTES = ('prompt_tokens', 'completion_tokens')
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+
+    def export(self, span: Span):
+        labels = {'span': span.name, **span.labels}
+        self.registry.histogram("ayurmind_span_duration_seconds", "Duration of traced operations",
+                                labels=labels).observe(span.duration)
+        if span.error:
+            self.registry.counter("ayurmind_span_errors_total", "Traced operations that raised",
+                                  labels=labels).inc()
+        for attribute in self.TOKEN_ATTRIBUTES:
+            count = span.attributes.get(attribute)
+            if count:
+                self.registry.counter("ayurmind_llm_tokens_total", "Tokens processed by LLM backends",
+                                      labels={**labels, 'kind': attribute}).inc(count)
+
+
+EXPORTERS = {'json': JsonLogExporter, 'metrics': MetricsExporter}
+
+
+class Tracer:
+    def __init__(self, exporters: List = None):
+        self.exporters = list(exporters or [])
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        names = [name.strip().lower() for name in os.getenv("AYURMIND_TRACE", "").split(",") if name.strip()]
+        unknown = [name for name in names if name not in EXPORTERS]
+        if unknown:
+            raise ValueError(f"Unknown AYURMIND_TRACE exporter(s): {', '.join(unknown)}. Choose from: {', '.join(EXPORTERS)}")
+        return cls([EXPORTERS[name]() for name in names])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def span(self, name: str, labels: Optional[Dict[str, str]] = None, **attributes):
+        if not self.exporters:
+            return NOOP_SPAN
+        return Span(self, name, labels, attributes)
+
+    def _finish(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                trace_logger.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+
+TRACER = Tracer.from_env()
+
+
+def span(name: str, labels: Optional[Dict[str, str]] = None, **attributes):
+    """Time a block: `with span("vectorstore.search", n_results=5) as s: ...`"""
+    return TRACER.span(name, labels, **attributes)
+
+
+def current_span():
+    """The innermost active span, or a no-op span outside any trace"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACER.exporters:
+                return fn(*args, **kwargs)
+            with TRACER.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
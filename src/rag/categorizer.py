@@ -0,0 +1,133 @@
+"""
+Chunk Categorizer - Multi-label categories from prototype embeddings at index time
+
+Keyword first-match tagging put nearly every chunk that mentions "vata" in
+prakriti and left index pages untagged, so filtered agent searches were
+both too broad and silently incomplete. Here each chunk embedding is scored
+against per-category prototype centroids in one matrix product and gets:
+
+- cat_<category>: True for every category it clearly belongs to
+  (always its best one, plus any within `margin` of it above `min_score`)
+- score_<category>: the cosine similarity, for inspection and re-thresholding
+- category: the best label, kept for older indexes and tools
+
+The vector store filters on cat_<category> once an index carries the flags.
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LABEL_PREFIX = "cat_"
+SCORE_PREFIX = "score_"
+
+# Short passages in the register of the corpus; their normalised mean is the category centroid
+CATEGORY_PROTOTYPES = {
+    'prakriti': [
+        "The natural constitution of a person is determined at conception by the predominance of the doshas.",
+        "A person of vata constitution is thin, with dry skin, quick movements and a restless mind.",
+        "Those of pitta constitution have a medium build, warm body, sharp intellect and strong appetite.",
+        "Persons of kapha constitution are well built, calm, steady, with oily skin and deep sleep.",
+        "The physician examines the body frame, temperament and habits to know the prakriti.",
+    ],
+    'vikriti': [
+        "When the doshas are vitiated they cause disease, showing characteristic signs and symptoms.",
+        "The causes, premonitory signs, manifestations and pathogenesis of fever are described.",
+        "Aggravated vata produces pain, dryness, tremors, constipation and insomnia.",
+        "Vitiated pitta gives rise to burning sensation, inflammation, excessive thirst and acidity.",
+        "The disorder is diagnosed by examining the imbalance of doshas and the affected tissues.",
+    ],
+    'treatment': [
+        "The treatment consists of purification therapies followed by pacifying measures.",
+        "Herbal formulations, diet and lifestyle regimens are prescribed to restore balance.",
+        "Basti, vamana and virechana are employed to eliminate the aggravated doshas.",
+        "The patient should take light, warm food and medicated ghee with suitable herbs.",
+        "The physician should administer remedies according to the strength of the disease and the patient.",
+    ],
+    'general': [
+        "This chapter explains the fundamental principles of Ayurveda and the purpose of life.",
+        "The daily regimen, seasonal conduct and rules of healthy living are taught.",
+        "The qualities of the physician, the medicine, the attendant and the patient are described.",
+        "The six tastes, the properties of substances and the role of agni in digestion are explained.",
+        "Knowledge of the mind, the senses and the self is the basis of health.",
+    ],
+}
+
+
+def label_key(category: str) -> str:
+    return f"{LABEL_PREFIX}{category}"
+
+
+def has_category(metadata: Dict, category: str) -> bool:
+    """Whether a chunk is tagged with `category`, for both multi-label and legacy metadata"""
+    flag = metadata.get(label_key(category))
+    if flag is not None:
+        return bool(flag)
+    return metadata.get('category') == category
+
+
+class PrototypeCategorizer:
+    """Nearest-centroid multi-label tagging of already-computed chunk embeddings"""
+
+    def __init__(self, embedding_generator, prototypes: Optional[Dict[str, List[str]]] = None,
+                 min_score: float = None, margin: float = None):
+        if min_score is None:
+            min_score = float(os.getenv("CATEGORY_MIN_SCORE", "0.25"))
+        if margin is None:
+            margin = float(os.getenv("CATEGORY_MARGIN", "0.04"))
+
+        self.embedding_generator = embedding_generator
+        self.prototypes = prototypes or CATEGORY_PROTOTYPES
+        self.min_score = min_score
+        self.margin = margin
+        self.categories: List[str] = list(self.prototypes)
+        self._centroids: Optional[np.ndarray] = None
+
+    @property
+    def centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            rows = []
+            for category in self.categories:
+                embeddings = np.asarray(self.embedding_generator.embed_batch(self.prototypes[category], show_progress_bar=False),
+                                        dtype=np.float32)
+                embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+                centroid = embeddings.mean(axis=0)
+                rows.append(centroid / np.linalg.norm(centroid))
+            self._centroids = np.vstack(rows)
+        return self._centroids
+
+    def score(self, embeddings: np.ndarray) -> np.ndarray:
+        """(chunks, categories) cosine similarities in one matmul"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (embeddings / norms) @ self.centroids.T
+
+    def labels(self, scores: np.ndarray) -> np.ndarray:
+        """Boolean (chunks, categories): the best category plus close runners-up above min_score"""
+        best = scores.max(axis=1, keepdims=True)
+        labels = (scores >= best - self.margin) & (scores >= self.min_score)
+        labels[np.arange(len(scores)), scores.argmax(axis=1)] = True
+        return labels
+
+    def categorize(self, chunks: List[Dict], embeddings: np.ndarray) -> Dict[str, int]:
+        """Write category, cat_* and score_* into each chunk's metadata; returns chunks per label"""
+        if not chunks:
+            return {}
+        scores = self.score(embeddings)
+        labels = self.labels(scores)
+        best = scores.argmax(axis=1)
+
+        for chunk, row_scores, row_labels, primary in zip(chunks, scores.tolist(), labels.tolist(), best.tolist()):
+            metadata = chunk['metadata']
+            metadata['category'] = self.categories[primary]
+            for category, score, flag in zip(self.categories, row_scores, row_labels):
+                metadata[label_key(category)] = flag
+                metadata[SCORE_PREFIX + category] = round(score, 4)
+
+        counts = {category: int(count) for category, count in zip(self.categories, labels.sum(axis=0))}
+        logger.info(f"Categorized {len(chunks)} chunks ({labels.sum(axis=1).mean():.2f} labels each): {counts}")
+        return counts
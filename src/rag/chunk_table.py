@@ -0,0 +1,91 @@
+"""Chunk Table - In-memory chunk texts and metadata, loaded once per index"""
+import sys
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ('id', 'text', 'metadata', 'distance', 'source')
+
+
+class RetrievedChunk:
+    """One search hit. Supports chunk['text'] style access for code written against the old dicts."""
+    __slots__ = _FIELDS
+
+    def __init__(self, id: str, text: str, metadata: Dict, distance: Optional[float] = None, source: str = ""):
+        self.id = id
+        self.text = text
+        self.metadata = metadata
+        self.distance = distance
+        self.source = source
+
+    def __getitem__(self, key: str):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _FIELDS else default
+
+    def keys(self):
+        return ('id', 'text', 'metadata', 'distance')
+
+    def to_dict(self) -> Dict:
+        return {'id': self.id, 'text': self.text, 'metadata': self.metadata, 'distance': self.distance}
+
+    def __repr__(self) -> str:
+        return f"RetrievedChunk(id={self.id!r}, distance={self.distance!r}, source={self.source!r})"
+
+
+def source_label(metadata: Dict) -> str:
+    return f"[Source: {metadata.get('section', 'Unknown')} - {metadata.get('chapter', 'Unknown')}]"
+
+
+def _intern_metadata(metadata: Dict) -> Dict:
+    # Section, chapter, category and path strings repeat across every chunk of a chapter
+    return {sys.intern(key): sys.intern(value) if isinstance(value, str) else value for key, value in metadata.items()}
+
+
+class ChunkTable:
+    """Chunk id -> (text, metadata, source label) for a vector store collection.
+
+    Searches then only need ids and distances from the store. The table
+    reloads itself when it meets an id it does not know (the index grew).
+    """
+
+    def __init__(self, vectorstore, page_size: int = 1000):
+        self.vectorstore = vectorstore
+        self.page_size = page_size
+        self._rows: Dict[str, Tuple[str, Dict, str]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def load(self):
+        rows = {}
+        for page in self.vectorstore.iter_rows(self.page_size):
+            for chunk_id, text, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                metadata = _intern_metadata(metadata or {})
+                rows[sys.intern(chunk_id)] = (text, metadata, source_label(metadata))
+        self._rows = rows
+        self._loaded = True
+        logger.info(f"Loaded chunk table with {len(rows)} chunks")
+
+    def _ensure_loaded(self, ids: List[str] = ()):
+        if self._loaded and all(chunk_id in self._rows for chunk_id in ids):
+            return
+        with self._lock:
+            if not self._loaded or any(chunk_id not in self._rows for chunk_id in ids):
+                self.load()
+
+    def chunks(self, ids: List[str], distances) -> List[RetrievedChunk]:
+        self._ensure_loaded(ids)
+        rows = self._rows
+        result = []
+        for chunk_id, distance in zip(ids, distances):
+            text, metadata, source = rows[chunk_id]
+            result.append(RetrievedChunk(chunk_id, text, metadata, float(distance), source))
+        return result
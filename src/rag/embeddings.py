@@ -1,21 +1,96 @@
 """Embeddings - Generate vector embeddings"""
 import os
-from typing import List
+from typing import Dict, List
+import sentence_transformers
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from src.monitoring.tracing import span
+
+# torch: full-precision PyTorch (default), int8: dynamically quantized Linear
+# layers on CPU, onnx: ONNX Runtime via sentence-transformers >= 3.2
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx")
+OUTPUT_DTYPES = {"float32": np.float32, "float16": np.float16}
+ONNX_MIN_VERSION = (3, 2)
+ONNX_INSTALL_HINT = "Install with: pip install -r requirements-onnx.txt"
+
+
+def _version_tuple(version: str) -> tuple:
+    parts = []
+    for part in version.split(".")[:2]:
+        digits = "".join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits or 0))
+    return tuple(parts)
+
 class EmbeddingGenerator:
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, backend: str = None, output_dtype: str = None):
         if model_name is None:
             model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
-        self.model = SentenceTransformer(model_name)
+        if backend is None:
+            backend = os.getenv("EMBEDDING_BACKEND", "torch")
+        if output_dtype is None:
+            output_dtype = os.getenv("EMBEDDING_DTYPE", "float32")
+
+        backend = backend.lower()
+        output_dtype = output_dtype.lower()
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}'. Choose one of: {', '.join(EMBEDDING_BACKENDS)}")
+        if output_dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"Unknown embedding dtype '{output_dtype}'. Choose one of: {', '.join(OUTPUT_DTYPES)}")
+
+        self.model_name = model_name
+        self.backend = backend
+        self.output_dtype = output_dtype
+        self._dtype = OUTPUT_DTYPES[output_dtype]
+        self.model = self._load_model(model_name, backend)
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
-    
+
+    @staticmethod
+    def _load_model(model_name: str, backend: str) -> SentenceTransformer:
+        if backend == "onnx":
+            installed = getattr(sentence_transformers, "__version__", "unknown")
+            if _version_tuple(installed) < ONNX_MIN_VERSION:
+                raise RuntimeError(
+                    f"ONNX embedding backend requires sentence-transformers>=3.2 (installed: {installed}). "
+                    + ONNX_INSTALL_HINT
+                )
+            # Optionally point at a pre-quantized export, e.g. onnx/model_qint8_avx512_vnni.onnx
+            onnx_file = os.getenv("EMBEDDING_ONNX_FILE")
+            model_kwargs = {"file_name": onnx_file} if onnx_file else None
+            try:
+                return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+            except (TypeError, ImportError) as e:
+                raise RuntimeError(
+                    f"ONNX embedding backend could not load onnxruntime/optimum ({e}). " + ONNX_INSTALL_HINT
+                ) from e
+
+        if backend == "int8":
+            import torch
+            model = SentenceTransformer(model_name, device="cpu")
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        return SentenceTransformer(model_name)
+
     def embed_text(self, text: str) -> np.ndarray:
-        return self.model.encode(text, convert_to_numpy=True)
-    
-    def embed_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
-        return self.model.encode(texts, batch_size=batch_size, show_progress_bar=True, convert_to_numpy=True)
-    
+        with span("embedding.embed_text", backend=self.backend):
+            return self.model.encode(text, convert_to_numpy=True).astype(self._dtype, copy=False)
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = True) -> np.ndarray:
+        with span("embedding.embed_batch", backend=self.backend, texts=len(texts)):
+            embeddings = self.model.encode(texts, batch_size=batch_size, show_progress_bar=show_progress_bar, convert_to_numpy=True)
+            return embeddings.astype(self._dtype, copy=False)
+
     def get_embedding_dimension(self) -> int:
         return self.embedding_dim
+
+    def get_signature(self) -> Dict:
+        """Identify the vector space produced by this generator.
+
+        Output dtype is not part of the signature: float16 vectors are stored
+        as float32 by the vector store and stay comparable.
+        """
+        return {
+            'embedding_model': self.model_name,
+            'embedding_backend': self.backend,
+            'embedding_dim': self.embedding_dim
+        }
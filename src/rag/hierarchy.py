@@ -0,0 +1,213 @@
+"""
+Hierarchical Index - Select chapters by centroid, then search only their chunks
+
+Built from the vector store's stored embeddings (no re-embedding). Chunks are
+grouped by (section, chapter) and laid out contiguously, so a chapter is a
+row slice; each chapter and section gets a normalised centroid. A query
+scores the chapter centroids (optionally only within its best sections),
+keeps the top ones, and ranks just their chunks with one matmul, in the same
+squared-L2 distance Chroma uses. search_batch() mirrors
+AyurvedicVectorStore.search_batch, so the retriever can use either.
+
+The saved file carries a fingerprint of the chunks it was built from (ids,
+chapters, embeddings); load_current() ignores it once the store's contents
+differ, even if the chunk count is unchanged.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from .vectorstore import BatchSearchResult
+from .categorizer import has_category
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "hierarchy.npz"
+
+
+def chapter_key(metadata: Dict) -> str:
+    return f"{metadata.get('section_code') or metadata.get('section', '')}/{metadata.get('chapter_number', metadata.get('chapter', ''))}"
+
+
+def content_fingerprint(ids: Sequence[str], embeddings: np.ndarray, metadatas: Sequence[Dict]) -> str:
+    """sha256 of each chunk's id, chapter and float32 embedding, in id order (independent of storage order)"""
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    digest = hashlib.sha256("\0".join(f"{ids[i]}\t{chapter_key(metadatas[i] or {})}" for i in order).encode("utf-8"))
+    digest.update(np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)[order]).tobytes())
+    return digest.hexdigest()
+
+
+def store_fingerprint(vectorstore, page_size: int = 1000) -> str:
+    """content_fingerprint() of everything in a vector store"""
+    ids, embeddings, metadatas = [], [], []
+    for page in vectorstore.iter_rows(page_size, include=('metadatas', 'embeddings')):
+        ids.extend(page['ids'])
+        embeddings.extend(page['embeddings'])
+        metadatas.extend(page['metadatas'])
+    return content_fingerprint(ids, np.asarray(embeddings, dtype=np.float32), metadatas)
+
+
+def _centroids(embeddings: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    normed = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    sums = np.add.reduceat(normed, offsets[:-1], axis=0)
+    return sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+
+class HierarchicalIndex:
+    """Two-level (section -> chapter -> chunk) search over embeddings held in memory"""
+
+    def __init__(self, ids: List[str], embeddings: np.ndarray, metadatas: List[Dict], chapter_offsets: np.ndarray,
+                 chapter_keys: List[str], top_chapters: int = None, top_sections: int = None):
+        if top_chapters is None:
+            top_chapters = int(os.getenv("HIER_TOP_CHAPTERS", "8"))
+        if top_sections is None:
+            top_sections = int(os.getenv("HIER_TOP_SECTIONS", "0"))
+
+        self.ids = ids
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.sq_norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+        self.metadatas = metadatas
+        self.chapter_offsets = np.asarray(chapter_offsets, dtype=np.int64)
+        self.chapter_keys = chapter_keys
+        self.chapter_centroids = _centroids(self.embeddings, self.chapter_offsets)
+        self.top_chapters = top_chapters
+        self.top_sections = top_sections
+
+        sections = [key.split('/', 1)[0] for key in chapter_keys]
+        self.section_names = list(dict.fromkeys(sections))
+        self.chapter_section = np.asarray([self.section_names.index(section) for section in sections], dtype=np.int32)
+        section_sums = np.zeros((len(self.section_names), self.embeddings.shape[1]), dtype=np.float32)
+        np.add.at(section_sums, self.chapter_section, self.chapter_centroids)
+        self.section_centroids = section_sums / np.maximum(np.linalg.norm(section_sums, axis=1, keepdims=True), 1e-12)
+        self._category_masks: Dict[str, np.ndarray] = {}
+        self.fingerprint: Optional[str] = None  # content_fingerprint() of the store it was built from
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, vectorstore, page_size: int = 1000, **kwargs) -> "HierarchicalIndex":
+        ids, embeddings, metadatas = [], [], []
+        for page in vectorstore.iter_rows(page_size, include=('metadatas', 'embeddings')):
+            ids.extend(page['ids'])
+            embeddings.extend(page['embeddings'])
+            metadatas.extend(page['metadatas'])
+        if not ids:
+            raise ValueError("Cannot build a hierarchical index from an empty vector store")
+
+        keys = [chapter_key(metadata or {}) for metadata in metadatas]
+        order = sorted(range(len(ids)), key=lambda i: keys[i])
+        sorted_keys = [keys[i] for i in order]
+        starts = [0] + [i for i in range(1, len(order)) if sorted_keys[i] != sorted_keys[i - 1]]
+        index = cls(
+            [ids[i] for i in order],
+            np.asarray(embeddings, dtype=np.float32)[order],
+            [metadatas[i] or {} for i in order],
+            np.asarray(starts + [len(order)]),
+            [sorted_keys[start] for start in starts],
+            **kwargs,
+        )
+        index.fingerprint = content_fingerprint(index.ids, index.embeddings, index.metadatas)
+        logger.info(f"Built hierarchical index: {len(index)} chunks, {len(index.chapter_keys)} chapters, "
+                    f"{len(index.section_names)} sections")
+        return index
+
+    def save(self, directory: str):
+        path = Path(directory) / INDEX_FILE
+        np.savez(path, embeddings=self.embeddings, chapter_offsets=self.chapter_offsets,
+                 ids=np.asarray(json.dumps(self.ids)), metadatas=np.asarray(json.dumps(self.metadatas)),
+                 chapter_keys=np.asarray(json.dumps(self.chapter_keys)),
+                 fingerprint=np.asarray(self.fingerprint or content_fingerprint(self.ids, self.embeddings, self.metadatas)))
+        return path
+
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> Optional["HierarchicalIndex"]:
+        path = Path(directory) / INDEX_FILE
+        if not path.exists():
+            return None
+        data = np.load(path)
+        index = cls(json.loads(str(data['ids'])), data['embeddings'], json.loads(str(data['metadatas'])),
+                    data['chapter_offsets'], json.loads(str(data['chapter_keys'])), **kwargs)
+        # Files saved before fingerprints were recorded get one computed from their own contents
+        index.fingerprint = (str(data['fingerprint']) if 'fingerprint' in data.files
+                             else content_fingerprint(index.ids, index.embeddings, index.metadatas))
+        return index
+
+    @classmethod
+    def load_current(cls, vectorstore, **kwargs) -> Optional["HierarchicalIndex"]:
+        """The saved index next to `vectorstore`, or None if it is missing or was built from other contents"""
+        index = cls.load(str(vectorstore.persist_directory), **kwargs)
+        if index is None or index.fingerprint != store_fingerprint(vectorstore):
+            # Compared by content, so a re-ingested corpus of the same size is caught too
+            logger.warning("Hierarchical index missing or out of date; using flat search. Run scripts/14_build_hierarchy.py")
+            return None
+        return index
+
+    def category_mask(self, category: str) -> np.ndarray:
+        mask = self._category_masks.get(category)
+        if mask is None:
+            mask = np.fromiter((has_category(metadata, category) for metadata in self.metadatas), dtype=bool,
+                               count=len(self.metadatas))
+            self._category_masks[category] = mask
+        return mask
+
+    def candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        """Rows of the chunks in the query's top chapters"""
+        normed = query / (np.linalg.norm(query) or 1.0)
+        scores = self.chapter_centroids @ normed
+        if 0 < self.top_sections < len(self.section_names):
+            sections = np.argpartition(self.section_centroids @ normed, -self.top_sections)[-self.top_sections:]
+            scores = np.where(np.isin(self.chapter_section, sections), scores, -np.inf)
+        count = min(self.top_chapters, len(scores))
+        if count <= 0:
+            return np.zeros(0, dtype=np.int64)
+        chapters = np.argpartition(scores, -count)[-count:]
+        chapters = chapters[np.isfinite(scores[chapters])]
+        if not len(chapters):
+            # search_batch falls back to ranking every chunk
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(self.chapter_offsets[c], self.chapter_offsets[c + 1]) for c in chapters])
+
+    def search_batch(self, query_embeddings: np.ndarray, n_results: Union[int, Sequence[int]] = 5,
+                     category_filters: Union[None, str, Sequence[Optional[str]]] = None,
+                     include_documents: bool = False, include_embeddings: bool = False) -> BatchSearchResult:
+        """Same result layout as AyurvedicVectorStore.search_batch; texts come from the chunk table"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        count = len(queries)
+        ks = np.full(count, n_results) if isinstance(n_results, int) else np.asarray(n_results)
+        if category_filters is None or isinstance(category_filters, str):
+            category_filters = [category_filters] * count
+
+        ids, distances, hit_rows, counts = [], [], [], []
+        for query, k, category in zip(queries, ks, category_filters):
+            rows = self.candidate_rows(query)
+            if category:
+                rows = rows[self.category_mask(category)[rows]]
+            if len(rows) < k:
+                # The top chapters cannot fill k; rank every (matching) chunk instead
+                rows = np.flatnonzero(self.category_mask(category)) if category else np.arange(len(self.ids))
+            row_distances = self.sq_norms[rows] - 2.0 * (self.embeddings[rows] @ query) + float(query @ query)
+            k = min(int(k), len(rows))
+            nearest = np.argpartition(row_distances, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+            nearest = nearest[np.argsort(row_distances[nearest])]
+            ids.extend(self.ids[i] for i in rows[nearest])
+            distances.extend(np.maximum(row_distances[nearest], 0.0))
+            hit_rows.extend(rows[nearest])
+            counts.append(k)
+
+        offsets = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return BatchSearchResult(
+            ids=ids,
+            distances=np.asarray(distances, dtype=np.float32),
+            rows=np.repeat(np.arange(count, dtype=np.int32), counts),
+            offsets=offsets,
+            embeddings=self.embeddings[np.asarray(hit_rows, dtype=np.int64)] if include_embeddings else None,
+        )
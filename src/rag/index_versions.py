@@ -0,0 +1,157 @@
+"""
+Index Versions - Versioned index directories behind an atomic CURRENT pointer
+
+    INDEX_ROOT/
+        CURRENT                     name of the version being served
+        versions/20261019T101500/   a Chroma directory (scripts/02_build_vectordb.py)
+        versions/20261020T093000/   or one holding index.ayursnap (a snapshot)
+
+A new corpus is built into a fresh version directory while the app keeps
+serving the current one; publish() then replaces CURRENT with a rename, so
+readers see either the old or the new name, never a partial file. Running
+apps poll CURRENT (IndexWatcher) and hot-swap their retriever to the new
+version; rolling back is publishing an older name again.
+"""
+
+import os
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .vectorstore import AyurvedicVectorStore
+from .snapshot import load_snapshot
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+SNAPSHOT_FILE = "index.ayursnap"
+CHROMA_FILE = "chroma.sqlite3"
+
+
+class IndexVersions:
+    def __init__(self, root: str = None):
+        if root is None:
+            root = os.getenv("INDEX_ROOT", "./data/indexes")
+        self.root = Path(root)
+        self.versions_dir = self.root / VERSIONS_DIR
+
+    def list(self) -> List[str]:
+        """Version names, oldest first (names are UTC timestamps)"""
+        if not self.versions_dir.exists():
+            return []
+        return sorted(path.name for path in self.versions_dir.iterdir() if path.is_dir())
+
+    def path(self, version: str) -> Path:
+        return self.versions_dir / version
+
+    def current(self) -> Optional[str]:
+        try:
+            return (self.root / CURRENT_FILE).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def create(self, label: Optional[str] = None) -> Tuple[str, Path]:
+        """A new, empty version directory to build an index into"""
+        base = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + (f"-{label}" if label else "")
+        version, suffix = base, 1
+        while self.path(version).exists():
+            suffix += 1
+            version = f"{base}.{suffix}"
+        path = self.path(version)
+        path.mkdir(parents=True)
+        return version, path
+
+    def is_complete(self, version: str) -> bool:
+        path = self.path(version)
+        return (path / SNAPSHOT_FILE).exists() or (path / CHROMA_FILE).exists()
+
+    def publish(self, version: str):
+        """Atomically point CURRENT at `version`"""
+        if not self.is_complete(version):
+            raise ValueError(f"Index version {version!r} has no index in {self.path(version)}")
+        temporary = self.root / f"{CURRENT_FILE}.tmp"
+        with open(temporary, "w") as f:
+            f.write(version + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.root / CURRENT_FILE)
+        logger.info(f"Published index version {version}")
+
+    def open(self, version: Optional[str] = None):
+        """The vector store of `version` (default: current), tagged with its version"""
+        version = version or self.current()
+        if version is None:
+            raise FileNotFoundError(f"No index version published under {self.root}; build one with scripts/02_build_vectordb.py")
+        if not self.is_complete(version):
+            raise FileNotFoundError(f"Index version {version!r} has no index in {self.path(version)}")
+        path = self.path(version)
+        if (path / SNAPSHOT_FILE).exists():
+            vectorstore = load_snapshot(str(path / SNAPSHOT_FILE))
+        else:
+            vectorstore = AyurvedicVectorStore(str(path))
+        vectorstore.index_version = version
+        return vectorstore
+
+    def prune(self, keep: int = 2) -> List[str]:
+        """Delete versions older than CURRENT, keeping CURRENT and the `keep` - 1 versions before it
+        (always at least its predecessor, for rollback); versions newer than CURRENT are unpublished
+        or still building and are never touched"""
+        current = self.current()
+        versions = self.list()
+        if current not in versions:
+            logger.warning(f"Not pruning {self.root}: CURRENT ({current}) is not a version directory")
+            return []
+        older = versions[:versions.index(current)]
+        removed = older[:max(0, len(older) - max(1, keep - 1))]
+        for version in removed:
+            shutil.rmtree(self.path(version))
+            logger.info(f"Removed index version {version}")
+        return removed
+
+
+class IndexWatcher:
+    """Background thread that polls CURRENT and hot-swaps the retriever to each newly published version"""
+
+    def __init__(self, retriever, versions: IndexVersions, interval: float = None):
+        if interval is None:
+            interval = float(os.getenv("INDEX_POLL_SECONDS", "5"))
+        self.retriever = retriever
+        self.versions = versions
+        self.interval = interval
+        self._failed: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "IndexWatcher":
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> bool:
+        """Swap to the published version if it changed; True if a swap happened"""
+        version = self.versions.current()
+        if version is None or version == self.retriever.index_version or version == self._failed:
+            return False
+        started = time.perf_counter()
+        try:
+            self.retriever.swap_index(self.versions.open(version))
+        except Exception:
+            # Keep serving the old version; a fixed or different publish is picked up next time
+            logger.exception(f"Could not load index version {version}; still serving {self.retriever.index_version}")
+            self._failed = version
+            return False
+        self._failed = None
+        logger.info(f"Swapped to index version {version} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
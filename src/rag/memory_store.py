@@ -0,0 +1,255 @@
+"""
+In-Memory Vector Store - A read-only copy of an index held in a few large buffers
+
+Loaded once from an AyurvedicVectorStore, then searched exactly (one matmul,
+the same squared-L2 distance Chroma uses) without a Chroma client. It is
+built for preload-then-fork serving (src/api/prefork.py): every worker
+inherits the parent's pages copy-on-write, so the layout avoids per-chunk
+Python objects that reference counting would dirty. Embeddings are one
+float32 array; ids, texts and metadata are single UTF-8 blobs with offsets
+(decoded per hit); ids are found by binary search in a sorted fixed-width
+bytes array; and category filters are precomputed boolean masks.
+
+search_batch() mirrors AyurvedicVectorStore.search_batch and chunks() mirrors
+ChunkTable.chunks, so the retriever uses it as both store and chunk table.
+The same buffers are what a snapshot file holds (src/rag/snapshot.py), so a
+store loaded from one is backed by the mapped file instead of the heap.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from src.monitoring.tracing import span
+from .vectorstore import BatchSearchResult, EmbeddingMismatchError, check_signature
+from .chunk_table import RetrievedChunk, source_label
+from .categorizer import LABEL_PREFIX, has_category
+
+logger = logging.getLogger(__name__)
+
+
+def pack_strings(strings: List[str]) -> Tuple[bytes, np.ndarray]:
+    """One UTF-8 blob plus offsets: string i is blob[offsets[i]:offsets[i + 1]]"""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+def fixed_width(blob, offsets: np.ndarray) -> np.ndarray:
+    """The strings of a packed blob as one fixed-width bytes array, built without per-string objects"""
+    lengths = np.diff(offsets)
+    width = max(1, int(lengths.max()) if len(lengths) else 1)
+    columns = np.arange(width)
+    inside = columns[None, :] < lengths[:, None]
+    cells = np.zeros((len(lengths), width), dtype=np.uint8)
+    cells[inside] = np.frombuffer(blob, dtype=np.uint8)[(offsets[:-1, None] + columns[None, :])[inside]]
+    return cells.view(f"S{width}").ravel()
+
+
+class InMemoryVectorStore:
+    """Read-only, exact-search stand-in for AyurvedicVectorStore"""
+
+    def __init__(self, ids, id_offsets: np.ndarray, embeddings: np.ndarray, texts, text_offsets: np.ndarray, metadata,
+                 metadata_offsets: np.ndarray, category_masks: Dict[str, np.ndarray],
+                 embedding_signature: Optional[Dict] = None, multi_label: bool = False, persist_directory=None,
+                 chunker_params: Optional[Dict] = None, sq_norms: Optional[np.ndarray] = None):
+        """Ids, texts and metadata (JSON) are UTF-8 blobs (bytes or memoryview) split at the given offsets"""
+        self._ids, self._id_offsets = ids, np.asarray(id_offsets, dtype=np.int64)
+        self._count = len(self._id_offsets) - 1
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.embeddings.ndim != 2:
+            self.embeddings = self.embeddings.reshape(self._count, -1 if self._count else 0)
+        self.sq_norms = sq_norms if sq_norms is not None else np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+        self._texts, self._text_offsets = texts, text_offsets
+        self._metadata, self._metadata_offsets = metadata, metadata_offsets
+        keys = fixed_width(ids, self._id_offsets)
+        self._id_order = np.argsort(keys, kind='stable')
+        self._sorted_ids = keys[self._id_order]
+        self.category_masks = category_masks
+        self.embedding_signature = dict(embedding_signature or {})
+        self.multi_label = multi_label
+        self.persist_directory = Path(persist_directory) if persist_directory is not None else None
+        self.chunker_params = dict(chunker_params or {})
+        self.snapshot: Optional[Dict] = None  # header of the snapshot file this was loaded from
+        self.index_version: Optional[str] = None  # set by IndexVersions.open
+        self._no_rows = np.zeros(self._count, dtype=bool)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @classmethod
+    def from_rows(cls, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Dict],
+                  **kwargs) -> "InMemoryVectorStore":
+        metadatas = [metadata or {} for metadata in metadatas]
+        categories = {key[len(LABEL_PREFIX):] for metadata in metadatas for key in metadata if key.startswith(LABEL_PREFIX)}
+        categories.update(metadata['category'] for metadata in metadatas if metadata.get('category'))
+        category_masks = {
+            category: np.fromiter((has_category(metadata, category) for metadata in metadatas), dtype=bool,
+                                  count=len(metadatas))
+            for category in sorted(categories)
+        }
+        packed_ids, id_offsets = pack_strings(ids)
+        texts, text_offsets = pack_strings(documents)
+        metadata, metadata_offsets = pack_strings([json.dumps(metadata, ensure_ascii=False) for metadata in metadatas])
+        return cls(packed_ids, id_offsets, np.ascontiguousarray(embeddings, dtype=np.float32), texts, text_offsets,
+                   metadata, metadata_offsets, category_masks, **kwargs)
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, page_size: int = 1000) -> "InMemoryVectorStore":
+        ids, embeddings, documents, metadatas = [], [], [], []
+        for page in vectorstore.iter_rows(page_size, include=('documents', 'metadatas', 'embeddings')):
+            ids.extend(page['ids'])
+            embeddings.extend(page['embeddings'])
+            documents.extend(page['documents'])
+            metadatas.extend(page['metadatas'])
+        store = cls.from_rows(ids, np.asarray(embeddings, dtype=np.float32), documents, metadatas,
+                              embedding_signature=vectorstore.get_embedding_signature(),
+                              multi_label=vectorstore.multi_label, persist_directory=vectorstore.persist_directory,
+                              chunker_params=vectorstore.get_chunker_params())
+        store.index_version = vectorstore.index_version
+        logger.info(f"Loaded {len(store)} chunks into memory ({store.nbytes / 2**20:.1f} MiB)")
+        return store
+
+    def buffers(self) -> Dict:
+        """The packed arrays and blobs behind the store, as written to a snapshot"""
+        return {
+            'embeddings': self.embeddings,
+            'sq_norms': self.sq_norms,
+            'ids': self._ids,
+            'id_offsets': self._id_offsets,
+            'texts': self._texts,
+            'text_offsets': self._text_offsets,
+            'metadata': self._metadata,
+            'metadata_offsets': self._metadata_offsets,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return (self.embeddings.nbytes + self.sq_norms.nbytes + len(self._ids) + len(self._texts) + len(self._metadata)
+                + self._id_offsets.nbytes + self._text_offsets.nbytes + self._metadata_offsets.nbytes
+                + self._sorted_ids.nbytes + self._id_order.nbytes)
+
+    @property
+    def ids(self) -> List[str]:
+        """All chunk ids in row order, decoded on demand (not kept, so forked workers share the blob)"""
+        return [self.chunk_id(row) for row in range(self._count)]
+
+    def count(self) -> int:
+        return self._count
+
+    def chunk_id(self, row: int) -> str:
+        return str(self._ids[self._id_offsets[row]:self._id_offsets[row + 1]], "utf-8")
+
+    def row(self, chunk_id: str) -> int:
+        """Row of a chunk id (KeyError if absent), by binary search over the sorted ids"""
+        key = chunk_id.encode("utf-8")
+        i = int(np.searchsorted(self._sorted_ids, key))
+        if i == len(self._sorted_ids) or self._sorted_ids[i] != key:
+            raise KeyError(chunk_id)
+        return int(self._id_order[i])
+
+    def document(self, row: int) -> str:
+        return str(self._texts[self._text_offsets[row]:self._text_offsets[row + 1]], "utf-8")
+
+    def metadata(self, row: int) -> Dict:
+        return json.loads(str(self._metadata[self._metadata_offsets[row]:self._metadata_offsets[row + 1]], "utf-8"))
+
+    def iter_rows(self, page_size: int = 1000, include: Sequence[str] = ('documents', 'metadatas')):
+        """Yield pages of chunks in the same shape as AyurvedicVectorStore.iter_rows"""
+        for start in range(0, self._count, page_size):
+            rows = range(start, min(start + page_size, self._count))
+            page = {'ids': [self.chunk_id(row) for row in rows]}
+            if 'documents' in include:
+                page['documents'] = [self.document(row) for row in rows]
+            if 'metadatas' in include:
+                page['metadatas'] = [self.metadata(row) for row in rows]
+            if 'embeddings' in include:
+                page['embeddings'] = self.embeddings[rows.start:rows.stop]
+            yield page
+
+    def get_embedding_signature(self) -> Dict:
+        return dict(self.embedding_signature)
+
+    def get_chunker_params(self) -> Dict:
+        return dict(self.chunker_params)
+
+    def ensure_compatible(self, embedding_signature: Dict):
+        if self.embedding_signature:
+            check_signature(self.embedding_signature, embedding_signature, self.persist_directory)
+            return
+        if self._count and self.embeddings.shape[1] != embedding_signature['embedding_dim']:
+            raise EmbeddingMismatchError(
+                f"Vector store at {self.persist_directory} holds {self.embeddings.shape[1]}-d vectors, "
+                f"but the embedding model produces {embedding_signature['embedding_dim']}-d vectors. Rebuild the index."
+            )
+
+    def category_mask(self, category: str) -> np.ndarray:
+        return self.category_masks.get(category, self._no_rows)
+
+    def chunks(self, ids: List[str], distances) -> List[RetrievedChunk]:
+        """ChunkTable.chunks over the in-memory rows"""
+        result = []
+        for chunk_id, distance in zip(ids, distances):
+            row = self.row(chunk_id)
+            metadata = self.metadata(row)
+            result.append(RetrievedChunk(chunk_id, self.document(row), metadata, float(distance), source_label(metadata)))
+        return result
+
+    def search_batch(self, query_embeddings: np.ndarray, n_results: Union[int, Sequence[int]] = 5,
+                     category_filters: Union[None, str, Sequence[Optional[str]]] = None,
+                     include_documents: bool = True, include_embeddings: bool = False) -> BatchSearchResult:
+        """Exact search with the result layout of AyurvedicVectorStore.search_batch"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        count = len(queries)
+        ks = np.full(count, n_results) if isinstance(n_results, int) else np.asarray(n_results)
+        if category_filters is None or isinstance(category_filters, str):
+            category_filters = [category_filters] * count
+
+        with span("vectorstore.search_batch", queries=count, groups=len(set(category_filters)), shards=0):
+            distances = self.sq_norms[None, :] - 2.0 * (queries @ self.embeddings.T)
+            distances += np.einsum('ij,ij->i', queries, queries)[:, None]
+            for row, category in enumerate(category_filters):
+                if category:
+                    distances[row, ~self.category_mask(category)] = np.inf
+            top = min(int(ks.max()) if count else 0, self._count)
+            if top:
+                nearest = np.argpartition(distances, top - 1, axis=1)[:, :top]
+                nearest = np.take_along_axis(nearest, np.take_along_axis(distances, nearest, 1).argsort(axis=1), 1)
+            else:
+                nearest = np.zeros((count, 0), dtype=np.int64)
+
+        hit_rows, hit_distances, counts = [], [], []
+        for row in range(count):
+            hits = nearest[row, :int(ks[row])]
+            hits = hits[np.isfinite(distances[row, hits])]
+            hit_rows.extend(hits)
+            hit_distances.extend(np.maximum(distances[row, hits], 0.0))
+            counts.append(len(hits))
+
+        offsets = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        hit_rows = np.asarray(hit_rows, dtype=np.int64)
+        return BatchSearchResult(
+            ids=[self.chunk_id(i) for i in hit_rows],
+            distances=np.asarray(hit_distances, dtype=np.float32),
+            rows=np.repeat(np.arange(count, dtype=np.int32), counts),
+            offsets=offsets,
+            documents=[self.document(i) for i in hit_rows] if include_documents else None,
+            metadatas=[self.metadata(i) for i in hit_rows] if include_documents else None,
+            embeddings=self.embeddings[hit_rows] if include_embeddings else None,
+        )
+
+    def get_stats(self) -> Dict:
+        return {
+            'total_chunks': self._count,
+            'categories': {category: int(mask.sum()) for category, mask in self.category_masks.items()},
+            'layout': 'snapshot' if self.snapshot else 'in-memory',
+            **({'snapshot_version': self.snapshot['format_version'], 'snapshot_created': self.snapshot['created']}
+               if self.snapshot else {}),
+            **self.embedding_signature,
+        }
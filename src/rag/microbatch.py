@@ -0,0 +1,119 @@
+"""Micro-batching - Coalesce concurrent single-text embeddings into one encode call"""
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+
+from src.monitoring.metrics import REGISTRY, MetricsRegistry
+from src.monitoring.tracing import span
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+_STOP = object()
+
+
+class _PendingEmbedding:
+    __slots__ = ('text', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatchingEmbedder:
+    """Drop-in front for EmbeddingGenerator shared by concurrent sessions.
+
+    Callers of embed_text block while a single worker thread collects requests
+    for up to `max_wait_ms` (or until `max_batch_size` are queued), encodes them
+    in one batch and hands each caller its row.
+    """
+
+    def __init__(self, embedding_generator, max_batch_size: int = None, max_wait_ms: float = None,
+                 registry: MetricsRegistry = REGISTRY):
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+        self.embedding_generator = embedding_generator
+        self.embedding_dim = embedding_generator.get_embedding_dimension()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self.queue_wait = registry.histogram(
+            "ayurmind_embedding_queue_wait_seconds", "Time a text waited before its batch was encoded")
+        self.batch_size = registry.histogram(
+            "ayurmind_embedding_batch_size", "Texts per micro-batch encode call", buckets=BATCH_SIZE_BUCKETS)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-microbatcher", daemon=True)
+        self._worker.start()
+
+    def embed_text(self, text: str) -> np.ndarray:
+        request = _PendingEmbedding(text)
+        with span("embedding.embed_text", backend="microbatch"):
+            self._queue.put(request)
+            request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = True) -> np.ndarray:
+        # Already batched; nothing to coalesce
+        return self.embedding_generator.embed_batch(texts, batch_size=batch_size, show_progress_bar=show_progress_bar)
+
+    def get_embedding_dimension(self) -> int:
+        return self.embedding_dim
+
+    def get_signature(self) -> Dict:
+        return self.embedding_generator.get_signature()
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the worker after draining already-queued requests"""
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._encode(batch)
+
+    def _encode(self, batch: List[_PendingEmbedding]):
+        started = time.monotonic()
+        for request in batch:
+            self.queue_wait.observe(started - request.enqueued_at)
+        self.batch_size.observe(len(batch))
+
+        try:
+            embeddings = self.embedding_generator.embed_batch(
+                [request.text for request in batch], batch_size=len(batch), show_progress_bar=False)
+        except Exception as e:
+            for request in batch:
+                request.error = e
+                request.done.set()
+            return
+
+        for request, embedding in zip(batch, embeddings):
+            request.result = embedding
+            request.done.set()
@@ -1,33 +1,270 @@
 """RAG Retriever - Semantic search"""
 import os
-from typing import List, Dict, Optional
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Sequence, Union
+import numpy as np
 from .embeddings import EmbeddingGenerator
-from .vectorstore import AyurvedicVectorStore
+from .vectorstore import BatchSearchResult
+from .chunk_table import ChunkTable, RetrievedChunk, source_label
+from .working_set import current_working_set
+from .hierarchy import HierarchicalIndex
+from .memory_store import InMemoryVectorStore
+from .snapshot import open_vectorstore
+from src.monitoring.metrics import REGISTRY
+from src.monitoring.tracing import span
+
+logger = logging.getLogger(__name__)
+
+_pinned_index: contextvars.ContextVar = contextvars.ContextVar("ayurmind_pinned_index", default=None)
+_swaps = REGISTRY.counter("ayurmind_index_swaps_total", "Index versions swapped in without a restart")
+
+class IndexState:
+    """One index version as the retriever searches it; a reload replaces the whole object"""
+    
+    def __init__(self, vectorstore, chunk_table=None, hierarchy: Optional[HierarchicalIndex] = None,
+                 chunks: Optional[int] = None):
+        self.vectorstore = vectorstore
+        self.chunk_table = chunk_table
+        self.hierarchy = hierarchy
+        self.version: Optional[str] = vectorstore.index_version
+        # Counted once: a sharded store's count() pages through every shard
+        self.chunks = chunks if chunks is not None else vectorstore.count()
+        self.pins = 0         # retrievals and pinned_index() blocks using it; guarded by the retriever's swap lock
+        self.retired = False  # swapped out; released once the last pin goes
+    
+    def release(self):
+        """Close the store's client (file handles, caches) once nothing can search this index any more"""
+        close = getattr(self.vectorstore, "close", None)
+        if close is not None:
+            close()
+        logger.info(f"Released index version {self.version}")
+    
+    @property
+    def searcher(self):
+        return self.hierarchy if self.hierarchy is not None else self.vectorstore
 
 class RAGRetriever:
-    def __init__(self, vectorstore=None, embedding_generator=None):
-        self.vectorstore = vectorstore or AyurvedicVectorStore()
-        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+    def __init__(self, vectorstore=None, embedding_generator=None, hierarchy: Optional[HierarchicalIndex] = None):
+        vectorstore = vectorstore if vectorstore is not None else open_vectorstore()
+        self.embedding_generator = embedding_generator if embedding_generator is not None else EmbeddingGenerator()
         self.max_chunks = int(os.getenv("MAX_CHUNKS_PER_QUERY", "5"))
+        vectorstore.ensure_compatible(self.embedding_generator.get_signature())
+        
+        # Agents and the router embed the same query string; compute it once
+        # (kept across index swaps: swap_index only accepts indexes from the same embedding setup)
+        self.embedding_cache_size = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "256"))
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._embedding_lock = threading.Lock()
+        
+        # Batch runs fill this ahead of time so agents' retrievals skip the store; keyed by index version
+        self._prefetched: Dict[tuple, List[RetrievedChunk]] = {}
+        
+        self._index = self._open_index(vectorstore, hierarchy)
+        self._swap_lock = threading.Lock()  # guards _index and every IndexState's pins
+    
+    def _open_index(self, vectorstore, hierarchy: Optional[HierarchicalIndex] = None,
+                    chunks: Optional[int] = None) -> IndexState:
+        # With the chunk table, searches fetch only ids and distances; texts and metadata come from memory
+        # (an in-memory store already holds them, shared with forked workers, and serves as its own table)
+        if isinstance(vectorstore, InMemoryVectorStore):
+            chunk_table = vectorstore
+        else:
+            chunk_table = ChunkTable(vectorstore) if os.getenv("CHUNK_TABLE", "true").lower() == "true" else None
+        
+        # Chapter-first search (scripts/14_build_hierarchy.py); same results API, searched in memory
+        # (or a preloaded one, shared with forked workers)
+        if hierarchy is None and os.getenv("HIERARCHICAL_RETRIEVAL", "false").lower() == "true":
+            hierarchy = self._load_hierarchy(vectorstore)
+        if hierarchy is not None and chunk_table is None:
+            chunk_table = ChunkTable(vectorstore)  # the hierarchy only returns ids
+        return IndexState(vectorstore, chunk_table, hierarchy, chunks)
+    
+    @staticmethod
+    def _load_hierarchy(vectorstore) -> Optional[HierarchicalIndex]:
+        return HierarchicalIndex.load_current(vectorstore)
+    
+    @property
+    def index(self) -> IndexState:
+        """The index retrievals use: the one pinned by pinned_index() in this context, else the current one"""
+        pinned = _pinned_index.get()
+        if pinned is not None and pinned[0] is self:
+            return pinned[1]
+        return self._index
+    
+    @property
+    def vectorstore(self):
+        return self.index.vectorstore
+    
+    @property
+    def chunk_table(self):
+        return self.index.chunk_table
+    
+    @property
+    def hierarchy(self) -> Optional[HierarchicalIndex]:
+        return self.index.hierarchy
+    
+    @property
+    def searcher(self):
+        return self.index.searcher
+    
+    @property
+    def index_version(self) -> Optional[str]:
+        return self._index.version
+    
+    @property
+    def index_chunks(self) -> int:
+        """Chunks in the current index, as counted when it was loaded"""
+        return self._index.chunks
     
-    def retrieve(self, query: str, n_results: int = None, category_filter: Optional[str] = None) -> List[Dict]:
+    @contextmanager
+    def pinned_index(self):
+        """Serve every retrieval in this block (this thread/context) from the index current at entry,
+        so a consultation that spans a swap finishes on the version it started with"""
+        with self._swap_lock:
+            state = self.index
+            state.pins += 1
+        token = _pinned_index.set((self, state))
+        try:
+            yield
+        finally:
+            _pinned_index.reset(token)
+            with self._swap_lock:
+                state.pins -= 1
+                release = state.retired and state.pins == 0
+            if release:
+                state.release()
+    
+    def swap_index(self, vectorstore, hierarchy: Optional[HierarchicalIndex] = None) -> IndexState:
+        """Load `vectorstore` fully, then make it current in one assignment; returns the previous index.
+        
+        Retrievals already running (or pinned) finish on the old index, which is released
+        (its client closed) when the last of them ends; working sets and prefetched results
+        from it are dropped because they are keyed by version.
+        """
+        chunks = vectorstore.count()
+        if chunks == 0:
+            raise ValueError(f"Refusing to swap in an empty index ({vectorstore.index_version})")
+        vectorstore.ensure_compatible(self.embedding_generator.get_signature())
+        state = self._open_index(vectorstore, hierarchy, chunks)
+        if isinstance(state.chunk_table, ChunkTable):
+            state.chunk_table.load()
+        with self._swap_lock:
+            previous, self._index = self._index, state
+            self._prefetched = {}
+            previous.retired = True
+            release = previous.pins == 0
+        _swaps.inc()
+        logger.info(f"Index version {previous.version} -> {state.version} ({chunks} chunks)")
+        if release:
+            previous.release()
+        return previous
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        with self._embedding_lock:
+            embedding = self._embedding_cache.get(query)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(query)
+                return embedding
+        
+        embedding = self.embedding_generator.embed_text(query)
+        self._cache_embedding(query, embedding)
+        return embedding
+    
+    def _cache_embedding(self, query: str, embedding: np.ndarray):
+        with self._embedding_lock:
+            self._embedding_cache[query] = embedding
+            self._embedding_cache.move_to_end(query)
+            while len(self._embedding_cache) > self.embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+    
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeddings for many queries; cache misses are encoded in one embed_batch call"""
+        with self._embedding_lock:
+            cached = [self._embedding_cache.get(query) for query in queries]
+        missing = list(dict.fromkeys(q for q, e in zip(queries, cached) if e is None))
+        if missing:
+            fresh = dict(zip(missing, self.embedding_generator.embed_batch(missing, show_progress_bar=False)))
+            for query, embedding in fresh.items():
+                self._cache_embedding(query, embedding)
+            cached = [e if e is not None else fresh[q] for q, e in zip(queries, cached)]
+        return np.vstack(cached).astype(np.float32, copy=False)
+    
+    def retrieve_batch(self, queries: List[str], n_results: Union[int, Sequence[int]] = None,
+                       category_filter: Union[None, str, Sequence[Optional[str]]] = None) -> List[List[RetrievedChunk]]:
+        """retrieve() for many queries at once; filters and k may be given per query"""
+        if n_results is None:
+            n_results = self.max_chunks
+        if not queries:
+            return []
+        with span("retriever.retrieve_batch", queries=len(queries)), self.pinned_index():
+            return self._search(self.index, self.embed_queries(queries), n_results, category_filter)
+    
+    def _search(self, index: IndexState, embeddings: np.ndarray, n_results, category_filter) -> List[List[RetrievedChunk]]:
+        results = index.searcher.search_batch(embeddings, n_results=n_results, category_filters=category_filter,
+                                              include_documents=index.chunk_table is None)
+        return [self._unpack(index, results, row) for row in range(len(results))]
+    
+    def prefetch(self, queries: List[str], categories: Sequence[Optional[str]] = (None,), n_results: int = None):
+        """Embed `queries` in one batch and retrieve every (query, category) pair in one batched search"""
         if n_results is None:
             n_results = self.max_chunks
+        if not queries:
+            return
         
-        query_embedding = self.embedding_generator.embed_text(query)
-        results = self.vectorstore.search(query_embedding=query_embedding.tolist(), n_results=n_results, category_filter=category_filter)
+        with span("retriever.prefetch", queries=len(queries), categories=len(categories)), self.pinned_index():
+            index = self.index
+            pairs = [(query, category) for category in categories for query in queries]
+            rows = self._search(index, self.embed_queries([query for query, _ in pairs]), n_results,
+                                [category for _, category in pairs])
+            for (query, category), chunks in zip(pairs, rows):
+                self._prefetched[(index.version, query, n_results, category)] = chunks
+    
+    def clear_prefetch(self):
+        self._prefetched = {}
+    
+    def retrieve(self, query: str, n_results: int = None, category_filter: Optional[str] = None) -> List[RetrievedChunk]:
+        with span("retriever.retrieve", category=category_filter or "all"), self.pinned_index():
+            return self._retrieve(query, n_results, category_filter)
+    
+    def _retrieve(self, query: str, n_results: int = None, category_filter: Optional[str] = None) -> List[RetrievedChunk]:
+        if n_results is None:
+            n_results = self.max_chunks
         
-        retrieved_chunks = []
-        for i in range(len(results['ids'][0])):
-            chunk = {
-                'id': results['ids'][0][i],
-                'text': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i] if 'distances' in results else None
-            }
-            retrieved_chunks.append(chunk)
+        index = self.index
+        prefetched = self._prefetched.get((index.version, query, n_results, category_filter))
+        if prefetched is not None:
+            return prefetched
         
-        return retrieved_chunks
+        query_embedding = self.embed_query(query)
+        working_set = current_working_set()
+        if working_set is None:
+            return self._search(index, query_embedding, n_results, category_filter)[0]
+        
+        # Follow-ups in a session are often answered by chunks it already fetched (from this index version)
+        working_set.bind(index.version)
+        chunks = working_set.lookup(query_embedding, n_results, category_filter)
+        if chunks is not None:
+            return chunks
+        results = index.searcher.search_batch(query_embedding, n_results=n_results, category_filters=category_filter,
+                                              include_documents=index.chunk_table is None, include_embeddings=True)
+        chunks = self._unpack(index, results, 0)
+        working_set.add(query_embedding, category_filter, n_results, chunks, results.embeddings)
+        return chunks
+    
+    @staticmethod
+    def _unpack(index: IndexState, results: BatchSearchResult, row: int) -> List[RetrievedChunk]:
+        hits = results.hits(row)
+        if index.chunk_table is not None:
+            return index.chunk_table.chunks(results.ids[hits.start:hits.stop], results.distances[hits.start:hits.stop])
+        return [
+            RetrievedChunk(results.ids[j], results.documents[j], results.metadatas[j], float(results.distances[j]),
+                           source_label(results.metadatas[j]))
+            for j in hits
+        ]
     
     def build_context(self, query: str, n_results: int = None, category_filter: Optional[str] = None, include_metadata: bool = True) -> str:
         chunks = self.retrieve(query, n_results, category_filter)
@@ -35,13 +272,11 @@ class RAGRetriever:
         
         for i, chunk in enumerate(chunks, 1):
             if include_metadata:
-                metadata = chunk['metadata']
-                source = f"[Source: {metadata.get('section', 'Unknown')} - {metadata.get('chapter', 'Unknown')}]"
-                context_parts.append(f"--- Context {i} {source} ---")
+                context_parts.append(f"--- Context {i} {chunk.source} ---")
             else:
                 context_parts.append(f"--- Context {i} ---")
             
-            context_parts.append(chunk['text'])
+            context_parts.append(chunk.text)
             context_parts.append("")
         
         return "\n".join(context_parts)
@@ -0,0 +1,202 @@
+"""
+Index Snapshot - A whole index in one versioned, memory-mappable file
+
+Deploying a Chroma directory means copying many files and then paying for
+Chroma start-up, HNSW loading and the chunk table. A snapshot holds the
+same index as the packed buffers of an InMemoryVectorStore:
+
+    b"AYURSNAP" | uint32 format version | uint32 0 | uint64 header length
+    header      UTF-8 JSON: format_version, created, count, dim, embedding
+                signature, chunker params, multi_label, categories, the
+                section table {name: [offset, length]} and the payload sha256
+    payload     embeddings (float32, count x dim), their squared norms, id /
+                text / metadata blobs with int64 offsets, category masks
+                (one bool row per category); every section 64-byte aligned
+
+Loading maps the file and wraps each section as a numpy view or memoryview,
+so it takes milliseconds and nothing is copied to the heap: pages come from
+the page cache and are shared by every process serving the same file. The
+checksum covers the payload and is verified on load unless SNAPSHOT_VERIFY
+is false (one sequential read of the file).
+
+Serve from a snapshot by setting VECTOR_SNAPSHOT to its path; create one with
+scripts/17_snapshot.py or AyurvedicVectorStore.export_snapshot().
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from .memory_store import InMemoryVectorStore
+from .vectorstore import AyurvedicVectorStore
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AYURSNAP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sIIQ")
+
+
+class SnapshotError(ValueError):
+    """Raised for files that are not snapshots, are from a newer format, or fail their checksum"""
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _raw(data) -> memoryview:
+    """A section's bytes as a flat view (an empty array cannot be cast to one)"""
+    view = memoryview(data)
+    return view.cast("B") if view.nbytes else memoryview(b"")
+
+
+def write_snapshot(path: str, store: InMemoryVectorStore) -> Dict:
+    """Write `store` to `path` atomically (temporary file, then rename); returns the header"""
+    buffers = store.buffers()
+    categories = list(store.category_masks)
+    masks = (np.vstack([store.category_masks[category] for category in categories]) if categories
+             else np.zeros((0, len(store)), dtype=bool))
+    sections = {
+        'embeddings': np.ascontiguousarray(buffers['embeddings'], dtype=np.float32),
+        'sq_norms': np.ascontiguousarray(buffers['sq_norms'], dtype=np.float32),
+        'ids': buffers['ids'],
+        'id_offsets': np.asarray(buffers['id_offsets'], dtype=np.int64),
+        'texts': buffers['texts'],
+        'text_offsets': np.asarray(buffers['text_offsets'], dtype=np.int64),
+        'metadata': buffers['metadata'],
+        'metadata_offsets': np.asarray(buffers['metadata_offsets'], dtype=np.int64),
+        'category_masks': np.ascontiguousarray(masks, dtype=bool),
+    }
+
+    table, position, digest = {}, 0, hashlib.sha256()
+    for name, data in sections.items():
+        view = _raw(data)
+        start = _align(position)
+        digest.update(bytes(start - position))
+        digest.update(view)
+        table[name] = [start, len(view)]
+        position = start + len(view)
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        'count': len(store),
+        'dim': int(store.embeddings.shape[1]),
+        'embedding_signature': store.get_embedding_signature(),
+        'chunker': store.get_chunker_params(),
+        'multi_label': store.multi_label,
+        'categories': categories,
+        'sections': table,
+        'payload_bytes': position,
+        'sha256': digest.hexdigest(),
+    }
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    payload_start = _align(_PREFIX.size + len(encoded))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(encoded)))
+        f.write(encoded)
+        f.write(bytes(payload_start - _PREFIX.size - len(encoded)))
+        for name, data in sections.items():
+            start = table[name][0]
+            f.write(bytes(payload_start + start - f.tell()))
+            f.write(_raw(data))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    logger.info(f"Wrote snapshot of {len(store)} chunks to {path} ({(payload_start + position) / 2**20:.1f} MiB)")
+    return header
+
+
+def _open(path: str) -> Tuple[mmap.mmap, Dict, int]:
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < _PREFIX.size:
+        raise SnapshotError(f"{path} is not an index snapshot")
+    magic, version, _, header_length = _PREFIX.unpack_from(mapped)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not an index snapshot")
+    if version > FORMAT_VERSION:
+        raise SnapshotError(f"{path} uses snapshot format {version}; this version reads up to {FORMAT_VERSION}")
+    header = json.loads(mapped[_PREFIX.size:_PREFIX.size + header_length])
+    payload_start = _align(_PREFIX.size + header_length)
+    if len(mapped) < payload_start + header['payload_bytes']:
+        raise SnapshotError(f"{path} is truncated")
+    return mapped, header, payload_start
+
+
+def read_header(path: str) -> Dict:
+    mapped, header, _ = _open(path)
+    mapped.close()
+    return header
+
+
+def verify_snapshot(path: str):
+    """Raise SnapshotError unless the payload matches the checksum in the header"""
+    mapped, header, payload_start = _open(path)
+    with memoryview(mapped) as view:
+        actual = hashlib.sha256(view[payload_start:payload_start + header['payload_bytes']]).hexdigest()
+    mapped.close()
+    if actual != header['sha256']:
+        raise SnapshotError(f"{path} failed its checksum (sha256 {actual}, expected {header['sha256']})")
+
+
+def load_snapshot(path: str, verify: Optional[bool] = None) -> InMemoryVectorStore:
+    """Map a snapshot file as a read-only InMemoryVectorStore"""
+    if verify is None:
+        verify = os.getenv("SNAPSHOT_VERIFY", "true").lower() == "true"
+    if verify:
+        verify_snapshot(path)
+    mapped, header, payload_start = _open(path)
+    view = memoryview(mapped)
+
+    def section(name: str, dtype=None):
+        start, length = header['sections'][name]
+        data = view[payload_start + start:payload_start + start + length]
+        return np.frombuffer(data, dtype=dtype) if dtype is not None else data
+
+    count, dim = header['count'], header['dim']
+    masks = section('category_masks', np.bool_).reshape(len(header['categories']), count)
+    store = InMemoryVectorStore(
+        section('ids'),
+        section('id_offsets', np.int64),
+        section('embeddings', np.float32).reshape(count, dim),
+        section('texts'),
+        section('text_offsets', np.int64),
+        section('metadata'),
+        section('metadata_offsets', np.int64),
+        {category: masks[j] for j, category in enumerate(header['categories'])},
+        embedding_signature=header['embedding_signature'],
+        multi_label=header['multi_label'],
+        persist_directory=Path(path).parent,
+        chunker_params=header['chunker'],
+        sq_norms=section('sq_norms', np.float32),
+    )
+    store.snapshot = header
+    logger.info(f"Mapped snapshot {path}: {count} chunks, format {header['format_version']}, "
+                f"created {header['created']}{', checksum verified' if verify else ''}")
+    return store
+
+
+def open_vectorstore(persist_directory: str = None):
+    """The index to serve: the snapshot at VECTOR_SNAPSHOT, else the current version under INDEX_ROOT
+    (src/rag/index_versions.py), else the Chroma store at VECTOR_DB_PATH"""
+    snapshot = os.getenv("VECTOR_SNAPSHOT")
+    if snapshot:
+        return load_snapshot(snapshot)
+    if persist_directory is None and os.getenv("INDEX_ROOT"):
+        from .index_versions import IndexVersions
+        return IndexVersions().open()
+    return AyurvedicVectorStore(persist_directory)
@@ -1,38 +1,366 @@
-"""Vector Store - ChromaDB interface"""
+"""Vector Store - ChromaDB interface
+
+Two layouts share this class. "single" keeps every chunk in one collection
+and filters categories with a where clause. "sharded" keeps the main
+collection as an empty catalog (signature and layout metadata) and puts the
+chunks in one collection per category or section: a category search on a
+category-sharded store only touches its own, smaller HNSW graph, and other
+searches fan out to the shards in parallel and merge the top k by distance.
+"""
 import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Union
+import numpy as np
 import chromadb
 from tqdm import tqdm
 
+from src.monitoring.tracing import span
+from .categorizer import LABEL_PREFIX, label_key
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_KEYS = ('embedding_model', 'embedding_backend', 'embedding_dim')
+COLLECTION_NAME = "ayurvedic_texts"
+CHUNKER_PREFIX = "chunker_"
+SHARD_KEYS = ('category', 'section')
+
+class EmbeddingMismatchError(ValueError):
+    """Raised when an index was built with a different embedding model, backend or dimension"""
+
+@dataclass
+class BatchSearchResult:
+    """Flat hits for a batch of queries.
+
+    Hit j belongs to query rows[j]; query i owns hits offsets[i]:offsets[i+1],
+    nearest first. documents/metadatas/embeddings are aligned with ids when requested.
+    """
+    ids: List[str]
+    distances: np.ndarray
+    rows: np.ndarray
+    offsets: np.ndarray
+    documents: Optional[List[str]] = None
+    metadatas: Optional[List[Dict]] = None
+    embeddings: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def hits(self, row: int) -> range:
+        return range(int(self.offsets[row]), int(self.offsets[row + 1]))
+
+def check_signature(stored: Dict, embedding_signature: Dict, location):
+    """Raise EmbeddingMismatchError if a stored index signature disagrees with `embedding_signature`"""
+    mismatched = [key for key in SIGNATURE_KEYS if key in stored and stored[key] != embedding_signature.get(key)]
+    if mismatched:
+        details = ", ".join(f"{key}: index={stored[key]!r} vs current={embedding_signature.get(key)!r}" for key in mismatched)
+        raise EmbeddingMismatchError(
+            f"Vector store at {location} was built with a different embedding setup ({details}). "
+            "Rebuild the index or configure EMBEDDING_MODEL / EMBEDDING_BACKEND to match."
+        )
+
+def shard_collection_name(shard: str) -> str:
+    # Chroma names allow [a-zA-Z0-9._-] and must end alphanumeric
+    return f"{COLLECTION_NAME}__" + (re.sub(r'[^a-zA-Z0-9_-]+', '_', shard).strip('_-') or "unknown")
+
 class AyurvedicVectorStore:
-    def __init__(self, persist_directory: str = None):
+    def __init__(self, persist_directory: str = None, embedding_signature: Optional[Dict] = None,
+                 layout: Optional[str] = None, shard_by: Optional[str] = None):
+        """`layout`/`shard_by` (env VECTOR_LAYOUT, SHARD_BY) only apply to a new, empty index;
+        an existing index keeps the layout it was built with."""
         if persist_directory is None:
             persist_directory = os.getenv("VECTOR_DB_PATH", "./data/vectordb")
+        if layout is None:
+            layout = os.getenv("VECTOR_LAYOUT", "single").lower()
+        if shard_by is None:
+            shard_by = os.getenv("SHARD_BY", "category").lower()
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"SHARD_BY must be one of {SHARD_KEYS}, got {shard_by!r}")
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
-        
+
         self.client = chromadb.PersistentClient(path=str(self.persist_directory))
         self.collection = self.client.get_or_create_collection(
-            name="ayurvedic_texts",
+            name=COLLECTION_NAME,
             metadata={"description": "Charaka Samhita chunks"}
         )
-    
-    def add_chunks(self, chunks: List[Dict], embeddings: List[List[float]], batch_size: int = 100):
+
+        metadata = self.collection.metadata or {}
+        if layout == "sharded" and 'shard_by' not in metadata and self.collection.count() == 0:
+            self.collection.modify(metadata={**metadata, 'shard_by': shard_by, 'shards': ""})
+        self.shard_by: Optional[str] = (self.collection.metadata or {}).get('shard_by')
+        self.shards: Dict[str, object] = {}
+        if self.shard_by:
+            for shard in filter(None, self.collection.metadata.get('shards', "").split(",")):
+                self.shards[shard] = self.client.get_or_create_collection(name=shard_collection_name(shard))
+        self._fan_out_pool: Optional[ThreadPoolExecutor] = None
+        self.index_version: Optional[str] = None  # set by IndexVersions.open
+
+        if embedding_signature:
+            self.ensure_compatible(embedding_signature)
+
+    @property
+    def sharded(self) -> bool:
+        return self.shard_by is not None
+
+    def data_collections(self) -> List:
+        """Collections that hold chunks (a chunk may sit in several category shards)"""
+        return list(self.shards.values()) if self.sharded else [self.collection]
+
+    def close(self):
+        """Release the Chroma client (its SQLite handles and caches); the store is unusable afterwards"""
+        if self._fan_out_pool is not None:
+            self._fan_out_pool.shutdown(wait=False)
+            self._fan_out_pool = None
+        client, self.client = self.client, None
+        self.collection, self.shards = None, {}
+        if client is None:
+            return
+        if hasattr(client, "close"):
+            client.close()
+            return
+        # Older chromadb has no close(): clients of one path share a cached System; stop it and drop it
+        systems = getattr(type(client), "_identifier_to_system", {})
+        system = systems.pop(getattr(client, "_identifier", None), None)
+        if system is not None:
+            system.stop()
+
+    def iter_rows(self, page_size: int = 1000, include: Sequence[str] = ('documents', 'metadatas')):
+        """Yield pages of stored chunks (dicts like Collection.get results), each chunk once"""
+        seen = set()
+        for collection in self.data_collections():
+            for offset in range(0, collection.count(), page_size):
+                page = collection.get(limit=page_size, offset=offset, include=list(include))
+                if self.sharded:
+                    keep = [i for i, chunk_id in enumerate(page['ids']) if chunk_id not in seen]
+                    seen.update(page['ids'])
+                    page = {key: [page[key][i] for i in keep] for key in ('ids', *include)}
+                yield page
+
+    def count(self) -> int:
+        if not self.sharded:
+            return self.collection.count()
+        return sum(len(page['ids']) for page in self.iter_rows(include=()))
+
+    def get_embedding_signature(self) -> Dict:
+        metadata = self.collection.metadata or {}
+        return {key: metadata[key] for key in SIGNATURE_KEYS if key in metadata}
+
+    def ensure_compatible(self, embedding_signature: Dict):
+        """Check that vectors from `embedding_signature` may be mixed with this index.
+
+        An empty collection adopts the signature; a legacy index without one is
+        only checked for dimension.
+        """
+        stored = self.get_embedding_signature()
+
+        if not stored:
+            if self.collection.count() == 0:
+                self.collection.modify(metadata={**(self.collection.metadata or {}), **embedding_signature})
+                return
+
+            sample = self.collection.get(limit=1, include=['embeddings'])
+            stored_dim = len(sample['embeddings'][0]) if len(sample['embeddings']) else None
+            if stored_dim is not None and stored_dim != embedding_signature['embedding_dim']:
+                raise EmbeddingMismatchError(
+                    f"Vector store at {self.persist_directory} holds {stored_dim}-d vectors, "
+                    f"but the embedding model produces {embedding_signature['embedding_dim']}-d vectors. Rebuild the index."
+                )
+            logger.warning(f"Vector store at {self.persist_directory} has no embedding signature; assuming it matches {embedding_signature}")
+            return
+
+        check_signature(stored, embedding_signature, self.persist_directory)
+
+    def record_chunker_params(self, params: Dict):
+        """Keep the settings the chunks were made with (AyurvedicTextProcessor.chunker_params) with the index"""
+        metadata = self.collection.metadata or {}
+        self.collection.modify(metadata={**metadata, **{CHUNKER_PREFIX + key: value for key, value in params.items()
+                                                        if value is not None}})
+
+    def get_chunker_params(self) -> Dict:
+        metadata = self.collection.metadata or {}
+        return {key[len(CHUNKER_PREFIX):]: value for key, value in metadata.items() if key.startswith(CHUNKER_PREFIX)}
+
+    def export_snapshot(self, path: str, chunker_params: Optional[Dict] = None) -> Dict:
+        """Write the whole index to one snapshot file (see src/rag/snapshot.py); returns its header"""
+        from .memory_store import InMemoryVectorStore
+        from .snapshot import write_snapshot
+        store = InMemoryVectorStore.from_vectorstore(self)
+        if chunker_params:
+            store.chunker_params.update(chunker_params)
+        return write_snapshot(path, store)
+
+    @classmethod
+    def import_snapshot(cls, path: str, persist_directory: str = None, verify: bool = True) -> "AyurvedicVectorStore":
+        """Rebuild a Chroma index from a snapshot file into an empty `persist_directory`"""
+        from .snapshot import load_snapshot
+        snapshot = load_snapshot(path, verify=verify)
+        vectorstore = cls(persist_directory, embedding_signature=snapshot.get_embedding_signature() or None)
+        if vectorstore.count():
+            raise ValueError(f"Vector store at {vectorstore.persist_directory} is not empty; import into a new directory")
+        if snapshot.chunker_params:
+            vectorstore.record_chunker_params(snapshot.chunker_params)
+        if snapshot.multi_label:
+            vectorstore.collection.modify(metadata={**(vectorstore.collection.metadata or {}), 'category_labels': 'multi'})
+        for page in snapshot.iter_rows(include=('documents', 'metadatas', 'embeddings')):
+            chunks = [{'text': text, 'metadata': metadata} for text, metadata in zip(page['documents'], page['metadatas'])]
+            vectorstore.add_chunks(chunks, page['embeddings'].tolist(), ids=page['ids'])
+        return vectorstore
+
+    @property
+    def multi_label(self) -> bool:
+        """Whether chunks carry cat_<category> flags (PrototypeCategorizer) to filter on"""
+        return (self.collection.metadata or {}).get('category_labels') == 'multi'
+
+    def category_where(self, category: Optional[str]) -> Optional[Dict]:
+        if not category:
+            return None
+        if self.multi_label:
+            return {label_key(category): True}
+        return {"category": category}
+
+    def add_chunks(self, chunks: List[Dict], embeddings: List[List[float]], batch_size: int = 100,
+                   ids: Optional[List[str]] = None):
+        labelled = bool(chunks) and any(key.startswith(LABEL_PREFIX) for key in chunks[0]['metadata'])
+        if labelled and not self.multi_label:
+            if self.count() == 0:
+                self.collection.modify(metadata={**(self.collection.metadata or {}), 'category_labels': 'multi'})
+            else:
+                logger.warning("Adding multi-label chunks to an index without them; filters keep using 'category'")
+
         for i in tqdm(range(0, len(chunks), batch_size), desc="Adding chunks"):
             batch_chunks = chunks[i:i+batch_size]
             batch_embeddings = embeddings[i:i+batch_size]
-            
-            ids = [f"chunk_{i+j}" for j in range(len(batch_chunks))]
+
+            batch_ids = ids[i:i+batch_size] if ids is not None else [f"chunk_{i+j}" for j in range(len(batch_chunks))]
             documents = [chunk['text'] for chunk in batch_chunks]
             metadatas = [chunk['metadata'] for chunk in batch_chunks]
-            
-            self.collection.add(ids=ids, documents=documents, embeddings=batch_embeddings, metadatas=metadatas)
-    
-    def search(self, query_embedding: List[float], n_results: int = 5, category_filter: Optional[str] = None) -> Dict:
-        where_clause = {"category": category_filter} if category_filter else None
-        return self.collection.query(query_embeddings=[query_embedding], n_results=n_results, where=where_clause)
-    
+
+            if not self.sharded:
+                self.collection.add(ids=batch_ids, documents=documents, embeddings=batch_embeddings, metadatas=metadatas)
+                continue
+            placement: Dict[str, List[int]] = {}
+            for j, metadata in enumerate(metadatas):
+                for shard in self.shard_keys(metadata):
+                    placement.setdefault(shard, []).append(j)
+            for shard, rows in placement.items():
+                self._shard(shard).add(ids=[batch_ids[j] for j in rows], documents=[documents[j] for j in rows],
+                                       embeddings=[batch_embeddings[j] for j in rows],
+                                       metadatas=[metadatas[j] for j in rows])
+
+    def shard_keys(self, metadata: Dict) -> List[str]:
+        """Shards a chunk belongs in: each of its categories, or its section"""
+        if self.shard_by == 'section':
+            return [str(metadata.get('section_code') or metadata.get('section') or "unknown")]
+        labels = [key[len(LABEL_PREFIX):] for key, flag in metadata.items() if key.startswith(LABEL_PREFIX) and flag]
+        return labels or [metadata.get('category') or "uncategorized"]
+
+    def _shard(self, shard: str):
+        collection = self.shards.get(shard)
+        if collection is None:
+            collection = self.client.get_or_create_collection(name=shard_collection_name(shard))
+            self.shards[shard] = collection
+            self.collection.modify(metadata={**(self.collection.metadata or {}), 'shards': ",".join(self.shards)})
+        return collection
+
+    def _fan_out(self, queries: np.ndarray, n_results: int, where: Optional[Dict], include: List[str]) -> Dict:
+        """Query every shard in parallel and merge each query's hits into one Chroma-style result"""
+        if self._fan_out_pool is None:
+            workers = int(os.getenv("SHARD_SEARCH_WORKERS", str(max(1, len(self.shards)))))
+            self._fan_out_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard")
+        shard_results = list(self._fan_out_pool.map(
+            lambda collection: collection.query(query_embeddings=queries, n_results=n_results, where=where, include=include),
+            self.shards.values()))
+
+        fields = [field for field in ('distances', 'documents', 'metadatas', 'embeddings') if field in include]
+        merged = {'ids': [], **{field: [] for field in fields}}
+        for position in range(len(queries)):
+            hits = {}
+            for results in shard_results:
+                for j, chunk_id in enumerate(results['ids'][position]):
+                    if chunk_id not in hits:
+                        hits[chunk_id] = (results, j)
+            nearest = sorted(hits.items(), key=lambda item: item[1][0]['distances'][position][item[1][1]])[:n_results]
+            merged['ids'].append([chunk_id for chunk_id, _ in nearest])
+            for field in fields:
+                merged[field].append([results[field][position][j] for _, (results, j) in nearest])
+        return merged
+
+    def _query(self, queries: np.ndarray, n_results: int, category: Optional[str], include: List[str]) -> Dict:
+        if not self.sharded:
+            return self.collection.query(query_embeddings=queries, n_results=n_results,
+                                         where=self.category_where(category), include=include)
+        if category and self.shard_by == 'category':
+            shard = self.shards.get(category)
+            if shard is None:
+                return {'ids': [[] for _ in queries], **{field: [[] for _ in queries] for field in include}}
+            return shard.query(query_embeddings=queries, n_results=n_results, include=include)
+        return self._fan_out(queries, n_results, self.category_where(category), include)
+
+    def search(self, query_embedding: Union[np.ndarray, List[float]], n_results: int = 5, category_filter: Optional[str] = None) -> Dict:
+        with span("vectorstore.search", n_results=n_results, category=category_filter or "all"):
+            queries = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            return self._query(queries, n_results, category_filter, ['distances', 'documents', 'metadatas'])
+
+    def search_batch(self, query_embeddings: np.ndarray, n_results: Union[int, Sequence[int]] = 5,
+                     category_filters: Union[None, str, Sequence[Optional[str]]] = None,
+                     include_documents: bool = True, include_embeddings: bool = False) -> BatchSearchResult:
+        """Search many queries with per-query k and category; one Chroma call per distinct category"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        count = len(queries)
+        ks = np.full(count, n_results) if isinstance(n_results, int) else np.asarray(n_results)
+        if category_filters is None or isinstance(category_filters, str):
+            category_filters = [category_filters] * count
+
+        groups: Dict[Optional[str], List[int]] = {}
+        for row, category in enumerate(category_filters):
+            groups.setdefault(category, []).append(row)
+
+        include = ['distances', 'documents', 'metadatas'] if include_documents else ['distances']
+        if include_embeddings:
+            include.append('embeddings')
+        located = [None] * count
+        with span("vectorstore.search_batch", queries=count, groups=len(groups), shards=len(self.shards)):
+            for category, rows in groups.items():
+                results = self._query(queries[rows], int(ks[rows].max()), category, include)
+                for position, row in enumerate(rows):
+                    located[row] = (results, position)
+
+        ids, distances, documents, metadatas, embeddings, counts = [], [], [], [], [], []
+        for row, (results, position) in enumerate(located):
+            k = int(ks[row])
+            row_ids = results['ids'][position][:k]
+            ids.extend(row_ids)
+            distances.extend(results['distances'][position][:k])
+            if include_documents:
+                documents.extend(results['documents'][position][:k])
+                metadatas.extend(results['metadatas'][position][:k])
+            if include_embeddings:
+                embeddings.extend(results['embeddings'][position][:k])
+            counts.append(len(row_ids))
+
+        offsets = np.zeros(count + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+        return BatchSearchResult(
+            ids=ids,
+            distances=np.asarray(distances, dtype=np.float32),
+            rows=np.repeat(np.arange(count, dtype=np.int32), counts),
+            offsets=offsets,
+            documents=documents if include_documents else None,
+            metadatas=metadatas if include_documents else None,
+            embeddings=(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), queries.shape[1])
+                        if include_embeddings else None),
+        )
+
     def get_stats(self) -> Dict:
-        total_count = self.collection.count()
-        return {'total_chunks': total_count, 'categories': {}}
+        total_count = self.count()
+        stats = {'total_chunks': total_count, 'categories': {}, **self.get_embedding_signature()}
+        if self.sharded:
+            stats['shard_by'] = self.shard_by
+            stats['shards'] = {shard: collection.count() for shard, collection in self.shards.items()}
+        return stats
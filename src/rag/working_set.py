@@ -0,0 +1,164 @@
+"""
+Session Working Set - Serve follow-up retrievals from chunks the session already fetched
+
+Each store search leaves an anchor: the query embedding, its filter, and the
+(L2) distance r of the k-th hit. Every chunk the store did not return lies
+at least r from that query, so for a new query q at distance t from the
+anchor, unseen chunks are at least r - t away (triangle inequality). If the
+k nearest working-set chunks are all within that bound they are exactly the
+store's answer, found with one matmul instead of a store query.
+WORKING_SET_SLACK > 1 accepts near-misses for more reuse.
+
+A search that returned fewer than k hits returned every chunk matching its
+filter (a small or narrowly filtered category), so its anchor is complete:
+any later query with that filter is answered from those chunks, whatever k.
+
+Distances are squared L2, matching Chroma's default "l2" space.
+"""
+
+import os
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import List, Optional
+import numpy as np
+
+from src.monitoring.metrics import REGISTRY
+from .categorizer import has_category
+
+_current_working_set: contextvars.ContextVar = contextvars.ContextVar("ayurmind_working_set", default=None)
+
+_hits = REGISTRY.counter("ayurmind_working_set_hits_total", "Retrievals answered from the session working set")
+_misses = REGISTRY.counter("ayurmind_working_set_misses_total", "Retrievals that had to query the vector store")
+
+
+def current_working_set() -> Optional["SessionWorkingSet"]:
+    return _current_working_set.get()
+
+
+@contextmanager
+def use_working_set(working_set: Optional["SessionWorkingSet"]):
+    """Route retrievals in this block (and this thread/context) through `working_set`"""
+    token = _current_working_set.set(working_set)
+    try:
+        yield working_set
+    finally:
+        _current_working_set.reset(token)
+
+
+class SessionWorkingSet:
+    """Small per-session cache of retrieved chunks with their embeddings"""
+
+    def __init__(self, max_chunks: int = None, slack: float = None):
+        if max_chunks is None:
+            max_chunks = int(os.getenv("WORKING_SET_SIZE", "200"))
+        if slack is None:
+            slack = float(os.getenv("WORKING_SET_SLACK", "1.0"))
+
+        self.max_chunks = max_chunks
+        self.slack = slack
+        self.anchors: List[dict] = []
+        self.chunks: List = []
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self._lock = threading.Lock()
+        self.index_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def __deepcopy__(self, memo):
+        # Session state is copied by the UI layer; a fresh set is cheaper and always correct
+        return SessionWorkingSet(self.max_chunks, self.slack)
+
+    def bind(self, index_version: Optional[str]):
+        """Forget everything fetched from another index version (the retriever swapped indexes)"""
+        with self._lock:
+            if index_version != self.index_version:
+                self.anchors, self.chunks = [], []
+                self.embeddings = np.zeros((0, 0), dtype=np.float32)
+                self.sq_norms = np.zeros(0, dtype=np.float32)
+                self.index_version = index_version
+
+    def lookup(self, query_embedding: np.ndarray, k: int, category_filter: Optional[str] = None) -> Optional[List]:
+        """The k nearest working-set chunks if they provably (up to slack) match a store search, else None"""
+        with self._lock:
+            if not self.chunks:
+                return self._miss()
+            query = np.asarray(query_embedding, dtype=np.float32)
+
+            bound, complete = -np.inf, False
+            for anchor in self.anchors:
+                # A filtered anchor only vouches for its own category; an unfiltered one for everything
+                if anchor['category'] is not None and anchor['category'] != category_filter:
+                    continue
+                if anchor['complete']:
+                    complete = True
+                    break
+                if anchor['k'] < k:
+                    continue
+                bound = max(bound, anchor['radius'] - float(np.linalg.norm(query - anchor['query'])))
+            if not complete and bound <= 0:
+                return self._miss()
+
+            # Squared L2 for every cached chunk in one matmul: |x|^2 - 2 x.q + |q|^2
+            distances = self.sq_norms - 2.0 * (self.embeddings @ query) + float(query @ query)
+            if category_filter is not None:
+                mask = np.fromiter((has_category(chunk.metadata, category_filter) for chunk in self.chunks),
+                                   dtype=bool, count=len(self.chunks))
+                distances = np.where(mask, distances, np.inf)
+            available = int(np.count_nonzero(np.isfinite(distances)))
+            if complete:
+                # Every chunk the store holds for this filter is cached; the store would return them all
+                k = min(k, available)
+            elif available < k:
+                return self._miss()
+
+            nearest = np.argpartition(distances, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+            nearest = nearest[np.argsort(distances[nearest])]
+            # Small tolerance so repeating the anchor's own query still counts as covered
+            if not complete and np.sqrt(max(float(distances[nearest[-1]]), 0.0)) > bound * self.slack + 1e-4:
+                return self._miss()
+
+            self.hits += 1
+            _hits.inc()
+            return [self._with_distance(self.chunks[i], float(distances[i])) for i in nearest]
+
+    def _miss(self):
+        self.misses += 1
+        _misses.inc()
+        return None
+
+    @staticmethod
+    def _with_distance(chunk, distance: float):
+        return type(chunk)(chunk.id, chunk.text, chunk.metadata, max(distance, 0.0), chunk.source)
+
+    def add(self, query_embedding: np.ndarray, category_filter: Optional[str], k: int, chunks: List, embeddings: np.ndarray):
+        """Record a store search: its chunks join the set and it becomes an anchor"""
+        complete = len(chunks) < k
+        radius = np.inf if complete else np.sqrt(chunks[-1].distance)
+        with self._lock:
+            self.anchors.append({'query': np.asarray(query_embedding, dtype=np.float32), 'category': category_filter,
+                                 'k': k, 'radius': float(radius), 'complete': complete,
+                                 'ids': [chunk.id for chunk in chunks]})
+            known = {chunk.id for chunk in self.chunks}
+            fresh = [(chunk, row) for chunk, row in zip(chunks, embeddings) if chunk.id not in known]
+            if fresh:
+                self.chunks.extend(chunk for chunk, _ in fresh)
+                rows = np.asarray([row for _, row in fresh], dtype=np.float32)
+                self.embeddings = rows if not len(self.embeddings) else np.vstack([self.embeddings, rows])
+                self.sq_norms = np.einsum('ij,ij->i', self.embeddings, self.embeddings)
+            if len(self.chunks) > self.max_chunks:
+                self._evict()
+
+    def _evict(self):
+        """Drop the oldest anchors until the chunks they need fit; their guarantees go with them"""
+        while self.anchors and len({i for a in self.anchors for i in a['ids']}) > self.max_chunks:
+            self.anchors.pop(0)
+        needed = {i for a in self.anchors for i in a['ids']}
+        keep = [index for index, chunk in enumerate(self.chunks) if chunk.id in needed]
+        self.chunks = [self.chunks[i] for i in keep]
+        self.embeddings = self.embeddings[keep]
+        self.sq_norms = self.sq_norms[keep]
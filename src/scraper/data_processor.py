@@ -9,11 +9,13 @@ import os
 import json
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 import tiktoken
 from tqdm import tqdm
 import logging
 
+from .normalization import TextNormalizer, SentenceSegmenter
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -26,7 +28,9 @@ class AyurvedicTextProcessor:
         input_dir: str = "./data/raw",
         output_dir: str = "./data/processed",
         chunk_size: int = 800,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        normalizer: Optional[TextNormalizer] = None,
+        segmenter: Optional[SentenceSegmenter] = None
     ):
         """Initialize processor
         
@@ -35,6 +39,8 @@ class AyurvedicTextProcessor:
             output_dir: Directory to save processed chunks
             chunk_size: Target chunk size in tokens
             chunk_overlap: Overlap between chunks in tokens
+            normalizer: Text cleanup (default: TextNormalizer)
+            segmenter: Sentence/verse splitter (default: SentenceSegmenter)
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
@@ -42,6 +48,8 @@ class AyurvedicTextProcessor:
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.normalizer = normalizer or TextNormalizer()
+        self.segmenter = segmenter or SentenceSegmenter()
         
         # Initialize tokenizer
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
@@ -57,6 +65,15 @@ class AyurvedicTextProcessor:
         """
         return len(self.tokenizer.encode(text))
     
+    def chunker_params(self) -> Dict:
+        """Settings that determine the chunks, recorded with the index and its snapshots"""
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'tokenizer': self.tokenizer.name,
+            'fold_diacritics': self.normalizer.fold_diacritics,
+        }
+    
     def clean_text(self, text: str) -> str:
         """Clean and normalize text
         
@@ -66,19 +83,7 @@ class AyurvedicTextProcessor:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        text = re.sub(r'  +', ' ', text)
-        
-        # Remove page numbers, headers, footers
-        text = re.sub(r'\[Page \d+\]', '', text)
-        text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
-        
-        # Normalize quotes
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        
-        return text.strip()
+        return self.normalizer.normalize(text)
     
     def split_into_sections(self, text: str) -> List[Dict[str, str]]:
         """Split text into logical sections
@@ -131,8 +136,8 @@ class AyurvedicTextProcessor:
         # Clean text first
         text = self.clean_text(text)
         
-        # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        # Split into sentences (verses stay whole)
+        sentences = self.segmenter.split(text)
         
         current_chunk = []
         current_tokens = 0
@@ -289,6 +294,8 @@ class AyurvedicTextProcessor:
                     'chapter_number': 0
                 }
                 index_chunks = self.process_chapter(index_file, index_metadata)
+                for chunk in index_chunks:
+                    chunk['metadata']['category'] = self.categorize_content(chunk['text'], section['section_name'])
                 section_chunks.extend(index_chunks)
             
             # Process each chapter
@@ -339,7 +346,8 @@ class AyurvedicTextProcessor:
             'total_tokens': sum(c['token_count'] for c in all_chunks),
             'avg_chunk_size': sum(c['token_count'] for c in all_chunks) / len(all_chunks) if all_chunks else 0,
             'sections': section_stats,
-            'categories': self._get_category_stats(all_chunks)
+            'categories': self._get_category_stats(all_chunks),
+            'chunker': self.chunker_params()
         }
         
         summary_file = self.output_dir / 'processing_summary.json'
@@ -8,6 +8,7 @@ from pathlib import Path
 import gradio as gr
 from dotenv import load_dotenv
 import logging
+from concurrent.futures import TimeoutError as FutureTimeout
 
 # Setup logger with unique name to avoid conflicts
 app_logger = logging.getLogger('ayurmind.ui')
@@ -19,15 +20,9 @@ app_logger.addHandler(handler)
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.rag.embeddings import EmbeddingGenerator
-from src.rag.vectorstore import AyurvedicVectorStore
-from src.rag.retriever import RAGRetriever
-from src.llm.openrouter_client import OpenRouterClient
-from src.llm.local_client import OllamaClient
-from src.agents.prakriti_agent import PrakritiAgent
-from src.agents.dosha_agent import DoshaAgent
-from src.agents.treatment_agent import TreatmentAgent
-from src.agents.orchestrator import OrchestratorAgent
+from src.llm.scheduler import QueueFullError
+from src.agents.memory import ConversationMemory
+from src.api.client import AyurMindAPIClient, APIError
 
 load_dotenv()
 
@@ -39,42 +34,21 @@ class AyurMindApp:
         """Initialize the application"""
         app_logger.info("Initializing AyurMind application...")
         
-        # Initialize RAG components
-        self.vectorstore = AyurvedicVectorStore()
-        self.embedding_generator = EmbeddingGenerator()
-        self.retriever = RAGRetriever(self.vectorstore, self.embedding_generator)
-        
-        # Initialize LLM client - try local first
-        use_local = os.getenv("USE_LOCAL_FALLBACK", "true").lower() == "true"
-        
-        if use_local:
-            try:
-                self.llm_client = OllamaClient()
-                if not self.llm_client.is_available():
-                    raise Exception("Ollama not running")
-                app_logger.info("✅ Using Local Ollama (free, unlimited)")
-            except Exception as e:
-                app_logger.warning(f"Ollama unavailable: {e}")
-                app_logger.info("Falling back to OpenRouter API")
-                self.llm_client = OpenRouterClient()
+        # With AYURMIND_API_URL set the UI is a thin client of the HTTP API (scripts/15_run_api.py);
+        # otherwise it builds the consultation stack in-process
+        api_url = os.getenv("AYURMIND_API_URL")
+        self.api = AyurMindAPIClient(api_url) if api_url else None
+        self.service = None
+        if self.api is None:
+            from src.api.service import AyurMindService
+            self.service = AyurMindService()
+            self.retriever = self.service.retriever
+            self.scheduler = self.service.scheduler
+            self.orchestrator = self.service.orchestrator
         else:
-            self.llm_client = OpenRouterClient()
-            app_logger.info("Using OpenRouter API")
-        
-        # Initialize agents
-        self.prakriti_agent = PrakritiAgent(self.retriever, self.llm_client)
-        self.dosha_agent = DoshaAgent(self.retriever, self.llm_client)
-        self.treatment_agent = TreatmentAgent(self.retriever, self.llm_client)
+            self.retriever = self.scheduler = self.orchestrator = None
         
-        # Initialize orchestrator
-        self.orchestrator = OrchestratorAgent(
-            self.prakriti_agent,
-            self.dosha_agent,
-            self.treatment_agent,
-            self.llm_client
-        )
-        
-        app_logger.info("✓ AyurMind initialized successfully")
+        app_logger.info(f"✓ AyurMind initialized successfully ({'API client of ' + api_url if self.api else 'in-process'})")
     
     # def chat(self, message: str, history: list):
     #     if not message.strip():
@@ -85,30 +59,77 @@ class AyurMindApp:
     #         return response
     #     except Exception as e:
     #         return f"Error: {str(e)}. Please try again."
-    def chat(self, message: str, history: list):
+    def chat(self, message: str, history: list, memory: ConversationMemory = None, request: gr.Request = None):
         history = history or []
+        # Per-session summary, recent turns and assessments (held in gr.State)
+        memory = memory if memory is not None else ConversationMemory()
 
         if not message.strip():
-            return history
-
-        try:
-            # add user message
-            history.append({"role": "user", "content": message})
+            yield history, memory
+            return
 
-            response = self.orchestrator.simple_query(message)
+        # add user message
+        history.append({"role": "user", "content": message})
+        session_id = request.session_hash if request is not None else "default"
 
-            # add assistant message
-            history.append({"role": "assistant", "content": response})
+        if self.api is not None:
+            yield from self._chat_remote(message, history, memory, session_id)
+            return
 
-            return history
+        try:
+            # Leaving this block early (disconnect, Stop button) cancels the consultation
+            with self.service.consultation(message, session_id, memory) as future:
+                history.append({"role": "assistant", "content": "⏳ Consulting the texts..."})
+                while True:
+                    try:
+                        response = future.result(timeout=0.5)['final_response']
+                        break
+                    except FutureTimeout:
+                        queued = self.scheduler.stats()['queued']
+                        status = f"⏳ Waiting for a free slot ({queued} queued)..." if queued else "⏳ Consulting the texts..."
+                        history[-1] = {"role": "assistant", "content": status}
+                        yield history, memory
+
+                # replace the status line with the assistant message
+                history[-1] = {"role": "assistant", "content": response}
+                yield history, memory
+
+        except QueueFullError as e:
+            history.append({"role": "assistant", "content": f"⚠️ {e}"})
+            yield history, memory
 
         except Exception as e:
+            if history[-1]["role"] == "assistant":
+                history.pop()
             history.append({
                 "role": "assistant",
                 "content": f"Error: {str(e)}. Please try again."
             })
-            return history
+            yield history, memory
 
+    def _chat_remote(self, message: str, history: list, memory, session_id: str):
+        # Memory travels as the API's plain-dict state, so any API worker can continue the conversation
+        state = memory.to_dict() if isinstance(memory, ConversationMemory) else memory
+        history.append({"role": "assistant", "content": "⏳ Consulting the texts..."})
+        yield history, state
+        try:
+            # Closing this generator (Stop button, disconnect) closes the stream, which cancels server-side
+            for event, data in self.api.consult_stream(message, session_id, state):
+                if event == "status":
+                    queued = data.get('queued', 0)
+                    status = f"⏳ Waiting for a free slot ({queued} queued)..." if queued else "⏳ Consulting the texts..."
+                    history[-1] = {"role": "assistant", "content": status}
+                    yield history, state
+                elif event == "result":
+                    history[-1] = {"role": "assistant", "content": data['final_response']}
+                    yield history, data['memory']
+        except APIError as e:
+            prefix = "⚠️ " if e.status_code == 503 else "Error: "
+            history[-1] = {"role": "assistant", "content": f"{prefix}{e}"}
+            yield history, state
+        except Exception as e:
+            history[-1] = {"role": "assistant", "content": f"Error: {str(e)}. Please try again."}
+            yield history, state
     
     def create_interface(self):
         with gr.Blocks(title="AyurMind") as interface:
@@ -117,22 +138,27 @@ class AyurMindApp:
             gr.HTML('<div style="background:#fff3cd; border:1px solid #ffc107; padding:1rem; border-radius:5px; margin:1rem 0;"><strong>⚠️ Disclaimer:</strong> Educational only. Not medical advice. Consult professionals.</div>')
             
             chatbot = gr.Chatbot(height=500, label="Consultation")
+            memory = gr.State(None)
             
             with gr.Row():
                 msg = gr.Textbox(label="Your Question", placeholder="Describe your concern...", scale=4)
                 submit = gr.Button("Send", variant="primary", scale=1)
             
-            clear = gr.Button("Clear")
+            with gr.Row():
+                stop = gr.Button("Stop")
+                clear = gr.Button("Clear")
             
             gr.Examples(
                 examples=[["I have digestive issues and anxiety"], ["What is Vata constitution?"], ["Foods for better sleep?"]],
                 inputs=msg
             )
             
-            msg.submit(self.chat, [msg, chatbot], [chatbot])
-            submit.click(self.chat, [msg, chatbot], [chatbot])
+            # Concurrency is enforced by self.scheduler, not per-event limits
+            submit_event = msg.submit(self.chat, [msg, chatbot, memory], [chatbot, memory], concurrency_limit=None)
+            click_event = submit.click(self.chat, [msg, chatbot, memory], [chatbot, memory], concurrency_limit=None)
             msg.submit(lambda: "", None, [msg])
-            clear.click(lambda: None, None, [chatbot])
+            stop.click(None, None, None, cancels=[submit_event, click_event])
+            clear.click(lambda: (None, None), None, [chatbot, memory])
         
         return interface
     
@@ -143,6 +169,8 @@ class AyurMindApp:
             server_port = int(os.getenv("GRADIO_PORT", "7860"))
         
         interface = self.create_interface()
+        default_queue = str(self.scheduler.capacity) if self.scheduler is not None else "64"
+        interface.queue(max_size=int(os.getenv("GRADIO_QUEUE_SIZE", default_queue)))
         interface.launch(share=share, server_port=server_port, server_name="127.0.0.1")
 
 def main():
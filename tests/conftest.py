@@ -0,0 +1,50 @@
+import sys
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+CATEGORIES = ("prakriti", "dosha", "treatment")
+
+
+class HashEmbedder:
+    """Deterministic stand-in for EmbeddingGenerator: a unit vector seeded by the text"""
+
+    model_name = "test-hash"
+    backend = "test"
+    embedding_dim = 16
+
+    def embed_text(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.embedding_dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def embed_batch(self, texts, show_progress_bar: bool = False) -> np.ndarray:
+        return np.vstack([self.embed_text(text) for text in texts])
+
+    def get_signature(self):
+        return {'embedding_model': self.model_name, 'embedding_backend': self.backend,
+                'embedding_dim': self.embedding_dim}
+
+
+@pytest.fixture
+def embedder():
+    return HashEmbedder()
+
+
+@pytest.fixture
+def store_rows(embedder):
+    """Rows for a small index: ids, embeddings, documents, metadatas (one category each)"""
+    ids = [f"chunk-{i:03d}" for i in range(90)]
+    documents = [f"passage {i} on {CATEGORIES[i % 3]}" for i in range(90)]
+    metadatas = [{'category': CATEGORIES[i % 3], 'chapter': i // 10} for i in range(90)]
+    return ids, embedder.embed_batch(documents), documents, metadatas
+
+
+@pytest.fixture
+def memory_store(store_rows, embedder):
+    from src.rag.memory_store import InMemoryVectorStore
+    return InMemoryVectorStore.from_rows(*store_rows, embedding_signature=embedder.get_signature())
@@ -0,0 +1,88 @@
+"""Tests for conversation memory (src/agents/memory.py) and how the orchestrator reuses its assessments"""
+import pytest
+
+from src.agents import memory as memory_module
+from src.agents.memory import ConversationMemory
+from src.agents.orchestrator import OrchestratorAgent
+from src.agents.synthesis import AdaptiveSynthesisPolicy
+
+
+class RecordingAgent:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = []
+
+    def process(self, query, additional_info=None):
+        self.calls.append((query, dict(additional_info or {})))
+        return {'response': f"{self.name} answer to: {query}"}
+
+
+class EchoLLM:
+    def generate(self, prompt, **kwargs):
+        return "synthesized"
+
+
+def make_orchestrator():
+    agents = [RecordingAgent(name) for name in ('prakriti', 'dosha', 'treatment')]
+    return OrchestratorAgent(*agents, EchoLLM(), synthesis_policy=AdaptiveSynthesisPolicy()), agents
+
+
+def test_only_activated_agent_reruns_instead_of_returning_the_remembered_answer():
+    orchestrator, (prakriti, _, _) = make_orchestrator()
+    memory = ConversationMemory()
+    orchestrator.process_query("What is my prakriti?", memory=memory)
+    result = orchestrator.process_query("Is vata or pitta dominant in me?", memory=memory)
+
+    assert result['final_response'] == "prakriti answer to: Is vata or pitta dominant in me?"
+    assert result['reused'] == []
+    assert len(prakriti.calls) == 2
+
+
+def test_remembered_assessment_is_context_not_answer():
+    orchestrator, (prakriti, dosha, treatment) = make_orchestrator()
+    memory = ConversationMemory()
+    orchestrator.process_query("What is my prakriti?", memory=memory)
+    # Activates prakriti (remembered) and treatment (runs)
+    result = orchestrator.process_query("Which diet suits vata?", memory=memory)
+
+    assert result['reused'] == ['prakriti']
+    assert len(prakriti.calls) == 1
+    assert list(result['agent_responses']) == ['treatment']
+    assert result['final_response'] == "treatment answer to: Which diet suits vata?"
+    _, context = treatment.calls[-1]
+    assert context['Prakriti'] == "prakriti answer to: What is my prakriti?"
+
+
+def test_reused_assessment_is_not_recorded_as_new():
+    orchestrator, _ = make_orchestrator()
+    memory = ConversationMemory()
+    orchestrator.process_query("What is my prakriti?", memory=memory)
+    orchestrator.process_query("Which diet suits vata?", memory=memory)
+    assert memory.assessments['prakriti']['turn'] == 1
+
+
+@pytest.fixture
+def offline_tokenizer(monkeypatch):
+    def unavailable(name):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(memory_module.tiktoken, "get_encoding", unavailable)
+    memory_module._encoding.cache_clear()
+    yield
+    memory_module._encoding.cache_clear()
+
+
+def test_budgets_still_apply_without_the_tokenizer(offline_tokenizer):
+    memory = ConversationMemory(max_history_tokens=50, max_turns=10, summary_tokens=10)
+    for turn in range(5):
+        memory.add_turn(f"question {turn} " + "x" * 80, {'final_response': "y" * 80, 'agent_responses': {}})
+    assert 0 < memory.history_tokens <= 50
+    assert len(memory.summary) <= 10 * memory_module.CHARS_PER_TOKEN
+    assert memory_module.count_tokens("abcdefgh") == 2
+
+
+def test_offline_consultation_with_memory_completes(offline_tokenizer):
+    orchestrator, _ = make_orchestrator()
+    memory = ConversationMemory()
+    result = orchestrator.process_query("What is my prakriti?", memory=memory)
+    assert result['final_response'] and len(memory) == 1
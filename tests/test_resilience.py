@@ -0,0 +1,130 @@
+"""Tests for retries, deadlines and hedging (src/llm/resilience.py) with the scheduler below them"""
+import threading
+import time
+
+import pytest
+
+from src.llm.factory import create_llm_client
+from src.llm.options import GenerationOptions
+from src.llm.resilience import LLMHTTPError, LLMTimeoutError, ResilientLLMClient, RetryPolicy
+from src.llm.scheduler import LLMScheduler, ScheduledLLMClient, SlotUnavailable
+from src.monitoring.metrics import MetricsRegistry
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01, jitter=0)
+
+
+class ScriptedClient:
+    """Answers from a script of results/exceptions (the last entry repeats), recording each call's timeout"""
+
+    def __init__(self, *script, delay: float = 0.0):
+        self.script = list(script) or ["answer"]
+        self.delay = delay
+        self.timeouts = []
+
+    def generate(self, prompt, options=None, **kwargs):
+        self.timeouts.append(options.timeout if options is not None else None)
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        time.sleep(self.delay)
+        if isinstance(step, Exception):
+            raise step
+        return step
+
+
+def make_client(base, **kwargs):
+    return ResilientLLMClient(base, policy=FAST_RETRIES, registry=MetricsRegistry(), **kwargs)
+
+
+def hold_slot(scheduler: LLMScheduler, seconds: float) -> threading.Thread:
+    held = threading.Event()
+
+    def hold():
+        with scheduler.slot():
+            held.set()
+            time.sleep(seconds)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait(1)
+    return thread
+
+
+def test_retryable_failure_is_retried():
+    base = ScriptedClient(LLMHTTPError("busy", status_code=503), "answer")
+    assert make_client(base).generate("q") == "answer"
+    assert len(base.timeouts) == 2
+
+
+def test_client_error_is_not_retried():
+    base = ScriptedClient(LLMHTTPError("bad request", status_code=400))
+    with pytest.raises(LLMHTTPError):
+        make_client(base).generate("q")
+    assert len(base.timeouts) == 1
+
+
+def test_retry_after_beyond_the_stage_deadline_gives_up():
+    base = ScriptedClient(LLMHTTPError("slow down", status_code=429, retry_after=5))
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        make_client(base).generate("q", options=GenerationOptions(timeout=0.5))
+    assert time.monotonic() - started < 0.5
+    assert len(base.timeouts) == 1
+
+
+def test_each_attempt_gets_only_the_time_left():
+    base = ScriptedClient(LLMHTTPError("busy", status_code=503), "answer", delay=0.2)
+    make_client(base).generate("q", options=GenerationOptions(timeout=2))
+    first, second = base.timeouts
+    assert first <= 2 and second <= first - 0.2
+
+
+def test_slot_wait_ends_at_the_stage_deadline():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=4, registry=MetricsRegistry())
+    base = ScriptedClient()
+    client = create_llm_client(base, scheduler)
+    holder = hold_slot(scheduler, 3)
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        client.generate("q", options=GenerationOptions(timeout=0.5))
+    assert time.monotonic() - started < 1.0
+    assert base.timeouts == []
+    holder.join()
+
+
+def test_slot_wait_comes_out_of_the_call_timeout():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=4, registry=MetricsRegistry())
+    base = ScriptedClient()
+    holder = hold_slot(scheduler, 0.4)
+    ScheduledLLMClient(base, scheduler).generate("q", options=GenerationOptions(timeout=2))
+    holder.join()
+    assert base.timeouts[0] < 1.7
+
+
+def test_consultation_deadline_caps_the_stage():
+    scheduler = LLMScheduler(max_in_flight=1, max_queue=4, consultation_timeout=0.3, registry=MetricsRegistry())
+    base = ScriptedClient()
+    with scheduler.consultation("s1") as consultation:
+        consultation.run(ScheduledLLMClient(base, scheduler).generate, "q", options=GenerationOptions(timeout=60))
+    assert base.timeouts[0] <= 0.3
+
+
+class LatencyPrimedClient(ResilientLLMClient):
+    """Hedges after the first call: one latency sample is enough"""
+
+    def __init__(self, base, hedge_client):
+        super().__init__(base, policy=FAST_RETRIES, hedge_client=hedge_client, hedge_min_samples=1,
+                         registry=MetricsRegistry())
+        self._record_latency("default", 0.05)
+
+
+def test_hedge_answers_when_the_primary_is_slow():
+    client = LatencyPrimedClient(ScriptedClient("primary", delay=1.0), ScriptedClient("hedge"))
+    started = time.monotonic()
+    assert client.generate("q", options=GenerationOptions(timeout=5)) == "hedge"
+    assert time.monotonic() - started < 0.8
+    assert client._hedge_wins.value == 1
+
+
+def test_skipped_hedge_waits_for_the_primary():
+    client = LatencyPrimedClient(ScriptedClient("primary", delay=0.3), ScriptedClient(SlotUnavailable("full")))
+    assert client.generate("q", options=GenerationOptions(timeout=5)) == "primary"
+    assert client._hedges_skipped.value == 1
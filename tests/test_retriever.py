@@ -0,0 +1,59 @@
+"""Tests for the retriever (src/rag/retriever.py): batch prefetching as agents use it, index swaps"""
+import pytest
+
+from src.agents.prakriti_agent import PrakritiAgent
+from src.rag.memory_store import InMemoryVectorStore
+from src.rag.retriever import RAGRetriever
+
+QUERIES = ["What is my body type?", "Why do I sleep badly?", "Which foods calm vata?"]
+
+
+@pytest.fixture
+def retriever(monkeypatch, memory_store, embedder):
+    monkeypatch.setenv("MAX_CHUNKS_PER_QUERY", "3")
+    retriever = RAGRetriever(vectorstore=memory_store, embedding_generator=embedder)
+    searches = []
+    search_batch = memory_store.search_batch
+
+    def counting_search_batch(*args, **kwargs):
+        searches.append(kwargs.get('category_filters'))
+        return search_batch(*args, **kwargs)
+
+    monkeypatch.setattr(memory_store, "search_batch", counting_search_batch)
+    retriever.searches = searches
+    return retriever
+
+
+def test_agents_hit_prefetched_results_with_a_custom_k(retriever):
+    agent = PrakritiAgent(retriever, llm_client=None)
+    retriever.prefetch(QUERIES, [agent.get_category_filter()])
+    assert len(retriever.searches) == 1
+
+    for query in QUERIES:
+        agent.retrieve_context(query)
+    assert len(retriever.searches) == 1
+
+
+def test_prefetched_results_match_a_direct_retrieval(retriever):
+    retriever.prefetch(QUERIES, ["dosha"])
+    prefetched = [retriever.retrieve(query, category_filter="dosha") for query in QUERIES]
+    retriever.clear_prefetch()
+    direct = [retriever.retrieve(query, category_filter="dosha") for query in QUERIES]
+    assert [[chunk.id for chunk in chunks] for chunks in prefetched] == [[chunk.id for chunk in chunks] for chunks in direct]
+    assert all(len(chunks) == 3 for chunks in direct)
+
+
+def test_chunk_count_is_taken_at_load_and_swap(monkeypatch, store_rows, embedder):
+    ids, embeddings, documents, metadatas = store_rows
+    first = InMemoryVectorStore.from_rows(ids, embeddings, documents, metadatas)
+    second = InMemoryVectorStore.from_rows(ids[:30], embeddings[:30], documents[:30], metadatas[:30])
+    counts = []
+    for store in (first, second):
+        count = store.count
+        monkeypatch.setattr(store, "count", lambda count=count: counts.append(1) or count())
+
+    retriever = RAGRetriever(vectorstore=first, embedding_generator=embedder)
+    assert [retriever.index_chunks for _ in range(3)] == [90, 90, 90]
+    retriever.swap_index(second)
+    assert [retriever.index_chunks for _ in range(3)] == [30, 30, 30]
+    assert len(counts) == 2
@@ -0,0 +1,101 @@
+"""Tests for consultation admission and cancellation (src/llm/scheduler.py)"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.llm.scheduler import LLMScheduler, QueueFullError, current_consultation
+from src.monitoring.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def make_scheduler(**kwargs):
+    return LLMScheduler(max_in_flight=1, max_queue=0, consultation_timeout=0, registry=MetricsRegistry(), **kwargs)
+
+
+def wait_for_cancel(started: threading.Event):
+    """Work that runs until its consultation is cancelled, like an LLM call reaching its next check"""
+    started.set()
+    consultation = current_consultation()
+    for _ in range(200):
+        if consultation.cancelled:
+            return "cancelled"
+        threading.Event().wait(0.01)
+    return "ran to the end"
+
+
+def test_returning_from_the_block_while_pending_cancels(executor):
+    # Mirrors the SSE handler: a disconnected client makes the generator return inside the block
+    scheduler = make_scheduler()
+    started = threading.Event()
+    seen = {}
+
+    def events():
+        with scheduler.consultation("s1") as consultation:
+            seen['future'] = consultation.submit(executor, wait_for_cancel, started)
+            seen['consultation'] = consultation
+            started.wait(2)
+            yield "status"
+            return
+
+    assert list(events()) == ["status"]
+    assert seen['consultation'].cancelled
+    assert seen['future'].result(timeout=2) == "cancelled"
+    assert scheduler._cancelled.value == 1
+    assert scheduler.stats()['active_consultations'] == 0
+
+
+def test_closing_the_generator_cancels(executor):
+    scheduler = make_scheduler()
+    started = threading.Event()
+    seen = {}
+
+    def events():
+        with scheduler.consultation("s1") as consultation:
+            seen['future'] = consultation.submit(executor, wait_for_cancel, started)
+            while True:
+                yield "status"
+
+    stream = events()
+    next(stream)
+    started.wait(2)
+    stream.close()
+    assert seen['future'].result(timeout=2) == "cancelled"
+    assert scheduler._cancelled.value == 1
+
+
+def test_completed_work_is_not_cancelled(executor):
+    scheduler = make_scheduler()
+    with scheduler.consultation("s1") as consultation:
+        result = consultation.submit(executor, lambda: "answer").result(timeout=2)
+    assert result == "answer"
+    assert not consultation.cancelled
+    assert scheduler._cancelled.value == 0
+    assert scheduler.stats()['active_consultations'] == 0
+
+
+def test_capacity_is_held_until_cancelled_work_finishes(executor):
+    scheduler = make_scheduler()
+    started, release = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        release.wait(2)
+
+    with scheduler.consultation("s1") as consultation:
+        future = consultation.submit(executor, busy)
+        started.wait(2)
+    assert consultation.cancelled
+    with pytest.raises(QueueFullError):
+        with scheduler.consultation("s2"):
+            pass
+    release.set()
+    future.result(timeout=2)
+    with scheduler.consultation("s2"):
+        pass
@@ -0,0 +1,62 @@
+"""Tests for snapshot files (src/rag/snapshot.py): round trip, checksum and empty stores"""
+import numpy as np
+import pytest
+
+from src.rag.memory_store import InMemoryVectorStore
+from src.rag.snapshot import SnapshotError, load_snapshot, read_header, verify_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, memory_store):
+    path = tmp_path / "index.ayursnap"
+    write_snapshot(str(path), memory_store)
+    return path
+
+
+def search(store, queries, category=None):
+    results = store.search_batch(queries, n_results=5, category_filters=category)
+    hits = [results.hits(row) for row in range(len(results))]
+    return [(list(results.ids[h.start:h.stop]), list(np.round(results.distances[h.start:h.stop], 5))) for h in hits]
+
+
+def test_round_trip_preserves_rows_and_search_results(snapshot_path, memory_store, embedder):
+    loaded = load_snapshot(str(snapshot_path))
+    assert loaded.ids == memory_store.ids
+    assert loaded.get_embedding_signature() == memory_store.get_embedding_signature()
+    assert loaded.chunks(["chunk-007"], [0.0])[0].metadata == memory_store.chunks(["chunk-007"], [0.0])[0].metadata
+
+    queries = embedder.embed_batch(["vata and sleep", "pitta diet", "kapha in spring"])
+    assert search(loaded, queries) == search(memory_store, queries)
+    assert search(loaded, queries, "treatment") == search(memory_store, queries, "treatment")
+
+
+def test_corrupted_payload_is_rejected(snapshot_path):
+    header = read_header(str(snapshot_path))
+    data = bytearray(snapshot_path.read_bytes())
+    data[-header['payload_bytes'] // 2] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        verify_snapshot(str(snapshot_path))
+    with pytest.raises(SnapshotError):
+        load_snapshot(str(snapshot_path), verify=True)
+
+
+def test_truncated_file_is_rejected(snapshot_path):
+    snapshot_path.write_bytes(snapshot_path.read_bytes()[:-100])
+    with pytest.raises(SnapshotError, match="truncated"):
+        load_snapshot(str(snapshot_path), verify=False)
+
+
+def test_not_a_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "index.ayursnap"
+    path.write_bytes(b"definitely not a snapshot file")
+    with pytest.raises(SnapshotError):
+        read_header(str(path))
+
+
+def test_empty_store_round_trip(tmp_path):
+    path = tmp_path / "empty.ayursnap"
+    write_snapshot(str(path), InMemoryVectorStore.from_rows([], np.zeros((0, 8)), [], []))
+    loaded = load_snapshot(str(path))
+    assert len(loaded) == 0 and loaded.ids == [] and loaded.embeddings.shape == (0, 8)
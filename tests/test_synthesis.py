@@ -0,0 +1,127 @@
+"""Tests for the synthesis policy (src/agents/synthesis.py) and its use by the orchestrator"""
+import pytest
+
+from src.agents import synthesis
+from src.agents.synthesis import (
+    LLM, PASS_THROUGH, TEMPLATE, AdaptiveSynthesisPolicy, AlwaysSynthesizePolicy,
+    get_synthesis_policy, is_structured, record_saved, template_merge,
+)
+from src.agents.orchestrator import OrchestratorAgent
+
+STRUCTURED = "1. Vata predominant\n2. Light, dry qualities\n3. Favour warm foods"
+FREE_FORM = "Your constitution appears to be mostly vata, with some pitta."
+
+
+class StubAgent:
+    def __init__(self, response: str):
+        self.response = response
+
+    def process(self, query, additional_info=None):
+        return {'response': self.response}
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, **kwargs):
+        self.calls += 1
+        return "synthesized"
+
+
+@pytest.mark.parametrize("results, expected", [
+    ({}, PASS_THROUGH),
+    ({'prakriti': FREE_FORM}, PASS_THROUGH),
+    ({'prakriti': STRUCTURED, 'treatment': STRUCTURED}, TEMPLATE),
+    ({'prakriti': STRUCTURED, 'treatment': FREE_FORM}, LLM),
+    ({'prakriti': FREE_FORM, 'dosha': FREE_FORM}, LLM),
+])
+def test_adaptive_decide(results, expected):
+    assert AdaptiveSynthesisPolicy().decide(results) == expected
+
+
+def test_single_policy_never_templates():
+    policy = get_synthesis_policy("single")
+    assert policy.decide({'prakriti': STRUCTURED}) == PASS_THROUGH
+    assert policy.decide({'prakriti': STRUCTURED, 'dosha': STRUCTURED}) == LLM
+
+
+def test_always_synthesize():
+    assert AlwaysSynthesizePolicy().decide({'prakriti': STRUCTURED}) == LLM
+
+
+def test_is_structured():
+    assert is_structured(STRUCTURED)
+    assert is_structured("**1.** First\n**2)** Second")
+    assert not is_structured("1. Only one item")
+    assert not is_structured(FREE_FORM)
+
+
+def test_template_merge_orders_sections_and_adds_disclaimer():
+    merged = template_merge("query", {'treatment': " 1. Ginger\n2. Rest ", 'prakriti': STRUCTURED})
+    prakriti = merged.index("## Constitutional Assessment")
+    treatment = merged.index("## Treatment Recommendations")
+    assert prakriti < treatment
+    assert "## Imbalance Analysis" not in merged
+    assert "## Treatment Recommendations\n\n1. Ginger\n2. Rest" in merged
+    assert merged.rstrip().endswith("please consult a qualified practitioner._")
+
+
+@pytest.mark.parametrize("name, policy_type", [
+    ("adaptive", AdaptiveSynthesisPolicy),
+    ("LLM", AlwaysSynthesizePolicy),
+    ("single", AdaptiveSynthesisPolicy),
+])
+def test_policy_selected_from_env(monkeypatch, name, policy_type):
+    monkeypatch.setenv("SYNTHESIS_POLICY", name)
+    assert isinstance(get_synthesis_policy(), policy_type)
+
+
+def test_default_policy_is_adaptive(monkeypatch):
+    monkeypatch.delenv("SYNTHESIS_POLICY", raising=False)
+    assert isinstance(get_synthesis_policy(), AdaptiveSynthesisPolicy)
+
+
+def test_unknown_policy_rejected(monkeypatch):
+    monkeypatch.setenv("SYNTHESIS_POLICY", "sometimes")
+    with pytest.raises(ValueError, match="Unknown synthesis policy"):
+        get_synthesis_policy()
+
+
+@pytest.mark.parametrize("mode, increment", [(PASS_THROUGH, 1), (TEMPLATE, 1), (LLM, 0)])
+def test_record_saved(mode, increment):
+    before = synthesis._generations_saved.value
+    record_saved(mode)
+    assert synthesis._generations_saved.value == before + increment
+
+
+@pytest.mark.parametrize("responses, mode, llm_calls", [
+    ((STRUCTURED, STRUCTURED, STRUCTURED), TEMPLATE, 0),
+    ((FREE_FORM, STRUCTURED, STRUCTURED), LLM, 1),
+])
+def test_orchestrator_applies_policy(responses, mode, llm_calls):
+    llm = CountingLLM()
+    orchestrator = OrchestratorAgent(*(StubAgent(response) for response in responses), llm,
+                                     synthesis_policy=AdaptiveSynthesisPolicy())
+    before = synthesis._generations_saved.value
+
+    # No keyword matches, so every specialist runs
+    result = orchestrator.process_query("Tell me about Ayurveda")
+
+    assert result['synthesis'] == mode
+    assert llm.calls == llm_calls
+    assert synthesis._generations_saved.value == before + (mode != LLM)
+    if mode == TEMPLATE:
+        assert result['final_response'] == template_merge("", result['agent_responses'])
+    else:
+        assert result['final_response'] == "synthesized"
+
+
+def test_orchestrator_passes_single_answer_through():
+    llm = CountingLLM()
+    orchestrator = OrchestratorAgent(StubAgent(FREE_FORM), StubAgent("unused"), StubAgent("unused"), llm,
+                                     synthesis_policy=AdaptiveSynthesisPolicy())
+    result = orchestrator.process_query("What is my prakriti?")
+    assert result['synthesis'] == PASS_THROUGH
+    assert result['final_response'] == FREE_FORM
+    assert llm.calls == 0
@@ -0,0 +1,127 @@
+"""Tests for the session working set (src/rag/working_set.py): answers it serves must equal the store's"""
+import numpy as np
+import pytest
+
+from src.rag.retriever import RAGRetriever
+from src.rag.working_set import SessionWorkingSet, use_working_set
+
+
+@pytest.fixture
+def vectors(embedder):
+    """Query text -> embedding, so tests can place queries next to earlier ones"""
+    table = {}
+    embedder.embed_text = lambda text: table[text]
+    return table
+
+
+@pytest.fixture
+def retriever(memory_store, embedder, vectors):
+    return RAGRetriever(vectorstore=memory_store, embedding_generator=embedder)
+
+
+def unit(vector):
+    return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+
+def retrieve_both(retriever, session, query, k, category=None):
+    """(working-set routed, direct store) results for one query"""
+    with use_working_set(session):
+        routed = retriever.retrieve(query, n_results=k, category_filter=category)
+    direct = retriever.retrieve(query, n_results=k, category_filter=category)
+    return routed, direct
+
+
+def assert_same(routed, direct):
+    assert [chunk.id for chunk in routed] == [chunk.id for chunk in direct]
+    np.testing.assert_allclose([chunk.distance for chunk in routed], [chunk.distance for chunk in direct], atol=1e-4)
+
+
+def test_covered_queries_are_answered_exactly(retriever, vectors):
+    rng = np.random.default_rng(7)
+    session = SessionWorkingSet(max_chunks=200)
+    centres = [unit(rng.standard_normal(16)) for _ in range(3)]
+    for n, centre in enumerate(centres):
+        vectors[f"anchor {n}"] = centre
+        assert_same(*retrieve_both(retriever, session, f"anchor {n}", 20))
+    misses = session.misses
+
+    # Follow-ups from right next to an anchor to well outside what it covers, with various k
+    for n in range(120):
+        query = f"follow-up {n}"
+        vectors[query] = unit(centres[n % 3] + rng.normal(scale=0.02 * (1 + n % 8), size=16))
+        assert_same(*retrieve_both(retriever, session, query, (3, 5, 10)[n % 3]))
+    assert session.hits >= 20 and session.misses - misses >= 20
+    assert session.misses - misses == 120 - session.hits
+
+
+def test_unrelated_query_goes_to_the_store(retriever, vectors):
+    rng = np.random.default_rng(3)
+    session = SessionWorkingSet(max_chunks=200)
+    vectors["anchor"] = unit(rng.standard_normal(16))
+    vectors["elsewhere"] = -vectors["anchor"]
+    retrieve_both(retriever, session, "anchor", 5)
+
+    with use_working_set(session):
+        assert session.lookup(vectors["elsewhere"], 5) is None
+    assert_same(*retrieve_both(retriever, session, "elsewhere", 5))
+
+
+def test_anchor_does_not_cover_a_larger_k(retriever, vectors):
+    rng = np.random.default_rng(17)
+    session = SessionWorkingSet(max_chunks=200)
+    vectors["anchor"] = unit(rng.standard_normal(16))
+    retrieve_both(retriever, session, "anchor", 3)
+
+    assert session.lookup(vectors["anchor"], 3) is not None
+    assert session.lookup(vectors["anchor"], 10) is None
+    assert_same(*retrieve_both(retriever, session, "anchor", 10))
+
+
+def test_complete_anchor_answers_any_k_for_its_category(retriever, vectors):
+    rng = np.random.default_rng(11)
+    session = SessionWorkingSet(max_chunks=200)
+    vectors["all dosha"] = unit(rng.standard_normal(16))
+    routed, direct = retrieve_both(retriever, session, "all dosha", 40, "dosha")
+    assert len(direct) == 30  # every dosha chunk: the anchor is complete
+    assert session.anchors[-1]['complete']
+
+    for n, k in enumerate((1, 5, 30, 50)):
+        query = f"dosha {n}"
+        vectors[query] = unit(rng.standard_normal(16))
+        hits = session.hits
+        assert_same(*retrieve_both(retriever, session, query, k, "dosha"))
+        assert session.hits == hits + 1
+
+
+def test_filtered_anchor_does_not_cover_other_filters(retriever, vectors):
+    rng = np.random.default_rng(5)
+    session = SessionWorkingSet(max_chunks=200)
+    vectors["treatment"] = unit(rng.standard_normal(16))
+    retrieve_both(retriever, session, "treatment", 10, "treatment")
+
+    assert session.lookup(vectors["treatment"], 3, None) is None
+    assert session.lookup(vectors["treatment"], 3, "prakriti") is None
+    assert session.lookup(vectors["treatment"], 3, "treatment") is not None
+
+
+def test_eviction_drops_the_guarantees_of_evicted_chunks(retriever, vectors):
+    rng = np.random.default_rng(13)
+    session = SessionWorkingSet(max_chunks=12)
+    first, second = unit(rng.standard_normal(16)), unit(rng.standard_normal(16))
+    vectors.update({"first": first, "second": -first if np.dot(first, second) > 0 else second})
+    retrieve_both(retriever, session, "first", 10)
+    retrieve_both(retriever, session, "second", 10)
+
+    assert len(session) <= 12
+    assert [anchor['ids'] for anchor in session.anchors] == [[chunk.id for chunk in retriever.retrieve("second", 10)]]
+    assert session.lookup(first, 3) is None
+    vectors["near first"] = unit(first + rng.normal(scale=0.02, size=16))
+    assert_same(*retrieve_both(retriever, session, "near first", 3))
+
+
+def test_new_index_version_forgets_the_set(retriever, vectors):
+    session = SessionWorkingSet(max_chunks=200)
+    vectors["anchor"] = unit(np.ones(16))
+    retrieve_both(retriever, session, "anchor", 5)
+    session.bind("another-version")
+    assert len(session) == 0 and session.lookup(vectors["anchor"], 5) is None